@@ -82,13 +82,16 @@ def url_to_filename(response):
 class UrlDownloader:
     """Download a document from a url."""
 
-    def __init__(self, download_dir):
+    def __init__(self, download_dir, engine=None):
         """Initialise the UrlDownloader class.
 
         Args:
             download_dir (str): the path where the file should be saved.
+            engine (crawl_engine.CrawlEngine|None): fetches the urls. If
+                None, each url is fetched with a plain requests.get.
         """
         self.download_dir = download_dir
+        self.engine = engine
         self.headers = {
             "user-agent": (
                 "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:21.0) "
@@ -102,7 +105,10 @@ class UrlDownloader:
         Return the request object and the name of the temporary file
         """
         try:
-            request = requests.get(url, headers=self.headers, params=params)
+            if self.engine is not None:
+                request = self.engine.fetch(url, params=params, headers=self.headers)
+            else:
+                request = requests.get(url, headers=self.headers, params=params)
             if request.status_code == requests.codes.ok:
                 filename = wanted_name if wanted_name else url_to_filename(request)
                 tmpname = os.path.join(self.download_dir, filename)
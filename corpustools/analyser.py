@@ -19,20 +19,40 @@
 """Classes and functions to do syntactic analysis on GiellaLT xml docs."""
 
 import argparse
+import codecs
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from io import TextIOWrapper
+from operator import attrgetter
 from pathlib import Path
-from subprocess import PIPE, run
-from typing import Callable
+from subprocess import PIPE, CompletedProcess, Popen
+from typing import BinaryIO, Callable, TextIO
 
 from lxml import etree
 
-from corpustools import argparse_version, corpuspath, util
-from corpustools.ccat import ccatter
+from corpustools import (
+    argparse_version,
+    compression,
+    corpuspath,
+    profiling,
+    timeouts,
+    util,
+)
+from corpustools.ccat import XMLPrinter
 from corpustools.common_arg_ncpus import NCpus
 from corpustools.util import lang_resource_dirs
 
+CHUNK_SIZE = 1 << 16
+EMPTY_CDATA = b"<![CDATA[]]>"
+# What lxml refuses to put in a CDATA section
+INVALID_CDATA = re.compile(rb"[\x00-\x08\x0b\x0c\x0e-\x1f]|\xef\xbf[\xbe\xbf]")
+CDATA_END = b"]]>"
+# How lxml splits a CDATA section to store CDATA_END in it
+SPLIT_CDATA_END = b"]]]]><![CDATA[>"
+
 
 def get_modename(path: corpuspath.CorpusPath) -> str:
     """Get the modename depending on the CorpusPath"""
@@ -56,9 +76,25 @@ def get_modename(path: corpuspath.CorpusPath) -> str:
     return "korp-analyser"
 
 
-def dependency_analysis(path: corpuspath.CorpusPath, analysed_text: str) -> None:
-    """Insert dependency analysis into the body."""
-    xml_file = etree.parse(path.converted)
+def analysed_document_parts(
+    path: corpuspath.CorpusPath, xml_file: etree._ElementTree
+) -> tuple[bytes, bytes]:
+    """Serialise the analysed document, except for the analysis.
+
+    The body of the converted document is replaced by a dependency
+    element while the document is serialised, and put back afterwards.
+
+    Args:
+        path: The path to the converted file.
+        xml_file: The parsed converted file.
+
+    Returns:
+        The analysed document up to the CDATA section with the analysis,
+        and the rest of the document.
+
+    Raises:
+        UserWarning: If the document has no body.
+    """
     oldbody = xml_file.find(".//body")
 
     if oldbody is None:
@@ -69,20 +105,21 @@ def dependency_analysis(path: corpuspath.CorpusPath, analysed_text: str) -> None
     if parent is None:
         raise UserWarning(f"No parent found for body in {path.converted}")
 
+    index = parent.index(oldbody)
     parent.remove(oldbody)
 
     body = etree.SubElement(parent, "body")
     dependency = etree.SubElement(body, "dependency")
-    dependency.text = etree.CDATA(analysed_text)
-
-    with util.ignored(OSError):
-        os.makedirs(os.path.dirname(path.analysed))
-    with open(path.analysed, "wb") as analysed_stream:
-        analysed_stream.write(
-            etree.tostring(
-                xml_file, xml_declaration=True, encoding="utf8", pretty_print=True
-            )
-        )
+    dependency.text = etree.CDATA("")
+
+    head, placeholder, tail = etree.tostring(
+        xml_file, xml_declaration=True, encoding="utf8", pretty_print=True
+    ).rpartition(EMPTY_CDATA)
+
+    parent.remove(body)
+    parent.insert(index, oldbody)
+
+    return head + placeholder[:-3], placeholder[-3:] + tail
 
 
 LANGUAGES = {
@@ -113,75 +150,266 @@ def find_analyser_zpipe(lang: str) -> Path | None:
     return None
 
 
-def analyse(xml_path: corpuspath.CorpusPath, analyser_zpipe_path: Path) -> None:
-    """Analyse a file.
-    
-    
+def run_divvun_checker(
+    text: str, analyser_zpipe_path: Path | str, variant_name: str
+) -> CompletedProcess:
+    """Run divvun-checker on text.
+
     Args:
-        xml_path: The path to the file to analyse.
+        text: The text to analyse.
         analyser_zpipe_path: The path to the zpipe file to use for analysis.
-    
-    Raises:
-        UserWarning: If the analysis fails.
-    """
-    variant_name = get_modename(xml_path)
+        variant_name: The name of the pipeline in the zpipe file.
 
-    analysis_result = run(
+    Returns:
+        The finished divvun-checker process.
+    """
+    return timeouts.run(
         f"divvun-checker -a {analyser_zpipe_path} -n {variant_name}".split(),
-        input=ccatter(xml_path),
+        to_stdin=text,
         text=True,
         stdout=PIPE,
         stderr=PIPE,
-        check=False,
     )
-    if analysis_result.stderr and not analysis_result.stdout:
-        raise UserWarning(
-            f"divvun-checker failed for {xml_path.analysed}: {analysis_result.stderr}"
-        )
 
-    if analysis_result.stderr:
-        print(
-            f"divvun-checker produced {len(analysis_result.stderr.splitlines())} "
-            f"lines of warnings to {xml_path.log}",
 
-            file=sys.stderr,
-        )
-        xml_path.log.write_text(analysis_result.stderr, encoding="utf-8")
+class CountingWriter:
+    """Write text to a stream, counting the characters written."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.count = 0
+
+    def write(self, text: str) -> None:
+        self.count += len(text)
+        self.stream.write(text)
+
+
+def copy_analysis(stdout: BinaryIO, output: BinaryIO) -> tuple[int, bool]:
+    """Copy the analysis into the CDATA section of the analysed document.
+
+    All of stdout is read, even if it can not be copied, so that
+    divvun-checker is never blocked. "]]>" is stored by splitting the
+    CDATA section, like lxml does.
+
+    Args:
+        stdout: The output of divvun-checker.
+        output: The analysed document.
+
+    Returns:
+        The number of bytes read, and whether all of them could be put
+        in a CDATA section.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    copied = 0
+    valid = True
+    previous = b""
+    # Trailing "]" that may begin a "]]>" continued in the next chunk
+    held = b""
+    pending_cr = False
+    for block in iter(partial(stdout.read, CHUNK_SIZE), b""):
+        # Translate newlines like text mode pipes do
+        chunk = block[1:] if pending_cr and block.startswith(b"\n") else block
+        chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        pending_cr = block.endswith(b"\r")
+        if valid:
+            try:
+                decoder.decode(chunk)
+            except UnicodeDecodeError:
+                valid = False
+        if valid and INVALID_CDATA.search(previous[-2:] + chunk):
+            valid = False
+        if valid:
+            text = held + chunk
+            end = len(text) - min(2, len(text) - len(text.rstrip(b"]")))
+            output.write(text[:end].replace(CDATA_END, SPLIT_CDATA_END))
+            held = text[end:]
+        copied += len(chunk)
+        previous = chunk
+
+    try:
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        valid = False
+    if valid:
+        output.write(held)
+
+    return copied, valid
+
+
+def feed(stdin: BinaryIO, write_text: Callable[[TextIO], None]) -> None:
+    """Write text to stdin of a process, and close it."""
+    text_stdin = TextIOWrapper(stdin, encoding="utf-8")
+    try:
+        write_text(text_stdin)
+    except BrokenPipeError:
+        # The process has stopped reading, its stderr tells why
+        pass
+    finally:
+        with util.ignored(BrokenPipeError):
+            text_stdin.close()
+
+
+def stream_divvun_checker(
+    write_text: Callable[[TextIO], None],
+    analyser_zpipe_path: Path | str,
+    variant_name: str,
+    output: BinaryIO,
+) -> tuple[int, bool, str]:
+    """Run divvun-checker, streaming the text in and the analysis out.
+
+    Args:
+        write_text: Writes the text to analyse to the stream it is given.
+        analyser_zpipe_path: The path to the zpipe file to use for analysis.
+        variant_name: The name of the pipeline in the zpipe file.
+        output: The analysis is written here as it is produced.
+
+    Returns:
+        The output of copy_analysis, and the stderr of divvun-checker.
+
+    Raises:
+        subprocess.TimeoutExpired: if divvun-checker ran longer than the
+            subprocess time limit, and was killed.
+    """
+    with (
+        Popen(
+            f"divvun-checker -a {analyser_zpipe_path} -n {variant_name}".split(),
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=PIPE,
+            start_new_session=True,
+        ) as process,
+        ThreadPoolExecutor(max_workers=2) as readers,
+        # Killing divvun-checker ends the readers, or the with block
+        # would wait for them forever
+        timeouts.killed_after(process, timeouts.subprocess_timeout()),
+    ):
+        analysis = readers.submit(copy_analysis, process.stdout, output)
+        stderr = readers.submit(process.stderr.read)
+        feed(process.stdin, write_text)
+
+        return *analysis.result(), stderr.result().decode("utf-8", errors="replace")
+
+
+def analyse(
+    xml_path: corpuspath.CorpusPath, analyser_zpipe_path: Path, compress: bool = False
+) -> None:
+    """Analyse a file.
+
+    The converted file is parsed once. Its text is streamed into
+    divvun-checker, and the analysis is streamed into the analysed file.
 
+    Args:
+        xml_path: The path to the file to analyse.
+        analyser_zpipe_path: The path to the zpipe file to use for analysis.
+        compress: Whether the analysed file should be gzip compressed.
+
+    Raises:
+        UserWarning: If the analysis fails.
+    """
+    variant_name = get_modename(xml_path)
+
+    xml_printer = XMLPrinter(lang=xml_path.lang, all_paragraphs=True)
     try:
-        dependency_analysis(xml_path, analysed_text=analysis_result.stdout)
+        xml_printer.parse_file(xml_path.converted)
     except etree.XMLSyntaxError as error:
         print(f"Can not parse {xml_path.converted}", file=sys.stderr)
         print("The error was:", str(error), file=sys.stderr)
+        return
+
+    head, tail = analysed_document_parts(xml_path, xml_printer.etree)
 
+    def write_text(stdin: TextIO) -> None:
+        text = CountingWriter(stdin)
+        xml_printer.process_file(text)
+        if not text.count:
+            raise UserWarning(f"Empty file {xml_path.converted}")
 
-def analyse_in_parallel(
+    xml_path.analysed.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = xml_path.analysed.with_name(f"{xml_path.analysed.name}.{os.getpid()}")
+    try:
+        with compression.open_output(tmp_path, compress) as analysed_stream:
+            analysed_stream.write(head)
+            copied, valid, stderr = stream_divvun_checker(
+                write_text, analyser_zpipe_path, variant_name, analysed_stream
+            )
+            analysed_stream.write(tail)
+
+        if stderr and not copied:
+            raise UserWarning(
+                f"divvun-checker failed for {xml_path.analysed}: {stderr}"
+            )
+
+        if not valid:
+            raise UserWarning(
+                f"divvun-checker output for {xml_path.analysed} can not be "
+                "stored in a CDATA section"
+            )
+
+        if stderr:
+            print(
+                f"divvun-checker produced {len(stderr.splitlines())} "
+                f"lines of warnings to {xml_path.log}",
+                file=sys.stderr,
+            )
+            xml_path.log.write_text(stderr, encoding="utf-8")
+
+        os.replace(tmp_path, xml_path.analysed)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def analyse_in_parallel(  # noqa: PLR0913
     file_list: list[corpuspath.CorpusPath],
     pool_size: int,
     analyser_zpipe_path: Path,
-):
+    profiler: profiling.Profiler | None = None,
+    compress: bool = False,
+    *,
+    limits: timeouts.Limits | None = None,
+) -> list[tuple[corpuspath.CorpusPath, BaseException]]:
+    """Analyse files in parallel.
+
+    Returns:
+        The files that failed, and the exceptions they raised.
+    """
     print(f"Parallel analysis of {len(file_list)} files with {pool_size} workers")
     files_with_sizes = [(file, file.converted.stat().st_size) for file in file_list]
     files_with_sizes.sort(key=lambda item: item[1])
     files, sizes = zip(*files_with_sizes, strict=True)
     analyse_one: Callable[[corpuspath.CorpusPath], None] = partial(
-        analyse, analyser_zpipe_path=analyser_zpipe_path
+        analyse, analyser_zpipe_path=analyser_zpipe_path, compress=compress
     )
-    util.run_in_parallel(
-        function=analyse_one,
+    return util.run_in_parallel(
+        function=profiling.profiled(
+            profiler,
+            analyse_one,
+            "analyse",
+            input_of=attrgetter("converted"),
+            output_of=attrgetter("analysed"),
+        ),
         max_workers=pool_size,
         file_list=list(files),
         file_sizes=list(sizes),
+        limits=limits,
     )
 
 
 def analyse_serially(
     file_list: list[corpuspath.CorpusPath],
     analyser_zpipe_path: Path,
-):
-    """Analyse files one by one."""
+    profiler: profiling.Profiler | None = None,
+    compress: bool = False,
+    *,
+    limits: timeouts.Limits | None = None,
+) -> list[tuple[corpuspath.CorpusPath, BaseException]]:
+    """Analyse files one by one.
+
+    Returns:
+        The files that failed, and the exceptions they raised.
+    """
     print(f"Starting the analysis of {len(file_list)} files")
 
+    failed = []
     fileno = 0
     for xml_file in file_list:
         fileno += 1
@@ -193,15 +421,31 @@ def analyse_serially(
         )
         util.print_frame("*" * 79)
         try:
-            analyse(xml_file, analyser_zpipe_path)
-        except UserWarning as error:
+            with profiling.measure(
+                profiler,
+                "analyse",
+                xml_file.converted,
+                xml_file.converted,
+                xml_file.analysed,
+            ):
+                timeouts.call(limits, analyse, xml_file, analyser_zpipe_path, compress)
+        except (UserWarning, *timeouts.TIMEOUT_ERRORS) as error:
             print(f"Analysis failed: {error}", file=sys.stderr)
+            failed.append((xml_file, error))
+
+    return failed
 
 
 def parse_options():
     """Parse the given options."""
     parser = argparse.ArgumentParser(
-        parents=[argparse_version.parser], description="Analyse files in parallel."
+        parents=[
+            argparse_version.parser,
+            compression.parser,
+            profiling.parser,
+            timeouts.parser,
+        ],
+        description="Analyse files in parallel.",
     )
 
     parser.add_argument("--ncpus", action=NCpus)
@@ -278,11 +522,26 @@ def main():
             raise SystemExit(0)
         analysable_paths = non_skipped_files
 
+    profiler = profiling.make_profiler(args)
+    limits = timeouts.make_limits(args)
     try:
         if args.serial:
-            analyse_serially(analysable_paths, analyser_path)
+            failed = analyse_serially(
+                analysable_paths, analyser_path, profiler, args.compress, limits=limits
+            )
         else:
-            analyse_in_parallel(analysable_paths, args.ncpus, analyser_path)
+            failed = analyse_in_parallel(
+                analysable_paths,
+                args.ncpus,
+                analyser_path,
+                profiler,
+                args.compress,
+                limits=limits,
+            )
+        timeouts.report_failures(args, failed)
     except util.ArgumentError as error:
         print(f"Cannot do analysis\n{str(error)}", file=sys.stderr)
         raise SystemExit(1) from error
+    finally:
+        if profiler is not None:
+            profiler.finish()
@@ -21,10 +21,30 @@
 
 
 import argparse
+import importlib
 
-from corpustools._version import get_version
 
-version = get_version()
+class VersionAction(argparse.Action):
+    """Print the corpustools version and exit.
+
+    The version is looked up only when it is asked for, as reading the
+    package metadata slows down the start of every command.
+    """
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, **kwargs):
+        super().__init__(
+            option_strings,
+            dest,
+            nargs=0,
+            default=argparse.SUPPRESS,
+            help="show program's version number and exit",
+            **kwargs,
+        )
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        print(importlib.import_module("corpustools._version").get_version())
+        parser.exit()
+
 
 parser = argparse.ArgumentParser(add_help=False)
-parser.add_argument("--version", action="version", version=version)
+parser.add_argument("--version", action=VersionAction)
@@ -0,0 +1,132 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Micro benchmark of the encoding repair in decode.py.
+
+For every encoding in decode.CTYPES, a text containing the characters
+the encoding repairs is decoded with
+
+* the decoder used by decode.default_decoder
+* a single pass str.translate/regex alternation translator
+
+The results of both are compared to the original dict based decoder.
+"""
+
+import argparse
+import re
+import timeit
+
+from corpustools import decode
+
+SAMPLE = "Mun lean njeallje jagi boaris. Nu beaivvádat, olggobealde ássu. "
+
+
+def reference_decoder(position, text):
+    """Decode text the way decode.default_decoder originally did."""
+    for key, value in decode.CTYPES[position].items():
+        text = text.replace(key, value)
+
+    return text
+
+
+def make_translator(position):
+    """Compile a CTYPES table into a single pass translator."""
+    table = decode.CTYPES[position]
+    if all(len(key) == 1 for key in table):
+        translation = str.maketrans(table)
+        return lambda _, text: text.translate(translation)
+
+    pattern = re.compile(
+        "|".join(re.escape(key) for key in sorted(table, key=len, reverse=True))
+    )
+    return lambda _, text: pattern.sub(lambda match: table[match.group()], text)
+
+
+def make_text(position, repeat):
+    """Make a text where the characters of the encoding are sprinkled in."""
+    keys = list(decode.CTYPES[position])
+    return (
+        "".join(char + keys[index % len(keys)] for index, char in enumerate(SAMPLE))
+        * repeat
+    )
+
+
+def time_call(decoder, position, text, number):
+    """Return the mean time of decoding text."""
+    return timeit.timeit(lambda: decoder(position, text), number=number) / number
+
+
+def benchmark(repeat, number):
+    """Time the decoders for all encodings in decode.CTYPES.
+
+    Args:
+        repeat (int): how many times the sample text is repeated.
+        number (int): how many times each decoder is run.
+
+    Returns:
+        (list[dict]): timings and correctness for each encoding.
+    """
+    results = []
+    for position in decode.CTYPES:
+        text = make_text(position, repeat)
+        want = reference_decoder(position, text)
+        translator = make_translator(position)
+        results.append(
+            {
+                "encoding": position,
+                "length": len(text),
+                "replace_ok": decode.default_decoder(position, text) == want,
+                "translate_ok": translator(position, text) == want,
+                "reference": time_call(reference_decoder, position, text, number),
+                "replace": time_call(decode.default_decoder, position, text, number),
+                "translate": time_call(translator, position, text, number),
+            }
+        )
+
+    return results
+
+
+def parse_options():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--repeat", type=int, default=2000, help="Repetitions of the sample text"
+    )
+    parser.add_argument("--number", type=int, default=10, help="Runs of each decoder")
+
+    return parser.parse_args()
+
+
+def main():
+    """Print the benchmark results."""
+    args = parse_options()
+    print(
+        f"{'encoding':40} {'chars':>8} {'reference':>10} {'replace':>10} "
+        f"{'translate':>10} ok"
+    )
+    for result in benchmark(args.repeat, args.number):
+        print(
+            f"{result['encoding']:40} {result['length']:8} "
+            f"{result['reference'] * 1000:8.2f}ms {result['replace'] * 1000:8.2f}ms "
+            f"{result['translate'] * 1000:8.2f}ms "
+            f"{result['replace_ok'] and result['translate_ok']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
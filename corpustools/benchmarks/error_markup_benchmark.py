@@ -0,0 +1,141 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Benchmark of the error markup parsers in error_annotated_sentence.py.
+
+A synthetic, heavily annotated corpus is parsed with
+
+* parse_markup_to_sentence, which reads the markup one character at a time
+* parse_markup, which jumps from brace to brace
+
+and the ErrorAnnotatedSentence trees of both are compared.
+"""
+
+import argparse
+import random
+import timeit
+
+from corpustools.error_annotated_sentence import (
+    parse_markup,
+    parse_markup_to_sentence,
+)
+from corpustools.error_types import ErrorType
+
+WORDS = (
+    "Muhto gaskkohagaid ja erenoamážit dalle go lei buolaš de aggregáhta "
+    "billánii Lávus bearpmahat earuha uskki loaiddu"
+).split()
+
+
+def make_error(rng, depth):
+    """Make an error markup, possibly with nested errors inside."""
+    if depth and rng.random() < 0.3:  # noqa: PLR2004
+        error = f"{make_error(rng, depth - 1)} {rng.choice(WORDS)}"
+    else:
+        error = rng.choice(WORDS)
+    errortype = rng.choice(list(ErrorType))
+    correction = rng.choice(WORDS)
+    if rng.random() < 0.5:  # noqa: PLR2004
+        correction = f"noun,svow|{correction}///{rng.choice(WORDS)}"
+
+    return f"{{{error}}}{errortype.symbol}{{{correction}}}"
+
+
+def make_words(rng):
+    """Make the plain text between two error markups."""
+    return " ".join(rng.choices(WORDS, k=rng.randint(3, 12)))
+
+
+def make_line(rng, errors):
+    """Make a line with errors error markups between plain words."""
+    return (
+        " ".join(f"{make_words(rng)} {make_error(rng, depth=2)}" for _ in range(errors))
+        + f" {make_words(rng)}."
+    )
+
+
+def make_corpus(lines, errors, seed=0):
+    """Make a synthetic error annotated corpus.
+
+    Args:
+        lines (int): the number of lines.
+        errors (int): the number of error markups on each line.
+        seed (int): seed of the random generator.
+
+    Returns:
+        (list[str]): the lines of the corpus.
+    """
+    rng = random.Random(seed)
+    return [make_line(rng, errors) for _ in range(lines)]
+
+
+def benchmark(corpus, number):
+    """Time both parsers on corpus.
+
+    Args:
+        corpus (list[str]): lines of error markup.
+        number (int): how many times each parser parses the corpus.
+
+    Returns:
+        (dict): the best time of each parser, and whether they agree.
+    """
+
+    def parse_characters():
+        return [parse_markup_to_sentence(iter(line)) for line in corpus]
+
+    def parse_braces():
+        return [parse_markup(line) for line in corpus]
+
+    return {
+        "identical": parse_characters() == parse_braces(),
+        "characters": min(timeit.repeat(parse_characters, number=1, repeat=number)),
+        "braces": min(timeit.repeat(parse_braces, number=1, repeat=number)),
+    }
+
+
+def parse_options():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=5000, help="Lines in the corpus")
+    parser.add_argument(
+        "--errors", type=int, default=10, help="Error markups on each line"
+    )
+    parser.add_argument("--number", type=int, default=5, help="Runs of each parser")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus")
+
+    return parser.parse_args()
+
+
+def main():
+    """Print the benchmark results."""
+    args = parse_options()
+    corpus = make_corpus(args.lines, args.errors, args.seed)
+    result = benchmark(corpus, args.number)
+    chars = sum(len(line) for line in corpus)
+    print(f"{len(corpus)} lines, {chars} characters")
+    for name in ["characters", "braces"]:
+        print(
+            f"{name:<12} {result[name] * 1000:8.1f}ms "
+            f"{len(corpus) / result[name]:10.0f} lines/s"
+        )
+    print(f"speedup {result['characters'] / result['braces']:.1f}x")
+    print(f"identical trees: {result['identical']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Import time benchmark of the corpustools commands.
+
+Each command listed in [tool.poetry.scripts] in pyproject.toml is timed
+by importing its module in a fresh python process, which is what the
+command does before it gets to work. The start time of a bare python
+process is subtracted, and the best of the runs is printed.
+
+If pyproject.toml is not found, the console scripts of the installed
+corpustools package are used.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from importlib.metadata import entry_points
+from pathlib import Path
+
+import tomllib
+
+PYPROJECT = Path(__file__).parents[2] / "pyproject.toml"
+
+
+def scripts(pyproject=PYPROJECT):
+    """Find the commands of corpustools.
+
+    Args:
+        pyproject (Path): path to pyproject.toml.
+
+    Returns:
+        (dict[str, str]): the command names and their entry points,
+            e.g. "corpustools.ccat:main".
+    """
+    if pyproject.exists():
+        with pyproject.open("rb") as pyproject_stream:
+            return tomllib.load(pyproject_stream)["tool"]["poetry"]["scripts"]
+
+    return {
+        entry_point.name: entry_point.value
+        for entry_point in entry_points(group="console_scripts")
+        if entry_point.value.startswith("corpustools.")
+    }
+
+
+def time_import(module, number):
+    """Return the best time of importing module in a new python process."""
+    best = float("inf")
+    for _ in range(number):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def parse_options():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=5, help="Runs of each import")
+    parser.add_argument(
+        "commands", nargs="*", help="Only time these commands. Default is all."
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Time the imports of the corpustools commands."""
+    args = parse_options()
+    commands = {
+        name: entry_point.split(":")[0]
+        for name, entry_point in scripts().items()
+        if not args.commands or name in args.commands
+    }
+
+    startup = time_import("sys", args.number)
+    print(f"python startup: {startup * 1000:.1f}ms")
+    timings = {
+        name: time_import(module, args.number) - startup
+        for name, module in commands.items()
+    }
+    for name, timing in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"{name:<28} {commands[name]:<40} {timing * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
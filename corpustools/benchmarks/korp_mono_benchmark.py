@@ -0,0 +1,139 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Golden output benchmark of the analysis filters in korp_mono.
+
+The dependency analysis of the given analysed files is run through
+korp_mono.reshape_analysis and through a reference implementation that
+runs one substitution per filtered tag, like korp_mono used to.
+The outputs are compared and the timings printed.
+
+If no files are given, a synthetic analysis is used.
+"""
+
+import argparse
+import re
+import timeit
+
+from lxml import etree
+
+from corpustools import compression, korp_mono
+
+SAMPLE = "\n".join(
+    [
+        '"<Oahpa>"',
+        '\t"Oahpa" N Prop Sem/Obj Sg Nom <W:0.0000000000> @HNOUN #1->0',
+        '"<:>"',
+        '\t":" CLB <W:0.0000000000> #2->1',
+        ": ",
+        '"<suohkanstivrii>"',
+        '\t"suohkan" N Cmp/SgNom Cmp <cohort-with-dynamic-compound> '
+        '"< suohkanstivrii>" <W:0.0000000000> #3->1',
+        '\t\t"stivra" N Sg Ill <ext> <W:0.0000000000> @<ADVL #3->1',
+        '"<addit>"',
+        '\t"addit" V TV Inf <W:0.0000000000> @FS-N<IMV #4->3',
+        ": ",
+        '"<St.meld>"',
+        '\t"St.meld" N ACR Sg Nom "<St.meld>" <W:0.0000000000> @HNOUN #5->4',
+        '"<.>"',
+        '\t"." CLB <W:0.0000000000> #6->4',
+        ": ",
+        "",
+        '"<¶>"',
+        '\t"¶" CLB <W:0.0000000000> #1->1',
+        ":\n",
+        "",
+    ]
+)
+
+
+def reference_reshape_analysis(analysis):
+    """Reshape analysis with one substitution per filtered tag."""
+    _analysis = re.sub('\n\t"<', '\n\t"\\<', analysis)
+    _analysis = re.sub('\n\t">', '\n\t"\\>', _analysis)
+    _analysis = re.sub(
+        r""":\s*
+\s*
+
+\s*""",
+        ":\n",
+        _analysis,
+    )
+    _analysis = re.sub(r"<W\:[0-9]*\.*[0-9]*>\s*", "", _analysis)
+    if _analysis.startswith(":"):
+        _analysis = re.sub("^:[^\n]*\n", "", _analysis)
+    for tag in korp_mono.EXTRA_TAGS + korp_mono.WORDFORM_FILTER:
+        _analysis = re.sub(" " + re.escape(tag), "", _analysis)
+
+    return _analysis
+
+
+def dependency_texts(filenames):
+    """Yield the dependency analysis of the given analysed files."""
+    parser = etree.XMLParser(huge_tree=True)
+    for filename in filenames:
+        dependency = compression.parse(filename, parser).find(".//body/dependency")
+        if dependency is not None and dependency.text:
+            yield filename, dependency.text
+
+
+def time_call(function, text, number):
+    """Return the mean time of running function on text."""
+    return timeit.timeit(lambda: function(text), number=number) / number
+
+
+def parse_options():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5000,
+        help="Repetitions of the synthetic analysis",
+    )
+    parser.add_argument("--number", type=int, default=3, help="Runs of each version")
+    parser.add_argument("analysed_files", nargs="*", help="Analysed xml files")
+
+    return parser.parse_args()
+
+
+def main():
+    """Compare and time the analysis filters."""
+    args = parse_options()
+    texts = (
+        dependency_texts(args.analysed_files)
+        if args.analysed_files
+        else [("synthetic", SAMPLE * args.repeat)]
+    )
+
+    mismatches = 0
+    for name, text in texts:
+        identical = korp_mono.reshape_analysis(text) == reference_reshape_analysis(text)
+        mismatches += not identical
+        reference = time_call(reference_reshape_analysis, text, args.number)
+        current = time_call(korp_mono.reshape_analysis, text, args.number)
+        print(
+            f"{name}: {len(text)} chars, reference {reference * 1000:.1f}ms, "
+            f"current {current * 1000:.1f}ms, identical {identical}"
+        )
+
+    raise SystemExit(mismatches)
+
+
+if __name__ == "__main__":
+    main()
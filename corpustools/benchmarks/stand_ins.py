@@ -0,0 +1,149 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Stand-ins for the external tools used by corpustools.
+
+The benchmarks should measure corpustools, not the language tools, and
+should run where the language tools are not installed. The stand-ins
+read their input and write output in the format of the real tools:
+
+* divvun-checker writes a cg3 dependency analysis, one cohort per token
+* hfst-tokenise --print-all writes one token per line
+
+The module does not import the rest of corpustools, so that the
+stand-ins start about as fast as the tools they replace.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+TOKENISE_RE = re.compile(r"\w+|\s+|[^\w\s]")
+# The tokens ending a sentence, as in sentencedivider.STOPS
+STOPS = {";", "!", "?", ".", "..", "...", "¶", "…"}
+PARAGRAPH = "¶"
+WEIGHT = "<W:0.0000000000>"
+WORD_TAGS = [
+    ("N", "Sg Nom", "@SUBJ>"),
+    ("V", "Ind Prs Sg3", "@FMV"),
+    ("N", "Sg Acc", "@<OBJ"),
+    ("A", "Attr", "@>N"),
+    ("Adv", "", "@ADVL"),
+]
+SCRIPT = """#!{python}
+import sys
+
+sys.path.insert(0, {path!r})
+from corpustools.benchmarks.stand_ins import {function}
+
+{function}()
+"""
+TOOLS = {"divvun-checker": "divvun_checker", "hfst-tokenise": "hfst_tokenise"}
+
+
+def cohort(token, self_id, parent_id):
+    """Make a cohort with one reading for token."""
+    if token[0].isalnum():
+        pos, tags, function = WORD_TAGS[len(token) % len(WORD_TAGS)]
+    else:
+        pos, tags, function = "CLB", "", ""
+    reading = " ".join(
+        part for part in [f'"{token.lower()}"', pos, tags, WEIGHT, function] if part
+    )
+
+    return f'"<{token}>"\n\t{reading} #{self_id}->{parent_id}\n'
+
+
+def analyse_text(text):
+    """Make a dependency analysis of text, like divvun-checker does.
+
+    Sentences end after the tokens in STOPS, and ¶ ends a paragraph.
+
+    Args:
+        text (str): the text to analyse.
+
+    Returns:
+        (str): the analysis.
+    """
+    analysis = []
+    self_id = 0
+    for token in TOKEN_RE.findall(text):
+        if token == PARAGRAPH:
+            if self_id:
+                analysis.append("\n")
+            analysis.append(cohort(token, 1, 1))
+            analysis.append(":\n\n")
+            self_id = 0
+            continue
+
+        self_id += 1
+        analysis.append(cohort(token, self_id, 0 if self_id == 1 else 1))
+        if token in STOPS:
+            analysis.append("\n")
+            self_id = 0
+        else:
+            analysis.append(": \n")
+
+    return "".join(analysis)
+
+
+def tokenise_text(text):
+    """Tokenise text, like hfst-tokenise --print-all does.
+
+    Args:
+        text (str): the text to tokenise.
+
+    Returns:
+        (str): one token per line, whitespace included.
+    """
+    return "".join(
+        " \n" if token.isspace() else f"{token}\n"
+        for token in TOKENISE_RE.findall(text)
+    )
+
+
+def divvun_checker():
+    """Analyse the text on stdin."""
+    text = sys.stdin.buffer.read().decode("utf-8")
+    sys.stdout.buffer.write(analyse_text(text).encode("utf-8"))
+
+
+def hfst_tokenise():
+    """Tokenise the text on stdin."""
+    text = sys.stdin.buffer.read().decode("utf-8")
+    sys.stdout.buffer.write(tokenise_text(text).encode("utf-8"))
+
+
+def install_tools(bindir):
+    """Put scripts running the stand-ins in bindir.
+
+    Args:
+        bindir (Path): the directory the scripts are written to.
+    """
+    bindir.mkdir(parents=True, exist_ok=True)
+    for tool, function in TOOLS.items():
+        script = bindir / tool
+        script.write_text(
+            SCRIPT.format(
+                python=sys.executable,
+                path=Path(__file__).parents[2].as_posix(),
+                function=function,
+            )
+        )
+        script.chmod(0o755)
@@ -0,0 +1,480 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Throughput benchmarks of the corpustools hot paths.
+
+A synthetic corpus is generated, and the external tools are replaced by
+the stand-ins in corpustools.benchmarks.stand_ins. Each benchmark is run
+a number of times on the corpus and the best time is kept.
+
+The results can be written to a json file, and compared to the results
+of an earlier run. If the baseline file does not exist, the results of
+this run are stored in it. The exit status is the number of benchmarks
+that are slower than the baseline by more than the tolerance.
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from corpustools import (
+    analyser,
+    ccat,
+    compile_cwb_mono,
+    converter,
+    dupe_finder,
+    korp_mono,
+    sentencedivider,
+    text_cat,
+    tmx,
+)
+from corpustools._version import get_version
+from corpustools.benchmarks import stand_ins, synthetic_corpus
+from corpustools.benchmarks.korp_mono_benchmark import dependency_texts
+from corpustools.corpuspath import make_corpus_path
+
+
+def corpus_files(root, lang, module, suffix=""):
+    """Find the files of a module of the synthetic corpus."""
+    directory = root / (f"corpus-{lang}-orig" if module is None else f"corpus-{lang}")
+    if module is not None:
+        directory = directory / module
+
+    return sorted(
+        path
+        for path in directory.glob(f"**/*{suffix}")
+        if path.is_file() and not path.name.endswith(".xsl")
+    )
+
+
+def converted_paths(root, lang=synthetic_corpus.LANG):
+    """The corpus paths of the converted files of lang."""
+    return [
+        make_corpus_path(path.as_posix())
+        for path in corpus_files(root, lang, "converted", ".xml")
+    ]
+
+
+def convert_case(suffix):
+    """Make a benchmark of converting the original files ending with suffix."""
+
+    def case(root):
+        paths = [
+            make_corpus_path(path.as_posix())
+            for path in corpus_files(root, synthetic_corpus.LANG, None, suffix)
+        ]
+        classifier = text_cat.default_classifier()
+
+        def run():
+            for path in paths:
+                document = converter.Converter(path)
+                converter.Converter.normalize_text(document.make_complete(classifier))
+
+        return run, len(paths)
+
+    return case
+
+
+def ccat_case(root):
+    """Print the text of the converted files."""
+    paths = corpus_files(root, synthetic_corpus.LANG, "converted", ".xml")
+
+    def run():
+        xml_printer = ccat.XMLPrinter(all_paragraphs=True)
+        for path in paths:
+            xml_printer.parse_file(path)
+            xml_printer.process_file()
+
+    return run, len(paths)
+
+
+def text_cat_case(root):
+    """Classify the language of each paragraph of the converted files."""
+    xml_printer = ccat.XMLPrinter(all_paragraphs=True)
+    paragraphs = []
+    for path in corpus_files(root, synthetic_corpus.LANG, "converted", ".xml"):
+        xml_printer.parse_file(path)
+        paragraphs.extend(xml_printer.process_file().getvalue().split(" ¶\n"))
+    classifier = text_cat.default_classifier()
+
+    def run():
+        for paragraph in paragraphs:
+            classifier.classify(paragraph, langs=["sme", "nob", "fin", "sma"])
+
+    return run, len(paragraphs)
+
+
+def reshape_analysis_case(root):
+    """Filter the dependency analysis of the analysed files."""
+    texts = [
+        text
+        for _, text in dependency_texts(
+            corpus_files(root, synthetic_corpus.LANG, "analysed", ".xml")
+        )
+    ]
+
+    def run():
+        for text in texts:
+            korp_mono.reshape_analysis(text)
+
+    return run, len(texts)
+
+
+def korp_mono_case(root):
+    """Make the korp_mono documents of the analysed files."""
+    paths = corpus_files(root, synthetic_corpus.LANG, "analysed", ".xml")
+
+    def run():
+        for path in paths:
+            korp_mono.make_vrt_xml(path.as_posix(), synthetic_corpus.LANG)
+
+    return run, len(paths)
+
+
+def concat_corpus_case(root):
+    """Concatenate the korp_mono files into vrt files."""
+    corpus = compile_cwb_mono.Corp(synthetic_corpus.LANG, root)
+    compiled_dir = root / "compiled"
+    compiled_dir.mkdir(exist_ok=True)
+
+    def run():
+        compile_cwb_mono.concat_corpus(
+            corpus, synthetic_corpus.LANG, compiled_dir, "20260101"
+        )
+
+    return run, len(corpus_files(root, synthetic_corpus.LANG, "korp_mono", ".xml"))
+
+
+def analyse_case(root):
+    """Analyse the converted files with the stand-in divvun-checker."""
+    paths = converted_paths(root)
+    zpipe = analyser.find_analyser_zpipe(synthetic_corpus.LANG)
+
+    def run():
+        for path in paths:
+            analyser.analyse(path, zpipe)
+
+    return run, len(paths)
+
+
+def sentencedivider_case(root):
+    """Divide the converted files into sentences with the stand-in tokeniser."""
+    paths = converted_paths(root) + converted_paths(
+        root, synthetic_corpus.PARALLEL_LANG
+    )
+
+    def run():
+        for path in paths:
+            sentencedivider.make_valid_sentences(path)
+
+    return run, len(paths)
+
+
+def parallelize_case(root):
+    """Align the converted files with their parallels.
+
+    Raises:
+        ImportError: if python_tca2 is not installed.
+    """
+    parallelize = importlib.import_module("corpustools.parallelize")
+    pairs = [
+        (path, make_corpus_path(path.parallel(synthetic_corpus.PARALLEL_LANG)))
+        for path in converted_paths(root)
+    ]
+
+    def run():
+        for path, parallel in pairs:
+            parallelize.parallelise_file(path, parallel)
+
+    return run, len(pairs)
+
+
+def tmx2html_case(root):
+    """Turn the tmx files into html files."""
+    paths = corpus_files(root, synthetic_corpus.LANG, "tmx", ".tmx")
+
+    def run():
+        for path in paths:
+            tmx.tmx2html(path)
+
+    return run, len(paths)
+
+
+def dupe_finder_case(root):
+    """Look for duplicates among the converted files."""
+    directories = sorted(
+        {path.parent for path in corpus_files(root, synthetic_corpus.LANG, "converted")}
+    )
+
+    def run():
+        for directory in directories:
+            dupe_finder.DupeFinder(directory.as_posix()).iterate_all_files()
+
+    return run, len(corpus_files(root, synthetic_corpus.LANG, "converted"))
+
+
+CASES = {
+    **{f"convert{suffix}": convert_case(suffix) for suffix in synthetic_corpus.FORMATS},
+    "ccat": ccat_case,
+    "text_cat": text_cat_case,
+    "reshape_analysis": reshape_analysis_case,
+    "korp_mono": korp_mono_case,
+    "concat_corpus": concat_corpus_case,
+    "dupe_finder": dupe_finder_case,
+    "tmx2html": tmx2html_case,
+    "analyse": analyse_case,
+    "sentencedivider": sentencedivider_case,
+    "parallelize": parallelize_case,
+}
+
+
+def install_stand_ins(directory, langs):
+    """Make corpustools use the stand-ins for the external tools.
+
+    The stand-in scripts are put first in PATH, and HOME is pointed to a
+    directory with dummy language resources.
+
+    Args:
+        directory (Path): where the stand-ins are installed.
+        langs (list[str]): the languages that need resources.
+    """
+    bindir = directory / "bin"
+    stand_ins.install_tools(bindir)
+    home = directory / "home"
+    for lang in langs:
+        lang_dir = home / ".local/share/giella" / lang
+        lang_dir.mkdir(parents=True, exist_ok=True)
+        (lang_dir / f"{analyser.LANGUAGES.get(lang, lang)}.zpipe").touch()
+        (lang_dir / "tokeniser-disamb-gt-desc.pmhfst").touch()
+
+    os.environ["PATH"] = f"{bindir}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ["HOME"] = home.as_posix()
+
+
+def measure(run, number):
+    """Time run number times.
+
+    Output to stdout and stderr is discarded while run is timed.
+
+    Returns:
+        (list[float]): the times of the runs, in seconds.
+    """
+    timings = []
+    with (
+        open(os.devnull, "w") as devnull,
+        contextlib.redirect_stdout(devnull),
+        contextlib.redirect_stderr(devnull),
+    ):
+        for _ in range(number):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def run_cases(root, names, number):
+    """Run the benchmarks.
+
+    Args:
+        root (Path): the directory of the synthetic corpus.
+        names (list[str]): names of the benchmarks in CASES.
+        number (int): how many times each benchmark is run.
+
+    Returns:
+        (dict[str, dict]): the results of each benchmark. Benchmarks
+            that can not be run here have a skipped entry telling why.
+    """
+    results = {}
+    for name in names:
+        try:
+            run, items = CASES[name](root)
+        except ImportError as error:
+            results[name] = {"skipped": str(error)}
+            print(f"{name:<18} skipped: {error}")
+            continue
+
+        timings = measure(run, number)
+        results[name] = {
+            "items": items,
+            "best": min(timings),
+            "median": statistics.median(timings),
+            "timings": timings,
+        }
+        print(
+            f"{name:<18} {items:6} items {min(timings) * 1000:10.1f}ms "
+            f"{min(timings) / max(items, 1) * 1000:8.2f}ms/item"
+        )
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Compare results to a baseline.
+
+    Args:
+        results (dict): the results of this run.
+        baseline (dict): the results of an earlier run.
+        tolerance (float): how much slower a benchmark may be before it
+            counts as a regression, e.g. 0.2 for 20%.
+
+    Returns:
+        (list[tuple[str, float, float, bool]]): name, baseline time,
+            current time and whether it is a regression, for each
+            benchmark found in both.
+    """
+    comparisons = []
+    for name, result in results["benchmarks"].items():
+        old = baseline["benchmarks"].get(name, {})
+        if "best" in result and "best" in old:
+            comparisons.append(
+                (
+                    name,
+                    old["best"],
+                    result["best"],
+                    result["best"] > old["best"] * (1 + tolerance),
+                )
+            )
+
+    return comparisons
+
+
+def print_comparison(comparisons):
+    """Print the comparison to a baseline."""
+    print(f"\n{'benchmark':<18} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, old, new, regression in comparisons:
+        print(
+            f"{name:<18} {old * 1000:8.1f}ms {new * 1000:8.1f}ms {new / old:7.2f}"
+            f"{'  SLOWER' if regression else ''}"
+        )
+
+
+def write_json(path, results):
+    """Write results to path."""
+    Path(path).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+def parse_options():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=40, help="Number of documents")
+    parser.add_argument(
+        "--paragraphs", type=int, default=30, help="Average paragraphs per document"
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--number", type=int, default=3, help="Runs of each benchmark")
+    parser.add_argument(
+        "--workdir",
+        help="Where the synthetic corpus is made. Default is a temporary "
+        "directory that is removed afterwards.",
+    )
+    parser.add_argument("--output", help="Write the results to this json file")
+    parser.add_argument(
+        "--baseline",
+        help="Compare the results to this json file. It is made if it does not exist.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Slowdown accepted before a benchmark counts as slower than "
+        "the baseline. Default is 0.2 (20%%).",
+    )
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help=f"Only run these benchmarks: {', '.join(CASES)}. Default is all.",
+    )
+
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    return args
+
+
+def run_suite(args, workdir):
+    """Generate the corpus in workdir and run the benchmarks."""
+    root = workdir / "corpus"
+    print(f"Generating {args.files} documents in {root}")
+    synthetic_corpus.generate(root, args.files, args.paragraphs, args.seed)
+    install_stand_ins(
+        workdir / "stand_ins", [synthetic_corpus.LANG, synthetic_corpus.PARALLEL_LANG]
+    )
+
+    return {
+        "corpus": {
+            "files": args.files,
+            "paragraphs": args.paragraphs,
+            "seed": args.seed,
+        },
+        "environment": {
+            "corpustools": get_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+        },
+        "benchmarks": run_cases(root, args.benchmarks or list(CASES), args.number),
+    }
+
+
+def main():
+    """Run the benchmarks and compare them to the baseline."""
+    args = parse_options()
+    if args.workdir is None:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run_suite(args, Path(workdir))
+    else:
+        results = run_suite(args, Path(args.workdir).resolve())
+
+    if args.output is not None:
+        write_json(args.output, results)
+
+    if args.baseline is None:
+        return
+
+    if not Path(args.baseline).exists():
+        write_json(args.baseline, results)
+        print(f"\nStored the results as the baseline in {args.baseline}")
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    if baseline["corpus"] != results["corpus"]:
+        sys.exit(
+            f"The baseline was made with another corpus: {baseline['corpus']}, "
+            f"this run used {results['corpus']}"
+        )
+
+    comparisons = compare(results, baseline, args.tolerance)
+    print_comparison(comparisons)
+    raise SystemExit(sum(regression for *_, regression in comparisons))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Generate a synthetic corpus for the benchmarks.
+
+A North Sámi corpus with Norwegian parallels is written to the given
+directory. Each document has
+
+* an original file, in one of the formats in FORMATS, and its metadata file
+* a converted file
+* an analysed file, with the analysis of the stand-in divvun-checker
+* a korp_mono file, made from the analysed file
+* a tmx file pairing the sentences of the Sámi and the Norwegian document
+
+Every tenth document is a near duplicate of the one before it.
+
+The same seed and scale always give the same corpus.
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+from lxml import etree
+
+from corpustools import korp_mono, tmx, xslsetter
+from corpustools.benchmarks import stand_ins
+from corpustools.corpuspath import make_corpus_path
+
+LANG = "sme"
+PARALLEL_LANG = "nob"
+VOCABULARY = {
+    "sme": (
+        "ja lea go ahte dat son mii sii dál eai ii leat bargu sámegiella "
+        "oahpahus skuvla mánát váhnemat suohkan stáhta guovlu gielda ráđđi "
+        "áigi jahki beaivi vuođđu čoahkkin ášši mearrádus láhka bargit ođđa "
+        "boares stuorra unna buorre giella gáldu duottar johka vuovdi "
+        "boazodoallu guolástus dearvvašvuohta girjjit čálli lohkki ođđasat "
+        "sámediggi ovttas čállit lohkat oahppat bargat árvalit mearridit "
+        "ovdánahttit gáhttet ságastallat juohkit"
+    ).split(),
+    "nob": (
+        "og er det at som på for med til av ikke en et den har de om var "
+        "skolen barna foreldrene kommunen staten regionen rådet tiden året "
+        "dagen grunnlaget møtet saken vedtaket loven arbeiderne ny gammel "
+        "stor liten god språket kilden fjellet elva skogen reindriften "
+        "fisket helsen bøkene forfatteren leseren nyhetene sametinget "
+        "sammen skrive lese lære arbeide foreslå bestemme utvikle verne "
+        "samtale dele"
+    ).split(),
+}
+GENRES = ["admin", "facta", "news", "laws"]
+ENDINGS = [".", ".", ".", ".", "?", "!"]
+YEARS = ["2001", "2012", "2019", "2024"]
+# Documents are grouped in directories of this size, and the last
+# document in each group is a near duplicate of the one before it
+GROUP_SIZE = 10
+
+
+def make_sentence(rng, words, length):
+    """Make a sentence of length random words."""
+    sentence = " ".join(rng.choice(words) for _ in range(length))
+
+    return f"{sentence[0].upper()}{sentence[1:]}{rng.choice(ENDINGS)}"
+
+
+def make_documents(seed, index, paragraphs):
+    """Make the paragraphs of a document and its parallel.
+
+    The documents have the same number of paragraphs, sentences and
+    words per sentence, so that the sentences can be paired.
+
+    Args:
+        seed (int): the seed of the corpus.
+        index (int): the number of the document in the corpus.
+        paragraphs (int): the average number of paragraphs.
+
+    Returns:
+        (dict[str, list[list[str]]]): the sentences of each paragraph of
+            the documents, for each language.
+    """
+    shape_rng = random.Random(f"{seed}:{index}")
+    shape = [
+        [shape_rng.randint(3, 18) for _ in range(shape_rng.randint(1, 6))]
+        for _ in range(shape_rng.randint(paragraphs // 2 + 1, paragraphs * 3 // 2 + 1))
+    ]
+
+    documents = {}
+    for lang in [LANG, PARALLEL_LANG]:
+        rng = random.Random(f"{seed}:{index}:{lang}")
+        documents[lang] = [
+            [make_sentence(rng, VOCABULARY[lang], length) for length in lengths]
+            for lengths in shape
+        ]
+
+    return documents
+
+
+def near_duplicate(seed, index, document):
+    """Change one word in each paragraph of a copy of document."""
+    rng = random.Random(f"{seed}:{index}:duplicate")
+    duplicate = []
+    for sentences in document:
+        changed = list(sentences)
+        words = changed[-1].split()
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY[LANG])
+        changed[-1] = " ".join(words)
+        duplicate.append(changed)
+
+    return duplicate
+
+
+def paragraph_texts(document):
+    """Join the sentences of each paragraph."""
+    return [" ".join(sentences) for sentences in document]
+
+
+def write_txt(path, document):
+    """Write document as a plain text file."""
+    path.write_text("\n\n".join(paragraph_texts(document)) + "\n", encoding="utf-8")
+
+
+def write_html(path, document):
+    """Write document as a html file."""
+    html = etree.Element("html")
+    head = etree.SubElement(html, "head")
+    etree.SubElement(head, "title").text = document[0][0]
+    body = etree.SubElement(html, "body")
+    etree.SubElement(body, "h1").text = document[0][0]
+    for text in paragraph_texts(document[1:]):
+        etree.SubElement(body, "p").text = text
+    path.write_bytes(etree.tostring(html, encoding="utf-8", method="html"))
+
+
+def write_sfm(path, document):
+    """Write document as a bible sfm file, one chapter per paragraph."""
+    lines = ["\\id GEN Synthetic", f"\\mt1 {document[0][0]}"]
+    for chapter, sentences in enumerate(document[1:], start=1):
+        lines.extend([f"\\c {chapter}", "\\p"])
+        lines.extend(
+            f"\\v {verse} {sentence}"
+            for verse, sentence in enumerate(sentences, start=1)
+        )
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def write_usx(path, document):
+    """Write document as a bible usx file, one chapter per paragraph."""
+    usx = etree.Element("usx", version="3.0")
+    etree.SubElement(usx, "book", code="GEN", style="id").text = "Synthetic"
+    etree.SubElement(usx, "para", style="mt1").text = document[0][0]
+    for chapter, sentences in enumerate(document[1:], start=1):
+        etree.SubElement(usx, "chapter", number=str(chapter), style="c")
+        para = etree.SubElement(usx, "para", style="p")
+        for verse, sentence in enumerate(sentences, start=1):
+            etree.SubElement(
+                para, "verse", number=str(verse), style="v"
+            ).tail = f"{sentence} "
+    path.write_bytes(etree.tostring(usx, encoding="utf-8", xml_declaration=True))
+
+
+FORMATS = {
+    ".txt": write_txt,
+    ".html": write_html,
+    ".sfm": write_sfm,
+    ".usx": write_usx,
+}
+
+
+def write_metadata(orig, parallel_lang, parallel_name, year):
+    """Write the metadata file of an original file."""
+    metadata = xslsetter.MetadataHandler(Path(f"{orig}.xsl"), create=True)
+    metadata.set_variable("conversion_status", "standard")
+    metadata.set_variable("year", year)
+    metadata.set_parallel_text(parallel_lang, parallel_name)
+    metadata.write_file()
+
+
+def make_converted(corpus_path, document):
+    """Make a converted document.
+
+    Args:
+        corpus_path (CorpusPath): the path of the original file.
+        document (list[list[str]]): the sentences of the paragraphs.
+
+    Returns:
+        (etree.Element): the converted document.
+    """
+    root = etree.Element("document", id="no_id")
+    root.set("{http://www.w3.org/XML/1998/namespace}lang", corpus_path.lang)
+    header = etree.SubElement(root, "header")
+    etree.SubElement(header, "title").text = document[0][0]
+    etree.SubElement(header, "genre", code=corpus_path.filepath.parts[0])
+    etree.SubElement(etree.SubElement(header, "author"), "unknown")
+    etree.SubElement(header, "year").text = corpus_path.metadata.get_variable("year")
+    etree.SubElement(header, "wordcount").text = str(
+        sum(len(sentence.split()) for sentences in document for sentence in sentences)
+    )
+    etree.SubElement(header, "conversion_status", type="standard")
+    for (
+        parallel_lang,
+        parallel_name,
+    ) in corpus_path.metadata.get_parallel_texts().items():
+        parallel = etree.SubElement(header, "parallel_text", location=parallel_name)
+        parallel.set("{http://www.w3.org/XML/1998/namespace}lang", parallel_lang)
+    header.tail = "\n"
+    body = etree.SubElement(root, "body")
+    body.text = "\n"
+    for text in paragraph_texts(document):
+        etree.SubElement(body, "p").text = text
+        body[-1].tail = "\n"
+
+    return root
+
+
+def make_analysed(converted, document):
+    """Make the analysed document of a converted document.
+
+    Args:
+        converted (etree.Element): the converted document.
+        document (list[list[str]]): the sentences of the paragraphs.
+
+    Returns:
+        (etree.Element): the analysed document.
+    """
+    analysed = etree.fromstring(etree.tostring(converted))
+    body = analysed.find("body")
+    body.clear()
+    dependency = etree.SubElement(body, "dependency")
+    dependency.text = etree.CDATA(
+        stand_ins.analyse_text(
+            "".join(f"{text} ¶\n" for text in paragraph_texts(document))
+        )
+    )
+
+    return analysed
+
+
+def write_xml(path, root):
+    """Write an xml document, making its directory if needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(etree.tostring(root, encoding="utf-8", xml_declaration=True))
+
+
+def write_document(directory, seed, index, documents):
+    """Write the files of a document and its parallel.
+
+    Args:
+        directory (Path): the directory of the corpus.
+        seed (int): the seed of the corpus.
+        index (int): the number of the document in the corpus.
+        documents (dict[str, list[list[str]]]): the sentences of each
+            paragraph of the documents, for each language.
+
+    Returns:
+        (Path): the original file of the Sámi document.
+    """
+    suffix = list(FORMATS)[index % len(FORMATS)]
+    genre = GENRES[index // GROUP_SIZE % len(GENRES)]
+    year = YEARS[index % len(YEARS)]
+    name = f"doc{index:04}{suffix}"
+    origs = {}
+    for lang, parallel_lang in [(LANG, PARALLEL_LANG), (PARALLEL_LANG, LANG)]:
+        orig = directory / f"corpus-{lang}-orig" / genre / f"synthetic{seed}" / name
+        orig.parent.mkdir(parents=True, exist_ok=True)
+        FORMATS[suffix](orig, documents[lang])
+        write_metadata(orig, parallel_lang, name, year)
+
+        corpus_path = make_corpus_path(orig)
+        converted = make_converted(corpus_path, documents[lang])
+        write_xml(corpus_path.converted, converted)
+        write_xml(corpus_path.analysed, make_analysed(converted, documents[lang]))
+        korp_mono.process_file(corpus_path.analysed.as_posix())
+        origs[lang] = corpus_path
+
+    sentence_pairs = tuple(
+        [sentence for sentences in documents[lang] for sentence in sentences]
+        for lang in [LANG, PARALLEL_LANG]
+    )
+    write_xml(
+        origs[LANG].tmx(PARALLEL_LANG),
+        tmx.make_tmx(name, LANG, PARALLEL_LANG, sentence_pairs),
+    )
+
+    return origs[LANG].orig
+
+
+def generate(directory, files, paragraphs, seed):
+    """Generate a synthetic corpus.
+
+    Args:
+        directory (Path): the corpus directories are made here.
+        files (int): the number of Sámi documents. Each of them gets a
+            Norwegian parallel.
+        paragraphs (int): the average number of paragraphs per document.
+        seed (int): the seed of the random generator.
+
+    Returns:
+        (list[Path]): the original files of the Sámi documents.
+    """
+    origs = []
+    documents = None
+    for index in range(files):
+        if documents is not None and index % GROUP_SIZE == GROUP_SIZE - 1:
+            documents = {
+                LANG: near_duplicate(seed, index, documents[LANG]),
+                PARALLEL_LANG: documents[PARALLEL_LANG],
+            }
+        else:
+            documents = make_documents(seed, index, paragraphs)
+        origs.append(write_document(Path(directory), seed, index, documents))
+
+    return origs
+
+
+def parse_options():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=40, help="Number of documents")
+    parser.add_argument(
+        "--paragraphs", type=int, default=30, help="Average paragraphs per document"
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("directory", help="Where the corpus directories are made")
+
+    return parser.parse_args()
+
+
+def main():
+    """Generate a synthetic corpus."""
+    args = parse_options()
+    origs = generate(args.directory, args.files, args.paragraphs, args.seed)
+    print(f"Generated {len(origs)} documents with parallels in {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
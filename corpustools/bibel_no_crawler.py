@@ -21,19 +21,43 @@ import functools
 import os
 from datetime import datetime
 
-import requests
 from lxml import etree, html
 
 from corpustools import corpuspath, namechanger, util
+from corpustools.crawl_engine import CrawlEngine
+
+
+@functools.cache
+def crawl_engine():
+    """The engine fetching pages from bibel.no."""
+    return CrawlEngine(
+        cache_dir=os.path.join(os.getenv("GTBOUND"), "tmp", "http_cache")
+    )
 
 
 @functools.lru_cache
 def fetch_page(address):
     """Fetch a page."""
-    main_content = requests.get(address)
+    main_content = crawl_engine().fetch(address)
     return html.document_fromstring(main_content.text)
 
 
+def fetch_pages(addresses):
+    """Fetch pages concurrently.
+
+    Args:
+        addresses (iterable of str): the addresses of the pages.
+
+    Returns:
+        (dict[str, lxml.html.HtmlElement]): the pages that could be fetched.
+    """
+    return {
+        address: html.document_fromstring(response.text)
+        for address, response in crawl_engine().fetch_all(addresses)
+        if response is not None
+    }
+
+
 def get_books(tree):
     """Get the addresses for the books on bible.no."""
     books = {"ot": [], "nt": []}
@@ -133,11 +157,18 @@ def fetch_other_languages(book_name, bookindex, chapternumber, address):
         "smj": "lulesamisk",
     }
 
+    addresses = {
+        lang: f'{address.replace("bokmal11", languages[lang])}'
+        for lang in ["nob", "sme", "smj", "sma"]
+    }
+    pages = fetch_pages(addresses.values())
+
     parallels = []
-    for lang in ["nob", "sme", "smj", "sma"]:
-        new_address = f'{address.replace("bokmal11", languages[lang])}'
+    for lang, new_address in addresses.items():
         # first_page = html.parse("nob_mat11.html")
-        first_page = fetch_page(new_address)
+        first_page = pages.get(new_address)
+        if first_page is None:
+            continue
         body = get_verses(first_page)
         if body is not None:
             header = first_page.find(".//h1").text.strip()
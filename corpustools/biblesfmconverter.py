@@ -21,16 +21,19 @@ import re
 
 from lxml import etree
 
-# The marker at the start of a line, e.g. \p, \mt1 or \v
-LINE_MARKER_RE = re.compile(r"\s*\\(?P<name>[a-z]+[0-9]*)\s*")
+# The marker at the start of a line, e.g. \p, \mt1 or \v. The verse number
+# following a \v marker is consumed along with the marker.
+LINE_MARKER_RE = re.compile(
+    r"\s*\\(?:(?P<verse>v)(?![a-z0-9])\s*(?:[0-9]+[-0-9]*\s*)?"
+    r"|(?P<name>[a-z]+[0-9]*)\s*)"
+)
 
 # Footnotes (\f … \f*), cross references (\x … \x*) and published verse
 # numbers (\vp … \vp*) are not part of the running text, so everything from
 # the opening to the closing marker is thrown away.
 NOTE_RE = re.compile(r"\\(f|x|vp)\b.*?\\\1\*", re.DOTALL)
 
-# The verse number following a \v marker
-VERSE_NUMBER_RE = re.compile(r"^[0-9]+[-0-9]*\s*")
+COMBINING_MACRON = "\u0304"
 
 # Letters written with a combining macron in the 1895 bible, but with a
 # caron in modern orthography
@@ -74,13 +77,16 @@ def clean_text(text):
     Returns:
         (str): the normalised string.
     """
-    return macron_to_caron(" ".join(text.split()))
+    text = " ".join(text.split())
+    return macron_to_caron(text) if COMBINING_MACRON in text else text
 
 
 def parse_line(line):
     """Split an sfm line into its marker and its text.
 
-    Footnotes and cross references are removed from the text.
+    Footnotes and cross references are removed from the text, and so is
+    the verse number of a \\v line. The text of ignored markers is not
+    cleaned, since it is thrown away.
 
     Args:
         line (str): a line from an sfm file.
@@ -89,41 +95,64 @@ def parse_line(line):
         (tuple[str | None, str]): the name of the marker (None if the line
             does not start with a marker) and the text of the line.
     """
-    line = NOTE_RE.sub("", line)
+    # A note needs both an opening and a closing marker
+    if line.count("\\") > 1:
+        line = NOTE_RE.sub("", line)
     match = LINE_MARKER_RE.match(line)
 
     if match is None:
         return None, clean_text(line)
 
-    return match.group("name"), clean_text(line[match.end() :])
+    name = match.group("verse") or match.group("name")
+    if name in IGNORED_MARKERS:
+        return name, ""
 
+    return name, clean_text(line[match.end() :])
 
-def add_text(paragraph, text):
-    """Add text to a p element, one verse per line.
+
+def add_paragraph(body, section, text):
+    """Add a p element with text to a section.
+
+    Sections are added to the body when they get their first p element,
+    so that chapters without text are left out.
 
     Args:
-        paragraph (lxml.etree.Element): a Giella xml p element.
-        text (str): the text that should be added.
+        body (lxml.etree.Element): a Giella xml body element.
+        section (lxml.etree.Element): the section of the current chapter.
+        text (str): the text of the p element.
+
+    Returns:
+        (lxml.etree.Element): the new p element.
     """
-    if not text:
-        return
+    if section.getparent() is None:
+        body.append(section)
+
+    paragraph = etree.SubElement(section, "p")
+    paragraph.text = text
 
-    paragraph.text = f"{paragraph.text}\n{text}" if paragraph.text else text
+    return paragraph
 
 
-def remove_empty(body):
-    """Remove p and section elements without text from the body.
+def add_heading(body, section, marker, text):
+    """Add a title or a chapter summary to a section.
 
     Args:
         body (lxml.etree.Element): a Giella xml body element.
-    """
-    for paragraph in body.findall(".//p"):
-        if paragraph.text is None:
-            paragraph.getparent().remove(paragraph)
+        section (lxml.etree.Element): the section of the current chapter.
+        marker (str): the name of the marker of the line.
+        text (str): the text of the line.
 
-    for section in body.findall("section"):
-        if not len(section):
-            body.remove(section)
+    Raises:
+        UserWarning: if marker is unknown.
+    """
+    if marker in TITLE_MARKERS:
+        if text:
+            add_paragraph(body, section, text).set("type", "title")
+    elif marker == SUMMARY_MARKER:
+        if text:
+            add_paragraph(body, section, text)
+    else:
+        raise UserWarning(f"Unknown sfm marker: \\{marker}")
 
 
 def parse_sfm(lines):
@@ -133,6 +162,11 @@ def parse_sfm(lines):
     is a line. Titles end the p element, so a chapter with titles in the
     middle of it gets one p element per title.
 
+    The document is made in one pass over the lines. The verses of a p
+    element are collected until the p element ends, and elements are
+    only made when they get text, so empty ones never have to be
+    removed.
+
     Args:
         lines (collections.abc.Iterable[str]): the lines of an sfm file.
 
@@ -141,8 +175,8 @@ def parse_sfm(lines):
     """
     document = etree.Element("document")
     body = etree.SubElement(document, "body")
-    section = etree.SubElement(body, "section")
-    paragraph = None
+    section = etree.Element("section")
+    verses = []
 
     for line in lines:
         marker, text = parse_line(line)
@@ -150,28 +184,22 @@ def parse_sfm(lines):
         if marker in IGNORED_MARKERS:
             continue
 
+        if marker == "v" or marker in TEXT_MARKERS or marker is None:
+            if text:
+                verses.append(text)
+            continue
+
+        if verses:
+            add_paragraph(body, section, "\n".join(verses))
+            verses = []
+
         if marker == "c":
-            section = etree.SubElement(body, "section")
-            paragraph = None
-        elif marker in TITLE_MARKERS:
-            title = etree.SubElement(section, "p")
-            title.set("type", "title")
-            add_text(title, text)
-            paragraph = None
-        elif marker == SUMMARY_MARKER:
-            summary = etree.SubElement(section, "p")
-            add_text(summary, text)
-            paragraph = None
-        elif marker in TEXT_MARKERS or marker == "v" or marker is None:
-            if marker == "v":
-                text = VERSE_NUMBER_RE.sub("", text)
-            if paragraph is None:
-                paragraph = etree.SubElement(section, "p")
-            add_text(paragraph, text)
+            section = etree.Element("section")
         else:
-            raise UserWarning(f"Unknown sfm marker: \\{marker}")
+            add_heading(body, section, marker, text)
 
-    remove_empty(body)
+    if verses:
+        add_paragraph(body, section, "\n".join(verses))
 
     return document
 
@@ -0,0 +1,372 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Keep a catalog of the corpus files in an sqlite database.
+
+The CorpusCatalog knows the original files of the corpus, the variables
+set in their metadata files, their parallel files, whether they have
+been converted and analysed, and the word count of the converted files.
+
+The catalog is refreshed incrementally: a metadata file is only parsed
+when its modification time has changed, and a converted file is only
+read when it has changed, so tools can ask questions about the whole
+corpus without parsing every file each time.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+from lxml import etree
+
+from corpustools import compression, util, xslsetter
+from corpustools.corpuspath import CORPUS_DIR_RE, make_corpus_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    orig TEXT PRIMARY KEY,
+    lang TEXT,
+    orig_exists INTEGER NOT NULL,
+    xsl_mtime INTEGER,
+    converted TEXT,
+    converted_mtime INTEGER,
+    wordcount INTEGER,
+    analysed TEXT,
+    analysed_mtime INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS variables (
+    orig TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (orig, name)
+);
+CREATE INDEX IF NOT EXISTS variable_values ON variables (name, value);
+CREATE TABLE IF NOT EXISTS parallels (
+    orig TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    parallel TEXT NOT NULL,
+    PRIMARY KEY (orig, lang)
+);
+"""
+
+
+def catalog_path(directory):
+    """Find the default location of the catalog of a corpus directory.
+
+    The catalog is kept in the tmp directory next to the corpus
+    directories, where the crawlers keep their state too.
+
+    Args:
+        directory (str|Path): a directory inside a corpus.
+
+    Returns:
+        (Path): path to the catalog database.
+
+    Raises:
+        ValueError: if directory is not part of a corpus.
+    """
+    corpus_match = CORPUS_DIR_RE.search(f"{Path(directory).resolve().as_posix()}/")
+    if corpus_match is None:
+        raise ValueError(f"Directory is not part of a corpus: {directory}")
+
+    return Path(corpus_match.group("parent")) / "tmp" / "corpus_catalog.sqlite"
+
+
+def mtime(path):
+    """Get the modification time of path in nanoseconds, None if it is missing."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+def read_wordcount(converted):
+    """Read the word count from the header of a converted file.
+
+    Only the header is parsed.
+
+    Args:
+        converted (str): path to a converted file.
+
+    Returns:
+        (int|None): the word count, or None if the file has none.
+    """
+    try:
+        for _, element in compression.iterparse(
+            converted, events=("start", "end"), tag=("wordcount", "body")
+        ):
+            if element.tag == "body":
+                return None
+            if element.text is not None:
+                return int(float(element.text))
+    except (etree.XMLSyntaxError, ValueError):
+        pass
+
+    return None
+
+
+def find_origs(directory):
+    """Find the original files and metadata files in an orig directory.
+
+    Args:
+        directory (Path): a directory in an orig corpus directory.
+
+    Returns:
+        (dict[str, tuple[bool, int|None]]): the paths of the original
+            files, whether they exist, and the modification times of
+            their metadata files.
+    """
+    xsl_mtimes = {}
+    origs = set()
+    for root, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [dirname for dirname in dirnames if dirname != ".git"]
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if filename.endswith(".xsl"):
+                xsl_mtimes[path[: -len(".xsl")]] = mtime(path)
+            else:
+                origs.add(path)
+
+    return {
+        orig: (orig in origs, xsl_mtimes.get(orig)) for orig in origs.union(xsl_mtimes)
+    }
+
+
+def path_range(directory):
+    """The bounds of the paths inside directory, for range queries."""
+    return f"{directory}/", f"{directory}0"
+
+
+class CorpusCatalog:
+    """A catalog of the original files of a corpus."""
+
+    def __init__(self, db_path):
+        """Initialise the CorpusCatalog class.
+
+        Args:
+            db_path (str|Path): path to the sqlite database.
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def refresh(self, directory):
+        """Bring the catalog of the files in directory up to date.
+
+        Metadata files are parsed only if they are new or have changed,
+        and converted files are read only if they have changed.
+
+        Args:
+            directory (str|Path): a directory inside an orig corpus
+                directory.
+        """
+        directory = Path(directory).resolve().as_posix()
+        low, high = path_range(directory)
+        known = {
+            row["orig"]: row
+            for row in self.connection.execute(
+                "SELECT * FROM documents WHERE orig >= ? AND orig < ?", (low, high)
+            )
+        }
+        found = find_origs(directory)
+
+        with self.connection:
+            self.forget([orig for orig in known if orig not in found])
+            for orig, (orig_exists, xsl_mtime) in found.items():
+                row = known.get(orig)
+                if (
+                    row is None
+                    or row["xsl_mtime"] != xsl_mtime
+                    or bool(row["orig_exists"]) != orig_exists
+                ):
+                    self.add(orig, orig_exists, xsl_mtime)
+                else:
+                    self.update_outputs(row)
+
+    def add(self, orig, orig_exists, xsl_mtime):
+        """Read the metadata of an original file into the catalog.
+
+        Args:
+            orig (str): path to the original file.
+            orig_exists (bool): whether the original file exists.
+            xsl_mtime (int|None): modification time of the metadata file,
+                None if it does not exist.
+        """
+        variables = {}
+        parallels = {}
+        lang = converted = analysed = error = None
+        try:
+            corpus_path = make_corpus_path(orig)
+            lang = corpus_path.lang
+            converted = corpus_path.converted.as_posix()
+            analysed = corpus_path.analysed.as_posix()
+            if xsl_mtime is not None:
+                variables = dict(corpus_path.metadata.get_set_variables())
+                parallels = {
+                    language: corpus_path.parallel(language).as_posix()
+                    for language in corpus_path.metadata.get_parallel_texts()
+                }
+        except (ValueError, xslsetter.XsltError) as exception:
+            error = str(exception)
+            util.note(error)
+
+        converted_mtime = mtime(converted)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                orig,
+                lang,
+                int(orig_exists),
+                xsl_mtime,
+                converted,
+                converted_mtime,
+                read_wordcount(converted) if converted_mtime is not None else None,
+                analysed,
+                mtime(analysed),
+                error,
+            ),
+        )
+        self.connection.execute("DELETE FROM variables WHERE orig = ?", (orig,))
+        self.connection.executemany(
+            "INSERT INTO variables VALUES (?, ?, ?)",
+            ((orig, name, value) for name, value in variables.items()),
+        )
+        self.connection.execute("DELETE FROM parallels WHERE orig = ?", (orig,))
+        self.connection.executemany(
+            "INSERT INTO parallels VALUES (?, ?, ?)",
+            ((orig, language, parallel) for language, parallel in parallels.items()),
+        )
+
+    def update_outputs(self, row):
+        """Update the state of the converted and analysed files of a document.
+
+        Args:
+            row (sqlite3.Row): the catalog row of the document.
+        """
+        converted_mtime = mtime(row["converted"])
+        analysed_mtime = mtime(row["analysed"])
+        if converted_mtime != row["converted_mtime"]:
+            self.connection.execute(
+                "UPDATE documents SET converted_mtime = ?, wordcount = ? "
+                "WHERE orig = ?",
+                (
+                    converted_mtime,
+                    read_wordcount(row["converted"])
+                    if converted_mtime is not None
+                    else None,
+                    row["orig"],
+                ),
+            )
+        if analysed_mtime != row["analysed_mtime"]:
+            self.connection.execute(
+                "UPDATE documents SET analysed_mtime = ? WHERE orig = ?",
+                (analysed_mtime, row["orig"]),
+            )
+
+    def forget(self, origs):
+        """Remove original files from the catalog."""
+        for table in ["documents", "variables", "parallels"]:
+            self.connection.executemany(
+                f"DELETE FROM {table} WHERE orig = ?",
+                ((orig,) for orig in origs),
+            )
+
+    def documents(self, directory, **variables):
+        """Get the documents in directory.
+
+        Args:
+            directory (str|Path): a directory inside an orig corpus
+                directory.
+            variables (dict[str, str]): only get documents where these
+                metadata variables have these values.
+
+        Returns:
+            (list[sqlite3.Row]): the rows of the documents, ordered by
+                the path of the original file.
+        """
+        query = "SELECT documents.* FROM documents"
+        parameters = []
+        for index, (name, value) in enumerate(variables.items()):
+            query += (
+                f" JOIN variables AS v{index} ON v{index}.orig = documents.orig"
+                f" AND v{index}.name = ? AND v{index}.value = ?"
+            )
+            parameters.extend([name, value])
+        query += " WHERE documents.orig >= ? AND documents.orig < ? ORDER BY 1"
+        parameters.extend(path_range(Path(directory).resolve().as_posix()))
+
+        return self.connection.execute(query, parameters).fetchall()
+
+    def variables(self, orig):
+        """Get the metadata variables of an original file.
+
+        Args:
+            orig (str|Path): path to the original file.
+
+        Returns:
+            (dict[str, str]): the variables that are set.
+        """
+        return {
+            row["name"]: row["value"]
+            for row in self.connection.execute(
+                "SELECT name, value FROM variables WHERE orig = ?",
+                (Path(orig).resolve().as_posix(),),
+            )
+        }
+
+    def parallels(self, directory):
+        """Get the parallel files of the documents in directory.
+
+        Args:
+            directory (str|Path): a directory inside an orig corpus
+                directory.
+
+        Returns:
+            (list[sqlite3.Row]): orig, lang and parallel for each
+                parallel file named in a metadata file.
+        """
+        return self.connection.execute(
+            "SELECT orig, lang, parallel FROM parallels "
+            "WHERE orig >= ? AND orig < ? ORDER BY orig, lang",
+            path_range(Path(directory).resolve().as_posix()),
+        ).fetchall()
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+
+def open_catalog(directory, db_path=None):
+    """Open the catalog of directory and bring it up to date.
+
+    Args:
+        directory (str|Path): a directory inside an orig corpus directory.
+        db_path (str|Path|None): path to the database. Defaults to the
+            one found by catalog_path.
+
+    Returns:
+        (CorpusCatalog): the refreshed catalog.
+    """
+    catalog = CorpusCatalog(db_path if db_path is not None else catalog_path(directory))
+    catalog.refresh(directory)
+
+    return catalog
@@ -27,7 +27,7 @@ from traceback import print_exc
 
 from lxml import etree
 
-from corpustools import argparse_version
+from corpustools import argparse_version, compression
 from corpustools.corpuspath import CorpusPath
 from corpustools.orthographies import is_orthography_of, orthographies
 
@@ -409,14 +409,19 @@ class XMLPrinter:
         """
         self.filename = filename
         p = etree.XMLParser(huge_tree=True)
-        self.etree = etree.parse(filename, p)
+        self.etree = compression.parse(filename, p)
 
-    def process_file(self):
+    def process_file(self, buffer=None):
         """Process the given file, adding the text into buffer.
 
+        Args:
+            buffer (file-like|None): where the text is written. If None,
+                a new StringIO is used.
+
         Returns the buffer
         """
-        buffer = StringIO()
+        if buffer is None:
+            buffer = StringIO()
 
         self.handle_hyph()
         if self.dependency:
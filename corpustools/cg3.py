@@ -0,0 +1,283 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Incremental parser for the CG3 stream format found in analysed files.
+
+The dependency analysis of an analysed file looks like this:
+
+    "<Muhto>"
+    \t"muhto" CC @CVP #1->1
+    :
+    "<gaskkohagaid>"
+    \t"gaskkohagaid" Adv @ADVL> #2->12
+
+    "<¶>"
+    \t"¶" CLB #1->1
+
+Lines starting with "<...>" are cohorts, the tab indented lines under them
+are readings (deeper indentation means subreadings, e.g. compound parts),
+lines starting with : are hfst blanks and empty lines end a sentence.
+
+The parser works line by line, so only one sentence at a time is kept in
+memory.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from corpustools import compression
+
+COHORT_RE = re.compile(r'^"<(?P<wordform>.*)>"(?P<tags>.*)$')
+READING_RE = re.compile(r'^(?P<indent>\t+)"(?P<lemma>.*?)"(?=\s|$)(?P<tags>.*)$')
+ID_RE = re.compile(r"^#(?P<self_id>\d+)->(?P<parent_id>\d+)$")
+CDATA_START = "<dependency><![CDATA["
+CDATA_END = "]]></dependency>"
+# What lxml puts in a CDATA section to split it where the text has "]]>"
+CDATA_SPLIT = "]]><![CDATA["
+
+
+@dataclass
+class Reading:
+    """A reading of a cohort.
+
+    Attributes:
+        lemma: the lemma of the reading
+        tags: the morphological (and other) tags of the reading
+        function: the syntactic function, e.g. @SUBJ>, if any
+        self_id: the dependency id of the cohort, if any
+        parent_id: the dependency id of the head of the cohort, if any
+        line: the reading line as found in the analysis
+        subreadings: the readings on deeper indentation levels
+        extra_lines: lines belonging to the reading that are not readings
+    """
+
+    lemma: str
+    tags: list[str]
+    function: str | None
+    self_id: str | None
+    parent_id: str | None
+    line: str
+    subreadings: list[Reading] = field(default_factory=list)
+    extra_lines: list[str] = field(default_factory=list)
+
+    @property
+    def depth(self) -> int:
+        """The indentation level of the reading."""
+        return len(self.line) - len(self.line.lstrip("\t"))
+
+    @property
+    def unknown(self) -> bool:
+        """Whether the analyser did not recognise the wordform."""
+        return "?" in self.tags
+
+    @property
+    def text(self) -> str:
+        """The reading, its subreadings and extra lines as found in the analysis."""
+        return "\n".join(
+            [self.line]
+            + [subreading.text for subreading in self.subreadings]
+            + self.extra_lines
+        )
+
+    def all_readings(self) -> Iterator[Reading]:
+        """Yield this reading and all its subreadings."""
+        yield self
+        for subreading in self.subreadings:
+            yield from subreading.all_readings()
+
+
+@dataclass
+class Cohort:
+    """A cohort, a wordform with its readings.
+
+    Attributes:
+        wordform: the wordform
+        readings: the readings of the wordform
+        tags: static tags found on the wordform line
+        blanks: the hfst blank lines (starting with :) following the cohort
+    """
+
+    wordform: str
+    readings: list[Reading] = field(default_factory=list)
+    tags: str = ""
+    blanks: list[str] = field(default_factory=list)
+
+
+def make_reading(line: str) -> Reading | None:
+    """Make a reading from a reading line.
+
+    Args:
+        line: a line from the analysis, without the newline.
+
+    Returns:
+        The reading, or None if line is not a reading line.
+    """
+    match = READING_RE.match(line)
+    if match is None:
+        return None
+
+    tags = []
+    function = self_id = parent_id = None
+    for tag in match.group("tags").split():
+        if tag.startswith("@"):
+            function = tag
+            continue
+        ids = ID_RE.match(tag)
+        if ids is not None:
+            self_id, parent_id = ids.group("self_id", "parent_id")
+            continue
+        tags.append(tag)
+
+    return Reading(
+        lemma=match.group("lemma"),
+        tags=tags,
+        function=function,
+        self_id=self_id,
+        parent_id=parent_id,
+        line=line,
+    )
+
+
+def add_reading(cohort: Cohort, reading: Reading):
+    """Add reading to the cohort, as a subreading if it is indented deeper."""
+    parent = cohort.readings[-1] if cohort.readings else None
+    if parent is None or reading.depth <= parent.depth:
+        cohort.readings.append(reading)
+        return
+
+    while parent.subreadings and reading.depth > parent.subreadings[-1].depth:
+        parent = parent.subreadings[-1]
+    parent.subreadings.append(reading)
+
+
+def last_reading(cohort: Cohort) -> Reading | None:
+    """Find the most recently added (sub)reading of cohort."""
+    reading = cohort.readings[-1] if cohort.readings else None
+    while reading is not None and reading.subreadings:
+        reading = reading.subreadings[-1]
+
+    return reading
+
+
+def sentences(lines: Iterable[str]) -> Iterator[list[Cohort]]:
+    """Parse CG3 stream lines into sentences.
+
+    Empty lines end sentences, except for a run of two or more empty
+    lines directly following an empty blank line (a line with only :).
+
+    Args:
+        lines: lines of a dependency analysis, with or without newlines.
+
+    Yields:
+        The cohorts of each sentence.
+    """
+    sentence: list[Cohort] = []
+    empty_lines = 0
+    after_blank = False
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if not line.strip():
+            empty_lines += 1
+            continue
+
+        if empty_lines and sentence and not (after_blank and empty_lines > 1):
+            yield sentence
+            sentence = []
+        empty_lines = 0
+        after_blank = False
+
+        cohort_match = COHORT_RE.match(line)
+        if cohort_match is not None:
+            sentence.append(
+                Cohort(
+                    wordform=cohort_match.group("wordform"),
+                    tags=cohort_match.group("tags").strip(),
+                )
+            )
+        elif not sentence:
+            # Blanks and other lines before the first cohort belong nowhere
+            continue
+        elif line.startswith(":"):
+            sentence[-1].blanks.append(line)
+            after_blank = line.rstrip() == ":"
+        else:
+            reading = make_reading(line)
+            if reading is not None:
+                add_reading(sentence[-1], reading)
+            else:
+                previous = last_reading(sentence[-1])
+                if previous is not None:
+                    previous.extra_lines.append(line)
+
+    if sentence:
+        yield sentence
+
+
+def cohorts(lines: Iterable[str]) -> Iterator[Cohort]:
+    """Parse CG3 stream lines into cohorts, disregarding sentences."""
+    for sentence in sentences(lines):
+        yield from sentence
+
+
+def dependency_lines(filename: str | Path) -> Iterator[str]:
+    """Yield the lines of the dependency analysis of an analysed file.
+
+    The analysis is written as CDATA, so the lines are read directly from
+    the file, without parsing the xml. If the file has no such CDATA
+    section, the dependency element is found by parsing the file.
+    Sections that are split to store "]]>" are joined again.
+
+    Args:
+        filename: path to an analysed file.
+
+    Yields:
+        The lines of the dependency element, with newlines.
+    """
+    with compression.open_text(filename) as analysed:
+        for first_line in analysed:
+            start = first_line.find(CDATA_START)
+            if start != -1:
+                break
+        else:
+            yield from parsed_dependency_lines(filename)
+            return
+
+        line = first_line[start + len(CDATA_START) :]
+        while line:
+            end = line.find(CDATA_END)
+            if end != -1:
+                if line[:end]:
+                    yield line[:end].replace(CDATA_SPLIT, "")
+                return
+            yield line.replace(CDATA_SPLIT, "")
+            line = analysed.readline()
+
+
+def parsed_dependency_lines(filename: str | Path) -> Iterator[str]:
+    """Yield the lines of the dependency element found by parsing filename."""
+    for _, dependency in compression.iterparse(
+        filename, tag="dependency", huge_tree=True
+    ):
+        if dependency.text:
+            yield from dependency.text.splitlines(keepends=True)
+        dependency.clear()
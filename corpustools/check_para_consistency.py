@@ -20,8 +20,10 @@
 
 import argparse
 import os
+from collections import defaultdict
 
-from corpustools import argparse_version, corpuspath
+from corpustools import argparse_version
+from corpustools.catalog import open_catalog
 
 
 def parse_args():
@@ -31,6 +33,11 @@ def parse_args():
         "found in the metadata files exist",
     )
 
+    parser.add_argument(
+        "--catalog",
+        help="Path to the corpus catalog. Default is tmp/corpus_catalog.sqlite "
+        "next to the corpus directories.",
+    )
     parser.add_argument(
         "orig_dir", help="The directory where the original corpus " "files are"
     )
@@ -38,46 +45,41 @@ def parse_args():
     return parser.parse_args()
 
 
-def get_files(orig_dir):
-    return [
-        os.path.join(root, f)
-        for root, _, files in os.walk(orig_dir)
-        if ".git" not in root
-        for f in files
-        if not f.endswith(".xsl")
-    ]
-
-
 def main():
-    total = 0
     para_fail = 0
     no_orig_xsl = 0
     args = parse_args()
 
-    for orig in get_files(args.orig_dir):
-        total += 1
-        try:
-            orig_path = corpuspath.make_corpus_path(orig)
-        except ValueError as error:
+    catalog = open_catalog(args.orig_dir, args.catalog)
+    documents = [
+        document
+        for document in catalog.documents(args.orig_dir)
+        if document["orig_exists"]
+    ]
+    parallels = defaultdict(list)
+    for row in catalog.parallels(args.orig_dir):
+        parallels[row["orig"]].append(row["parallel"])
+    catalog.close()
+
+    for document in documents:
+        if document["error"] is not None:
             no_orig_xsl += 1
             print("***")
-            print(error)
+            print(document["error"])
             print("***")
-        else:
-            xsl_path = orig_path.xsl
-            if xsl_path.exists():
-                nonexisting_parallels = [
-                    parallel.as_posix()
-                    for parallel in orig_path.parallels()
-                    if not parallel.exists()
-                ]
+        elif document["xsl_mtime"] is not None:
+            nonexisting_parallels = [
+                parallel
+                for parallel in parallels[document["orig"]]
+                if not os.path.exists(parallel)
+            ]
 
-                if nonexisting_parallels:
-                    para_fail += len(nonexisting_parallels)
-                    print(f"{orig_path.xsl} points to non-existing file")
-                    print("\n".join({f"\t{p}" for p in nonexisting_parallels}))
-                    print()
-            else:
-                no_orig_xsl += 1
+            if nonexisting_parallels:
+                para_fail += len(nonexisting_parallels)
+                print(f"{document['orig']}.xsl points to non-existing file")
+                print("\n".join({f"\t{p}" for p in nonexisting_parallels}))
+                print()
+        else:
+            no_orig_xsl += 1
 
-    print(f"Total {total}, fails {para_fail}, {no_orig_xsl} files with no xsl")
+    print(f"Total {len(documents)}, fails {para_fail}, {no_orig_xsl} files with no xsl")
@@ -15,19 +15,36 @@
 #   Copyright © 2011-2023 The University of Tromsø & the Norwegian Sámi Parliament
 #   http://giellatekno.uit.no & http://divvun.no
 #
-"""Compare prestable tmx files to files produced by the parallelizer."""
+"""Compare prestable tmx files to files produced by the parallelizer.
+
+The goldstandard tmx files are the files in the stable/tmx directories
+of the corpora. For each of them, the source and parallel documents are
+aligned again, and the result is compared to the goldstandard.
+
+The tokenised sentences of the documents are cached, so that repeated
+runs only measure the aligner. Each run is recorded as a testrun element
+in the paragstesting file, with the precision and recall of the aligned
+sentence pairs, and the time the aligner used.
+"""
 
 
 import argparse
 import datetime
 import difflib
+import hashlib
+import json
 import os
 import sys
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
 
 from lxml import etree
 
-from corpustools import parallelize, util
+from corpustools import corpuspath, parallelize, sentencedivider, tmx, util
+from corpustools.common_arg_ncpus import NCpus
 
 
 class TmxComparator:
@@ -36,6 +53,7 @@ class TmxComparator:
     def __init__(self, want_tmx, got_tmx):
         self.want_tmx = want_tmx
         self.got_tmx = got_tmx
+        self._diff = None
 
     def get_lines_in_wantedfile(self):
         """Return the number of lines in the reference doc"""
@@ -50,9 +68,7 @@ class TmxComparator:
         """
         # Start at -1 because a unified diff always starts with a --- line
         num_diff_lines = -1
-        for line in difflib.unified_diff(
-            self.want_tmx.tmx_to_stringlist(), self.got_tmx.tmx_to_stringlist(), n=0
-        ):
+        for line in self.get_diff_as_text():
             if line[:1] == "-":
                 num_diff_lines += 1
 
@@ -60,13 +76,16 @@ class TmxComparator:
 
     def get_diff_as_text(self):
         """Return a stringlist containing the diff lines"""
-        diff = []
-        for line in difflib.unified_diff(
-            self.want_tmx.tmx_to_stringlist(), self.got_tmx.tmx_to_stringlist(), n=0
-        ):
-            diff.append(line)
+        if self._diff is None:
+            self._diff = list(
+                difflib.unified_diff(
+                    self.want_tmx.tmx_to_stringlist(),
+                    self.got_tmx.tmx_to_stringlist(),
+                    n=0,
+                )
+            )
 
-        return diff
+        return self._diff
 
     def get_lang_diff_as_text(self, lang):
         """Return a stringlist containing the diff lines"""
@@ -80,17 +99,234 @@ class TmxComparator:
 
         return diff
 
+    def get_link_counts(self):
+        """Count the sentence pairs of the two tmx documents.
+
+        Returns:
+            (tuple[int, int, int]): the number of sentence pairs in the
+                reference doc, in the doc to be tested, and in both.
+        """
+        lang1, lang2 = self.want_tmx.langs[:2]
+        want_links = Counter(self.want_tmx.links(lang1, lang2))
+        got_links = Counter(self.got_tmx.links(lang1, lang2))
+
+        return (
+            want_links.total(),
+            got_links.total(),
+            (want_links & got_links).total(),
+        )
+
+
+@dataclass
+class AlignmentResult:
+    """The result of aligning a goldstandard document pair."""
+
+    name: str
+    gspairs: int
+    diffpairs: int
+    alignedpairs: int
+    correctpairs: int
+    sentences: int
+    seconds: float
+
+    @property
+    def precision(self):
+        """The share of the aligned sentence pairs found in the goldstandard."""
+        return self.correctpairs / self.alignedpairs if self.alignedpairs else 0.0
+
+    @property
+    def recall(self):
+        """The share of the goldstandard sentence pairs that were aligned."""
+        return self.correctpairs / self.gspairs if self.gspairs else 0.0
+
+    @property
+    def sentences_per_second(self):
+        return self.sentences / self.seconds if self.seconds else 0.0
+
+    def attributes(self):
+        """Make the attributes of the file element of this result."""
+        return {
+            "name": self.name,
+            "gspairs": str(self.gspairs),
+            "diffpairs": str(self.diffpairs),
+            "alignedpairs": str(self.alignedpairs),
+            "precision": f"{self.precision:.4f}",
+            "recall": f"{self.recall:.4f}",
+            "sentences": str(self.sentences),
+            "seconds": f"{self.seconds:.3f}",
+            "sentences_per_second": f"{self.sentences_per_second:.1f}",
+        }
+
+
+class SentenceCache:
+    """Keep the tokenised sentences of converted documents on disk.
+
+    A cache entry is used as long as the converted document has not
+    changed since the entry was written.
+    """
+
+    def __init__(self, cache_dir):
+        """Initialise the SentenceCache class.
+
+        Args:
+            cache_dir (str|Path): the directory of the cache.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, converted):
+        """The path to the cache entry of a converted document."""
+        return (
+            self.cache_dir
+            / f"{hashlib.sha256(str(converted).encode('utf-8')).hexdigest()}.json"
+        )
+
+    def sentences(self, corpus_path):
+        """Get the tokenised sentences of a document.
+
+        Args:
+            corpus_path (corpuspath.CorpusPath): the document.
+
+        Returns:
+            (list[str]): the sentences of the converted document.
+        """
+        converted = corpus_path.converted
+        mtime = converted.stat().st_mtime_ns
+        entry_path = self.path(converted)
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+            if entry["path"] == str(converted) and entry["mtime"] == mtime:
+                return entry["sentences"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        sentences = sentencedivider.make_valid_sentences(corpus_path)
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {"path": str(converted), "mtime": mtime, "sentences": sentences},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, entry_path)
+
+        return sentences
+
+
+def goldstandard_pair(gold_tmx):
+    """Find the documents a goldstandard tmx file was made from.
+
+    Args:
+        gold_tmx (Path): a tmx file in the stable/tmx directory of a corpus.
+
+    Returns:
+        (tuple[corpuspath.CorpusPath, corpuspath.CorpusPath]): the source
+            and parallel documents.
+
+    Raises:
+        ValueError: if the source document has no parallel.
+    """
+    source_path = corpuspath.make_corpus_path(gold_tmx.as_posix())
+    para_lang = gold_tmx.relative_to(
+        source_path.corpus_dir(module="stable/tmx") / "stable" / "tmx"
+    ).parts[0]
+    para_parallel = source_path.parallel(para_lang)
+    if para_parallel is None:
+        raise ValueError(f"{source_path.orig} has no parallel file in {para_lang}")
+
+    return source_path, corpuspath.make_corpus_path(para_parallel.as_posix())
+
+
+def align_goldstandard(gold_tmx, anchor_file, work_dir, date):
+    """Align the documents of a goldstandard tmx file, and compare.
+
+    The diffs between the goldstandard and the new alignment are
+    written to a jspwiki file in work_dir.
+
+    Args:
+        gold_tmx (Path): a goldstandard tmx file.
+        anchor_file (str): the anchor word list of the language pair.
+        work_dir (Path): directory for the sentence cache, the aligned
+            tmx files and the diffs.
+        date (str): the date of the test run.
+
+    Returns:
+        (AlignmentResult): the quality and timing of the alignment.
+    """
+    source_path, para_path = goldstandard_pair(gold_tmx)
+    cache = SentenceCache(work_dir / "sentences")
+    sentences_tuple = (cache.sentences(source_path), cache.sentences(para_path))
+
+    got_tmx_file = work_dir / "tmx" / para_path.lang / gold_tmx.name
+    got_tmx_file.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    parallelize.align_sentences(
+        sentences_tuple=sentences_tuple,
+        language_pair=(source_path.lang, para_path.lang),
+        tmx_path=got_tmx_file,
+        anchor_file=anchor_file,
+    )
+    seconds = time.perf_counter() - start
+
+    comparator = TmxComparator(
+        tmx.Tmx(etree.parse(gold_tmx)), tmx.Tmx(etree.parse(got_tmx_file))
+    )
+    gspairs, alignedpairs, correctpairs = comparator.get_link_counts()
+    write_diff_files(
+        comparator,
+        (source_path.lang, para_path.lang),
+        work_dir / f"{gold_tmx.stem}_{date}.jspwiki",
+    )
+
+    return AlignmentResult(
+        name=gold_tmx.stem,
+        gspairs=gspairs,
+        diffpairs=comparator.get_number_of_differing_lines(),
+        alignedpairs=alignedpairs,
+        correctpairs=correctpairs,
+        sentences=sum(len(sentences) for sentences in sentences_tuple),
+        seconds=seconds,
+    )
+
+
+def write_diff_files(comparator, langs, diff_path):
+    """Write diffs to a jspwiki file"""
+    print(f"write_diff_files {diff_path}")
+    with open(diff_path, "w") as diff_file:
+        diff_file.write(f"!!!{diff_path.name}\n")
+        diff_file.write("!!TMX diff\n{{{\n")
+        diff_file.writelines(comparator.get_diff_as_text())
+        for lang in langs:
+            diff_file.write(f"\n}}}}}}\n!!{lang} diff\n{{{{{{\n")
+            diff_file.writelines(comparator.get_lang_diff_as_text(lang))
+        diff_file.write("\n}}}\n")
+
+
+def find_goldstandard_tmx_files(sources):
+    """Find the goldstandard tmx files in sources.
+
+    Args:
+        sources (list[str]): tmx files, or directories to search for them.
+
+    Returns:
+        (list[Path]): the tmx files found in stable/tmx directories.
+    """
+    return sorted(
+        path
+        for path in corpuspath.collect_files(sources, suffix=".tmx")
+        if "/stable/tmx/" in path.as_posix()
+    )
+
 
 class TmxGoldstandardTester:
     """A class to test the alignment pipeline against the tmx goldstandard"""
 
     def __init__(self, testresult_filename, dateformat_addition=None):
-        """Set the name where the testresults should be written
-
-        Find all goldstandard tmx files
-        """
+        """Set the name where the testresults should be written"""
         self.number_of_diff_lines = 0
         self.testresult_writer = TmxTestDataWriter(testresult_filename)
+        self.work_dir = Path(testresult_filename).parent / "tca2testing"
         if dateformat_addition is None:
             self.date = self.dateformat()
         else:
@@ -110,26 +346,42 @@ class TmxGoldstandardTester:
 
         return d.strftime("%Y%m%d-%H%M")
 
-    def run_test(self):
+    def run_test(self, sources, ncpus=1):
         """Make a testrun element.
 
         This element contain the result of the test.
-        """
-        testrun = self.testresult_writer.make_testrun_element(self.date)
 
-        paralang = ""
-        # Go through each tmx goldstandard file
-        for want_tmx_file in self.find_goldstandard_tmx_files():
-            print(f"testing {want_tmx_file} …")
+        Args:
+            sources (list[str]): goldstandard tmx files, or directories
+                to search for them.
+            ncpus (int): the number of document pairs aligned at a time.
+        """
+        start = time.perf_counter()
+        tasks = []
+        for gold_tmx in find_goldstandard_tmx_files(sources):
+            print(f"testing {gold_tmx} …")
+            try:
+                source_path, para_path = goldstandard_pair(gold_tmx)
+            except ValueError as error:
+                util.note(error)
+                continue
+            tasks.append(
+                (
+                    gold_tmx,
+                    parallelize.get_dictionary(source_path.lang, para_path.lang),
+                )
+            )
 
-            # Calculate the parallel lang, to be used in parallelization
-            if want_tmx_file.find("nob2sme") > -1:
-                paralang = "sme"
-            else:
-                paralang = "nob"
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        results = self.align_all(tasks, ncpus)
 
-            # Align files
-            self.align_files(testrun, want_tmx_file, paralang, aligner="tca2")
+        testrun = self.testresult_writer.make_testrun_element(self.date)
+        for result in results:
+            self.set_number_of_diff_lines(result.diffpairs)
+            testrun.append(
+                self.testresult_writer.make_file_element(**result.attributes())
+            )
+        self.set_run_metrics(testrun, results, time.perf_counter() - start, ncpus)
 
         # All files have been tested, insert this run at the top of the
         # paragstest element
@@ -137,84 +389,51 @@ class TmxGoldstandardTester:
         # Write data to file
         self.testresult_writer.write_paragstesting_data()
 
-    def align_files(self, testrun, want_tmx_file, paralang, aligner):
-        """Align files
-
-        Compare the tmx's of the result of this parallellization and
-        the tmx of the goldstandard file
-        Write the result to a file
-        Write the diffs of these to tmx's to a separate file
-        """
-
-        # Compute the name of the main file to parallelize
-        xml_file = self.compute_xmlfilename(want_tmx_file)
-
-        parallelizer = parallelize.Parallelize(xml_file, paralang)
-        got_tmx = parallelizer.parallelize_files()
-
-        # This is the tmx element fetched from the goldstandard file
-        want_tmx = parallelize.Tmx(etree.parse(want_tmx_file))
+    def align_all(self, tasks, ncpus):
+        """Align the goldstandard document pairs.
 
-        # Instantiate a comparator with the two tmxes
-        comparator = TmxComparator(want_tmx, got_tmx)
+        Args:
+            tasks (list[tuple[Path, str]]): the goldstandard tmx files and
+                the anchor files of their language pairs.
+            ncpus (int): the number of document pairs aligned at a time.
 
-        # Make a file_element for our results file
-        file_element = self.testresult_writer.make_file_element(
-            filelist[0].get_basename(),
-            str(comparator.get_lines_in_wantedfile()),
-            str(comparator.get_number_of_differing_lines()),
+        Returns:
+            (list[AlignmentResult]): the results, in the order of tasks.
+        """
+        arguments = (
+            [gold_tmx for gold_tmx, _ in tasks],
+            [anchor_file for _, anchor_file in tasks],
+            [self.work_dir] * len(tasks),
+            [self.date] * len(tasks),
         )
-
-        self.set_number_of_diff_lines(comparator.get_number_of_differing_lines())
-
-        # Append the result for this file to the testrun element
-        testrun.append(file_element)
-
-        self.write_diff_files(comparator, parallelizer, filelist[0].get_basename())
-
-    def compute_xmlfilename(self, want_tmx_file):
-        """Compute the name of the xmlfile which should be aligned"""
-        xml_file = want_tmx_file.replace("tmx/goldstandard/", "converted/")
-        xml_file = xml_file.replace("nob2sme", "nob")
-        xml_file = xml_file.replace("sme2nob", "sme")
-        xml_file = xml_file.replace(".toktmx", ".xml")
-
-        return xml_file
-
-    def write_diff_files(self, comparator, parallelizer, filename):
-        """Write diffs to a jspwiki file"""
-        print(f"write_diff_files {filename}")
-        filename = f"{filename}_{self.date}.jspwiki"
-        dirname = os.path.join(
-            os.path.dirname(self.testresult_writer.get_filename()), "tca2testing"
+        if ncpus == 1:
+            return list(map(align_goldstandard, *arguments))
+
+        with ProcessPoolExecutor(max_workers=ncpus) as pool:
+            return list(pool.map(align_goldstandard, *arguments))
+
+    @staticmethod
+    def set_run_metrics(testrun, results, wall_seconds, ncpus):
+        """Set the totals of a test run as attributes of testrun."""
+        total = AlignmentResult(
+            name="",
+            gspairs=sum(result.gspairs for result in results),
+            diffpairs=sum(result.diffpairs for result in results),
+            alignedpairs=sum(result.alignedpairs for result in results),
+            correctpairs=sum(result.correctpairs for result in results),
+            sentences=sum(result.sentences for result in results),
+            seconds=sum(result.seconds for result in results),
         )
-
-        with open(os.path.join(dirname, filename), "w") as diff_file:
-            diff_file.write(f"!!!{filename}\n")
-            diff_file.write("!!TMX diff\n{{{\n")
-            diff_file.writelines(comparator.get_diff_as_text())
-            diff_file.write("\n}}}\n!! diff\n{{{\n".format(parallelizer.get_lang1()))
-            diff_file.writelines(
-                comparator.get_lang_diff_as_text(parallelizer.get_lang1())
-            )
-            diff_file.write("\n}}}\n!!{} diff\n{{{\n".format(parallelizer.get_lang2()))
-            diff_file.writelines(
-                comparator.get_lang_diff_as_text(parallelizer.get_lang2())
-            )
-            diff_file.write("\n}}}\n")
-
-    def find_goldstandard_tmx_files(self):
-        """Find the goldstandard tmx files, return them as a list"""
-        file_list = []
-        for root, dirs, files in os.walk(
-            os.path.join(os.environ["GTFREE"], "prestable/toktmx")
-        ):
-            for f in files:
-                if f.endswith(".toktmx"):
-                    print(util.lineno(), f)
-                    file_list.append(os.path.join(root, f))
-
-        return file_list
+        attributes = total.attributes()
+        del attributes["name"]
+        testrun.attrib.update(attributes)
+        testrun.attrib["aligner"] = "tca2"
+        testrun.attrib["pairs"] = str(len(results))
+        testrun.attrib["seconds_per_pair"] = (
+            f"{total.seconds / len(results):.3f}" if results else "0.000"
+        )
+        testrun.attrib["wall_seconds"] = f"{wall_seconds:.3f}"
+        testrun.attrib["ncpus"] = str(ncpus)
 
 
 class TmxTestDataWriter:
@@ -233,12 +452,13 @@ class TmxTestDataWriter:
     def get_filename(self):
         return self.filename
 
-    def make_file_element(self, name, gspairs, diffpairs):
+    def make_file_element(self, name, gspairs, diffpairs, **metrics):
         """Make the element file, set the attributes"""
         file_element = etree.Element("file")
         file_element.attrib["name"] = name
         file_element.attrib["gspairs"] = gspairs
         file_element.attrib["diffpairs"] = diffpairs
+        file_element.attrib.update(metrics)
 
         return file_element
 
@@ -263,7 +483,7 @@ class TmxTestDataWriter:
 
     def write_paragstesting_data(self):
         """Write the paragstesting data to a file"""
-        with open(self.filename, "w") as paragstesting:
+        with open(self.filename, "wb") as paragstesting:
             et = etree.ElementTree(self.paragstesting)
             et.write(
                 paragstesting, pretty_print=True, encoding="utf-8", xml_declaration=True
@@ -280,18 +500,28 @@ def parse_options():
         "files to files produced by the "
         "parallelizer pipeline."
     )
+    parser.add_argument("--ncpus", action=NCpus)
+    parser.add_argument(
+        "--testresult",
+        default=os.path.join(
+            os.getenv("GTHOME", ""), "techdoc/ling/testruns.paragstesting.xml"
+        ),
+        help="The paragstesting file the results are written to. The "
+        "sentence cache, aligned files and diffs are kept in the tca2testing "
+        "directory next to it.",
+    )
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Goldstandard tmx files, or directories to search for them",
+    )
 
-    parser.parse_args()
+    return parser.parse_args()
 
 
 def main():
-    parse_options()
-
-    # Set the name of the file to write the test to
-    paragstestfile = os.path.join(
-        os.environ["GTHOME"], "techdoc/ling/testruns.paragstesting.xml"
-    )
+    args = parse_options()
 
     # Initialize an instance of a tmx test data writer
-    tester = TmxGoldstandardTester(paragstestfile)
-    tester.run_test()
+    tester = TmxGoldstandardTester(args.testresult)
+    tester.run_test(args.sources, args.ncpus)
@@ -19,6 +19,7 @@ from shlex import split as split_cmd
 from time import perf_counter_ns
 from typing import Callable
 
+from corpustools import profiling
 from corpustools.korp_config_templates import CORPUS_CONFIG_TITLE_AND_DESCRIPTIONS
 from corpustools.korp_config_templates import DEFAULT_MODE_CONTENTS
 from corpustools.korp_config_templates import KORP_SETTINGS_TEMPLATE
@@ -397,7 +398,7 @@ def process_input_xml2(root, category, text_num):
     return text_el, sentence_num, n_tot_tokens
 
 
-def concat_corpus(corpus, lang, compiled_dir, date_s):
+def concat_corpus(corpus, lang, compiled_dir, date_s, profiler=None):
     clean_directory(compiled_dir, verbose=1)
 
     print("Gathering korp_mono files in both open and closed corpus...")
@@ -422,14 +423,18 @@ def concat_corpus(corpus, lang, compiled_dir, date_s):
         for i, file in enumerate(files):
             n_processed_files += 1
 
-            try:
-                root = ET.parse(file)
-            except ET.ParseError as e:
-                print(f"file {file} could not be parsed (invalid xml?). ET says: {e}")
-                continue
+            with profiling.measure(profiler, "concat", file, file):
+                try:
+                    root = ET.parse(file)
+                except ET.ParseError as e:
+                    print(
+                        f"file {file} could not be parsed (invalid xml?). "
+                        f"ET says: {e}"
+                    )
+                    continue
 
-            text_el, nsentences, ntokens = process_input_xml2(
-                    root, category.category, text_num)
+                text_el, nsentences, ntokens = process_input_xml2(
+                        root, category.category, text_num)
             if not text_el:
                 print(f"file {file} contained no <text> element")
                 continue
@@ -712,7 +717,9 @@ def encode_corpus(
 
 
 def parse_args():
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(
+        description=__doc__, parents=[profiling.parser]
+    )
     parser.add_argument(
         "lang",
         choices=LANGS,
@@ -795,7 +802,8 @@ def main():
 
     date_s = str(args.date).replace("-", "")
     vrt_dir = Path(f"vrt/vrt_{args.lang}_{date_s}")
-    concat_corpus(corpus, args.lang, vrt_dir, date_s)
+    profiler = profiling.make_profiler(args)
+    concat_corpus(corpus, args.lang, vrt_dir, date_s, profiler)
 
     data_dir = args.root_dir / "cwb-files" / args.lang / "data"
     registry_dir = args.root_dir / "cwb-files" / args.lang / "registry"
@@ -807,19 +815,23 @@ def main():
 
     for entry in vrt_dir.glob("*.vrt"):
         print(f"encode_corpus {entry.name}...")
-        encode_corpus(
-            vrt_file=entry,
-            date=args.date,
-            lang=args.lang,
-            data_dir=data_dir,
-            registry_dir=registry_dir,
-            cwb_binaries_directory=args.cwb_binaries_dir,
-        )
+        with profiling.measure(profiler, "encode", entry, entry):
+            encode_corpus(
+                vrt_file=entry,
+                date=args.date,
+                lang=args.lang,
+                data_dir=data_dir,
+                registry_dir=registry_dir,
+                cwb_binaries_directory=args.cwb_binaries_dir,
+            )
         create_korp_settings(
             korp_config_dir,
             entry,
         )
 
+    if profiler is not None:
+        profiler.finish()
+
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,143 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Read and write gzip compressed converted and analysed files.
+
+Compressed files keep their names, so the paths given by CorpusPath
+are the same whether a file is compressed or not. Readers recognise
+compressed files by the gzip magic number at the start of the file.
+"""
+
+import argparse
+import gzip
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, TextIO
+
+from lxml import etree
+
+GZIP_MAGIC = b"\x1f\x8b"
+# Compresses corpus xml nearly as well as level 9, several times faster
+COMPRESSLEVEL = 6
+
+
+def is_compressed(path) -> bool:
+    """Check whether path is a gzip compressed file.
+
+    Args:
+        path (str|Path): path to the file.
+    """
+    with open(path, "rb") as stream:
+        return stream.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+@contextmanager
+def xml_source(path) -> Iterator:
+    """Give the source lxml should parse path from.
+
+    Uncompressed files are read directly by lxml, which is faster than
+    reading them through a python file object.
+
+    Args:
+        path (str|Path): path to the xml file.
+
+    Yields:
+        (str|Path|BinaryIO): path itself, or a stream decompressing it.
+    """
+    if not is_compressed(path):
+        yield path
+        return
+
+    with gzip.open(path, "rb") as stream:
+        yield stream
+
+
+def parse(path, parser=None) -> etree._ElementTree:
+    """Parse a, possibly compressed, xml file.
+
+    Args:
+        path (str|Path): path to the xml file.
+        parser (etree.XMLParser|None): the parser to use.
+
+    Returns:
+        (etree._ElementTree): the parsed document.
+    """
+    with xml_source(path) as source:
+        return etree.parse(source, parser)
+
+
+def iterparse(path, **kwargs) -> Iterator:
+    """Parse a, possibly compressed, xml file incrementally.
+
+    Args:
+        path (str|Path): path to the xml file.
+        kwargs: the arguments of etree.iterparse.
+
+    Yields:
+        (tuple[str, etree.Element]): the events and elements found.
+    """
+    with xml_source(path) as source:
+        yield from etree.iterparse(source, **kwargs)
+
+
+def open_text(path) -> TextIO:
+    """Open a, possibly compressed, utf-8 file for reading.
+
+    Args:
+        path (str|Path): path to the file.
+    """
+    if is_compressed(path):
+        return gzip.open(path, "rt", encoding="utf-8")
+
+    return open(path, encoding="utf-8")
+
+
+@contextmanager
+def open_output(path, compress=False) -> Iterator[BinaryIO]:
+    """Open a file for writing, compressing what is written if asked to.
+
+    The gzip header contains neither the name of the file nor a time
+    stamp, so the same content is always compressed to the same bytes.
+
+    Args:
+        path (str|Path): path to the file.
+        compress (bool): whether the file should be compressed.
+
+    Yields:
+        (BinaryIO): the stream to write to.
+    """
+    with open(path, "wb") as stream:
+        if not compress:
+            yield stream
+            return
+
+        with gzip.GzipFile(
+            filename="",
+            mode="wb",
+            compresslevel=COMPRESSLEVEL,
+            fileobj=stream,
+            mtime=0,
+        ) as compressed:
+            yield compressed
+
+
+parser = argparse.ArgumentParser(add_help=False)
+parser.add_argument(
+    "--compress",
+    action="store_true",
+    help="Write gzip compressed files. corpustools reads them like uncompressed ones.",
+)
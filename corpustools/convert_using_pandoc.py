@@ -21,6 +21,8 @@ from pathlib import Path
 
 from lxml import etree, html
 
+from corpustools import timeouts
+
 
 def to_html_elt(filename: Path) -> etree.Element:
     """Convert the content of the give file to an lxml element.
@@ -31,8 +33,11 @@ def to_html_elt(filename: Path) -> etree.Element:
     Returns:
         An lxml element containing the html version of the given file.
     """
-    html_body = subprocess.run(
-        ["pandoc", filename.as_posix()], encoding="utf-8", capture_output=True, check=False
+    html_body = timeouts.run(
+        ["pandoc", filename.as_posix()],
+        encoding="utf-8",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
     ).stdout
 
     return html.document_fromstring(f"<html><body>{html_body}</body></html>")
@@ -17,13 +17,14 @@
 #
 """Convert doc that LibreOffice knows to html."""
 
-import subprocess
 import sys
 from pathlib import Path
 
 from lxml import html
 from lxml.etree import ElementTree
 
+from corpustools import timeouts
+
 
 def to_html_elt(filename: Path) -> ElementTree:
     """Convert the content of a writenow file to an ElementTree.
@@ -35,7 +36,7 @@ def to_html_elt(filename: Path) -> ElementTree:
         An element containing the HTML version of the given file.
     """
     outdir = filename.parent
-    subprocess.run(
+    timeouts.run(
         [
             "/Applications/LibreOffice.app/Contents/MacOS/soffice"
             if sys.platform == "darwin"
@@ -47,7 +48,6 @@ def to_html_elt(filename: Path) -> ElementTree:
             filename.as_posix(),
         ],
         encoding="utf-8",
-        check=False,
     )
 
     outname = f"{filename.stem}.html"
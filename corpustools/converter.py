@@ -18,28 +18,20 @@
 """This file contains classes to convert files to the Giella xml format."""
 
 import codecs
+import functools
+import importlib
 import logging
 import os
 import os.path
 import unicodedata
 from pathlib import Path
-from typing import Callable
 
 from lxml import etree
 
 from corpustools import (
-    avvirconverter,
-    biblesfmconverter,
-    biblexmlconverter,
-    ccat,
+    compression,
     documentfixer,
-    error_annotated_converter,
-    htmlcontentconverter,
     languagedetector,
-    ocrconverter,
-    plaintextconverter,
-    svgconverter,
-    usxconverter,
     util,
     xslmaker,
     xslsetter,
@@ -48,6 +40,25 @@ from corpustools.corpuspath import CorpusPath
 
 HERE = os.path.dirname(__file__)
 
+# The modules converting each file type. They are imported when a file
+# of that type is converted, as some of them are slow to import.
+INTERMEDIATE_CONVERTERS = {
+    ".doc": "htmlcontentconverter",
+    ".docx": "htmlcontentconverter",
+    ".epub": "htmlcontentconverter",
+    ".html": "htmlcontentconverter",
+    ".odt": "htmlcontentconverter",
+    ".pdf": "htmlcontentconverter",
+    ".rtf": "htmlcontentconverter",
+    ".sfm": "biblesfmconverter",
+    ".svg": "svgconverter",
+    ".txt": "plaintextconverter",
+    ".tex": "htmlcontentconverter",
+    ".writenow": "htmlcontentconverter",
+    ".usx": "usxconverter",
+    ".correct.txt": "error_annotated_converter",
+}
+
 logging.basicConfig(level=logging.WARNING)
 LOGGER = logging.getLogger(__name__)
 
@@ -62,6 +73,24 @@ def newer_group(sources, target):
     return any(os.path.getmtime(src) > target_mtime for src in sources)
 
 
+def import_converter(module_name):
+    """Import a converter module from corpustools."""
+    return importlib.import_module(f"corpustools.{module_name}")
+
+
+def convert2intermediate(module_name, path):
+    """Convert path with the converter module module_name.
+
+    Args:
+        module_name (str): name of a converter module in corpustools.
+        path (Path): path to the document.
+
+    Returns:
+        (etree.Element): the document in the intermediate xml format.
+    """
+    return import_converter(module_name).convert2intermediate(path)
+
+
 class Converter:
     """Take care of data common to all Converter classes."""
 
@@ -116,9 +145,15 @@ class Converter:
         """Return the path to the corpus dtd file."""
         return os.path.join(HERE, "dtd/corpus.dtd")
 
+    @staticmethod
+    @functools.cache
+    def get_dtd():
+        """Return the corpus dtd, parsed only once per process."""
+        return etree.DTD(Converter.get_dtd_location())
+
     def validate_complete(self, complete: etree.Element):
         """Validate the complete document."""
-        dtd = etree.DTD(Converter.get_dtd_location())
+        dtd = Converter.get_dtd()
 
         if not dtd.validate(complete):
             self.names.log.write_text(
@@ -142,42 +177,25 @@ class Converter:
         Returns:
             The converted document as an lxml Element.
         """
-        chooser: dict[str, Callable] = {
-            ".doc": htmlcontentconverter.convert2intermediate,
-            ".docx": htmlcontentconverter.convert2intermediate,
-            ".epub": htmlcontentconverter.convert2intermediate,
-            ".html": htmlcontentconverter.convert2intermediate,
-            ".odt": htmlcontentconverter.convert2intermediate,
-            ".pdf": htmlcontentconverter.convert2intermediate,
-            ".rtf": htmlcontentconverter.convert2intermediate,
-            ".sfm": biblesfmconverter.convert2intermediate,
-            ".svg": svgconverter.convert2intermediate,
-            ".txt": plaintextconverter.convert2intermediate,
-            ".tex": htmlcontentconverter.convert2intermediate,
-            ".writenow": htmlcontentconverter.convert2intermediate,
-            ".usx": usxconverter.convert2intermediate,
-            ".correct.txt": error_annotated_converter.convert2intermediate,
-        }
-
         str_path = path.absolute().as_posix()
         if "avvir_xml" in str_path:
-            return avvirconverter.convert2intermediate(path)
+            return convert2intermediate("avvirconverter", path)
         elif str_path.endswith("bible.xml"):
-            return biblexmlconverter.convert2intermediate(path)
+            return convert2intermediate("biblexmlconverter", path)
         elif "udhr_" in str_path and path.suffix == ".xml":
-            return htmlcontentconverter.convert2intermediate(path)
+            return convert2intermediate("htmlcontentconverter", path)
         elif (
             self.metadata.get_variable("conversion_status") == "ocr"
             and path.suffix == ".pdf"
         ):
-            return ocrconverter.to_xml(
+            return import_converter("ocrconverter").to_xml(
                 path,
                 language=("sme_gt" if "corpus-sme" in str_path else "nor"),
             )  # hardcoded until further notice
         elif path.name.endswith(".correct.txt"):
-            return error_annotated_converter.convert2intermediate(path)
+            return convert2intermediate("error_annotated_converter", path)
         else:
-            return chooser[path.suffix](path)
+            return convert2intermediate(INTERMEDIATE_CONVERTERS[path.suffix], path)
 
     def transform_to_complete(self):
         """Combine the intermediate xml document with its medatata."""
@@ -224,15 +242,9 @@ class Converter:
         fixer = documentfixer.DocumentFixer(complete)
 
         fixer.fix_newstags()
-        fixer.soft_hyphen_to_hyph_tag()
-        self.metadata.set_variable("wordcount", fixer.calculate_wordcount())
-
-        if not self.goldstandard:
-            fixer.detect_quotes()
-
-        # The above line adds text to hyph, fix that
-        for hyph in complete.iter("hyph"):
-            hyph.text = None
+        self.metadata.set_variable(
+            "wordcount", fixer.fix_paragraphs(detect_quotes=not self.goldstandard)
+        )
 
         if self.metadata.get_variable("mainlang") in [
             "sma",
@@ -316,18 +328,38 @@ class Converter:
                 the converted document.
 
         Returns:
-            (int): The length of the content in complete.
+            (bool): True if a paragraph in complete contains text.
         """
-        xml_printer = ccat.XMLPrinter(all_paragraphs=True, hyph_replacement=None)
-        xml_printer.etree = etree.ElementTree(complete)
+        return any(
+            text.strip() for para in complete.iter("p") for text in para.itertext()
+        )
+
+    @staticmethod
+    def normalize_text(complete):
+        """NFC normalise the text and attributes of complete.
 
-        return len(xml_printer.process_file().getvalue())
+        Only strings that are not already NFC normalised are replaced.
 
-    def write_complete(self, languageguesser):
+        Args:
+            complete (lxml.etree.Element): a etree element containing
+                the converted document.
+        """
+        for element in complete.iter():
+            if element.text and not unicodedata.is_normalized("NFC", element.text):
+                element.text = unicodedata.normalize("NFC", element.text)
+            if element.tail and not unicodedata.is_normalized("NFC", element.tail):
+                element.tail = unicodedata.normalize("NFC", element.tail)
+            for key, value in element.items():
+                if not unicodedata.is_normalized("NFC", value):
+                    element.set(key, unicodedata.normalize("NFC", value))
+
+    def write_complete(self, languageguesser, compress=False):
         """Write the complete converted document to disk.
 
         Args:
             languageguesser (text.Classifier): a text.Classifier
+            compress (bool): whether the converted document should be
+                gzip compressed.
         """
         if not self.lazy_conversion or (
             self.lazy_conversion
@@ -340,13 +372,13 @@ class Converter:
                 complete = self.make_complete(languageguesser)
 
                 if self.has_content(complete):
-                    with open(self.names.converted, "w") as converted:
-                        print(
-                            unicodedata.normalize(
-                                "NFC", etree.tostring(complete, encoding="unicode")
-                            ),
-                            file=converted,
-                        )
+                    self.normalize_text(complete)
+                    with compression.open_output(
+                        self.names.converted, compress
+                    ) as converted:
+                        with etree.xmlfile(converted, encoding="utf-8") as xml_file:
+                            xml_file.write(complete)
+                        converted.write(b"\n")
                 else:
                     LOGGER.error("%s has no text", self.names.orig)
 
@@ -20,16 +20,24 @@
 import argparse
 import logging
 import os
-from concurrent.futures import Future, ProcessPoolExecutor, as_completed
-from functools import partial
 from pathlib import Path
 from typing import Iterator
 
-from corpustools import argparse_version, converter, text_cat, util
+from corpustools import (
+    argparse_version,
+    compression,
+    converter,
+    profiling,
+    text_cat,
+    timeouts,
+    util,
+)
 from corpustools.common_arg_ncpus import NCpus
 from corpustools.corpuspath import CorpusPath, make_corpus_path
 
 LOGGER = logging.getLogger(__name__)
+# The memory used by the language guesser each conversion worker loads
+LANGUAGEGUESSER_MEMORY = 224 * 1024**2
 
 
 class ConverterManager:
@@ -43,8 +51,12 @@ class ConverterManager:
             of the converted document should be written to disk.
         goldstandard (bool): indicating whether goldstandard documents
             should be converted.
+        compress (bool): indicating whether the converted documents
+            should be gzip compressed.
         files (list of str): list of paths to original files that should
             be converted from original format to xml.
+        profiler (profiling.Profiler|None): records the cost of converting
+            each file, if set.
     """
 
     _languageguesser = None
@@ -58,7 +70,11 @@ class ConverterManager:
         return self._languageguesser
 
     def __init__(
-        self, lazy_conversion=False, write_intermediate=False, goldstandard=False
+        self,
+        lazy_conversion=False,
+        write_intermediate=False,
+        goldstandard=False,
+        compress=False,
     ):
         """Initialise the ConverterManager class.
 
@@ -69,11 +85,16 @@ class ConverterManager:
                 of the converted document should be written to disk.
             goldstandard (bool): indicating whether goldstandard documents
                 should be converted.
+            compress (bool): indicating whether the converted documents
+                should be gzip compressed.
         """
         self.lazy_conversion = lazy_conversion
         self.write_intermediate = write_intermediate
         self.goldstandard = goldstandard
+        self.compress = compress
         self.files: list[CorpusPath] = []
+        self.profiler: profiling.Profiler | None = None
+        self.limits: timeouts.Limits | None = None
 
     def convert(self, orig_file: CorpusPath):
         """Convert file to corpus xml format.
@@ -82,8 +103,17 @@ class ConverterManager:
             orig_file: the path to the original file.
         """
         try:
-            conv = converter.Converter(orig_file, lazy_conversion=self.lazy_conversion)
-            conv.write_complete(self.languageguesser())
+            with profiling.measure(
+                self.profiler,
+                "convert",
+                orig_file.orig,
+                orig_file.orig,
+                orig_file.converted,
+            ):
+                conv = converter.Converter(
+                    orig_file, lazy_conversion=self.lazy_conversion
+                )
+                conv.write_complete(self.languageguesser(), self.compress)
         except (
             util.ConversionError,
             ValueError,
@@ -92,41 +122,54 @@ class ConverterManager:
             LOGGER.warn("Could not convert %s\n%s", orig_file, error)
             raise
 
-    def convert_in_parallel(self, pool_size: int):
-        """Convert files using the multiprocessing module."""
-        nfiles = len(self.files)
-        futures: dict[Future[None], CorpusPath] = {}  # Future -> filename
-        print(f"Starting parallel conversion with {pool_size} workers")
-        failed: list[CorpusPath] = []
-        with ProcessPoolExecutor(max_workers=pool_size) as pool:
-            for file in self.files:
-                fut = pool.submit(partial(self.convert, file))
-                futures[fut] = file
-
-            for i, future in enumerate(as_completed(futures), start=1):
-                exc = future.exception()
-                filename = futures[future]
-                if exc is not None:
-                    failed.append(filename)
-                    print(f"[{i}/{nfiles} FAILED: {filename.orig}")
-                    print(exc)
-                else:
-                    print(f"[{i}/{nfiles}] done: {filename.converted}")
-
-        n_ok = nfiles - len(failed)
-        print(f"all done converting. {n_ok} files converted ok, {len(failed)} failed")
+    def convert_in_parallel(
+        self, pool_size: int
+    ) -> list[tuple[CorpusPath, BaseException]]:
+        """Convert files using the multiprocessing module.
+
+        The conversions are scheduled by util.run_in_parallel, so that
+        large files are converted with fewer files beside them.
+
+        Returns:
+            The files that failed, and the exceptions they raised.
+        """
+        sizes = [file.orig.stat().st_size for file in self.files]
+        failed = util.run_in_parallel(
+            self.convert,
+            pool_size,
+            self.files,
+            sizes,
+            memory_costs=[
+                util.memory_cost(file.orig, size) + LANGUAGEGUESSER_MEMORY
+                for file, size in zip(self.files, sizes, strict=True)
+            ],
+            limits=self.limits,
+        )
         if failed:
             print("the files that failed to convert are:")
-            for filename in failed:
+            for filename, _ in failed:
                 print(filename.orig)
 
-    def convert_serially(self):
-        """Convert the files in one process."""
+        return failed
+
+    def convert_serially(self) -> list[tuple[CorpusPath, BaseException]]:
+        """Convert the files in one process.
+
+        Returns:
+            The files that timed out, and the exceptions they raised.
+        """
         LOGGER.info("Starting the conversion of %d files", len(self.files))
 
+        failed = []
         for orig_file in self.files:
             LOGGER.debug("converting %s", orig_file)
-            self.convert(orig_file)
+            try:
+                timeouts.call(self.limits, self.convert, orig_file)
+            except timeouts.TIMEOUT_ERRORS as error:
+                LOGGER.warning("Could not convert %s\n%s", orig_file, error)
+                failed.append((orig_file, error))
+
+        return failed
 
     def corpus_paths(self, sources: list[str]) -> Iterator[CorpusPath]:
         """Yield all convertible files in sources.
@@ -184,7 +227,12 @@ def parse_options():
         (argparse.Namespace): the parsed commandline arguments
     """
     parser = argparse.ArgumentParser(
-        parents=[argparse_version.parser],
+        parents=[
+            argparse_version.parser,
+            compression.parser,
+            profiling.parser,
+            timeouts.parser,
+        ],
         description="Convert original files to giellatekno xml.",
     )
 
@@ -255,15 +303,21 @@ def main():
     args = parse_options()
 
     manager = ConverterManager(
-        args.lazy_conversion, args.write_intermediate, args.goldstandard
+        args.lazy_conversion, args.write_intermediate, args.goldstandard, args.compress
     )
     manager.collect_files(args.sources)
+    manager.profiler = profiling.make_profiler(args)
+    manager.limits = timeouts.make_limits(args)
 
     try:
         if args.serial:
             LOGGER.setLevel(logging.DEBUG)
-            manager.convert_serially()
+            failed = manager.convert_serially()
         else:
-            manager.convert_in_parallel(args.ncpus)
+            failed = manager.convert_in_parallel(args.ncpus)
+        timeouts.report_failures(args, failed)
     except util.ExecutableMissingError as error:
         raise SystemExit(str(error)) from error
+    finally:
+        if manager.profiler is not None:
+            manager.profiler.finish()
@@ -22,9 +22,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterator
 
-from lxml import etree
-
-from corpustools import xslsetter
+from corpustools import compression, xslsetter
 
 CORPUS_DIR_RE = re.compile(
     r"(?P<parent>.*)/corpus-(?P<corpusdir>[^/]+)/(?P<corpusfile>.*)"
@@ -103,7 +101,7 @@ class CorpusPath:
         # If we do not have access to the -orig part of the corpus
         # at least read the parallel info from the converted doc
         if not self.xsl.exists() and self.converted.exists():
-            conv_xml = etree.parse(self.converted)
+            conv_xml = compression.parse(self.converted)
             for para_info in conv_xml.iter("parallel_text"):
                 self.metadata.set_parallel_text(
                     language=para_info.attrib[
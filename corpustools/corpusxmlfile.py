@@ -19,9 +19,7 @@
 """Classes and functions to sentence align two files."""
 
 
-from lxml import etree
-
-from corpustools import corpuspath, util
+from corpustools import compression, corpuspath, util
 
 
 class CorpusXMLFile:
@@ -34,7 +32,7 @@ class CorpusXMLFile:
             name (str): path to the xml file.
         """
         self.corpus_path = corpuspath.make_corpus_path(name)
-        self.etree = etree.parse(name)
+        self.etree = compression.parse(name)
         self.root = self.etree.getroot()
         self.sanity_check()
 
@@ -14,18 +14,13 @@
 #   Copyright © 2012-2023 The University of Tromsø & the Norwegian Sámi Parliament
 #   http://giellatekno.uit.no & http://divvun.no
 #
-"""This file contains classes to convert files to the giellatekno xml format."""
+"""Count the original, converted and analysed files of the corpus."""
 
 
 import argparse
-import logging
-import os
-from collections import defaultdict
-from datetime import date
 
-from corpustools import argparse_version, converter, convertermanager
-
-logging.basicConfig(level=logging.CRITICAL)
+from corpustools import argparse_version
+from corpustools.catalog import open_catalog
 
 
 def parse_options():
@@ -44,63 +39,76 @@ def parse_options():
         action="store_true",
         help="List lacking converted and analysed files.",
     )
+    parser.add_argument(
+        "--catalog",
+        help="Path to the corpus catalog. Default is tmp/corpus_catalog.sqlite "
+        "next to the corpus directories.",
+    )
+    parser.add_argument(
+        "corpusdirs", nargs="+", help="Orig corpus directories, or parts of them"
+    )
 
     args = parser.parse_args()
 
     return args
 
 
-def count_files(path):
-    """Count files in the given language."""
-    today = date.today()
-
-    cm = convertermanager.ConverterManager(False, False)
-    cm.collect_files([path])
-    counter = defaultdict(int)
-    lacking_files = defaultdict(set)
-    for f in cm.files:
-        c = converter.Converter(f)
-        if os.path.exists(c.names.converted):
-            counter["con"] += 1
-        else:
-            lacking_files["con"].add(c.names.orig)
-
-        for fst in ["xfst", "hfst"]:
-            todays_analysed = f"/analysed.{today}/{fst}/"
-            if os.path.exists(c.names.analysed.replace("/analysed/", todays_analysed)):
-                counter[fst] += 1
-        else:
-            if os.path.exists(c.names.converted):
-                lacking_files["ana"].add(c.names.converted)
-    return (
-        len(cm.files),
-        counter["con"],
-        counter["xfst"],
-        counter["hfst"],
-        lacking_files,
-    )
+def count_files(catalog, path):
+    """Count the convertable, converted and analysed files in path.
+
+    Args:
+        catalog (CorpusCatalog): an up to date catalog of path.
+        path (str): a directory inside an orig corpus directory.
+
+    Returns:
+        (tuple[int, int, int, dict[str, set[str]]]): the number of
+            convertable, converted and analysed files, and the
+            original files that are not converted and the converted
+            files that are not analysed.
+    """
+    documents = [
+        document
+        for conversion_status in ["standard", "ocr"]
+        for document in catalog.documents(path, conversion_status=conversion_status)
+    ]
+    converted = [
+        document for document in documents if document["converted_mtime"] is not None
+    ]
+    analysed = [
+        document for document in converted if document["analysed_mtime"] is not None
+    ]
+    lacking_files = {
+        "con": {
+            document["orig"]
+            for document in documents
+            if document["converted_mtime"] is None
+        },
+        "ana": {
+            document["converted"]
+            for document in converted
+            if document["analysed_mtime"] is None
+        },
+    }
+
+    return len(documents), len(converted), len(analysed), lacking_files
 
 
 def main():
     args = parse_options()
 
-    lacking_files = defaultdict(set)
-    print("\t".join(["language", "original", "converted", "xfst", "hfst"]))
-    for corpus in [os.getenv("GTFREE"), os.getenv("GTBOUND")]:
-        print(corpus)
-        for language in ["fkv", "sma", "sme", "smj", "smn", "sms"]:
-            result = count_files(os.path.join(corpus, "orig", language))
-            print(
-                "{}\t{}\t{}\t{}\t{}".format(
-                    language, result[0], result[1], result[2], result[3]
-                )
-            )
-            for key, value in result[-1].items():
-                lacking_files[key].update(value)
+    lacking_files = {"con": set(), "ana": set()}
+    print("\t".join(["directory", "original", "converted", "analysed"]))
+    for corpusdir in args.corpusdirs:
+        catalog = open_catalog(corpusdir, args.catalog)
+        *counts, lacking = count_files(catalog, corpusdir)
+        catalog.close()
+        print("\t".join([corpusdir, *[str(count) for count in counts]]))
+        for key, value in lacking.items():
+            lacking_files[key].update(value)
 
     if args.listfiles:
         for key, value in lacking_files.items():
             print(key)
-            for f in value:
+            for f in sorted(value):
                 print("\t", f)
         print()
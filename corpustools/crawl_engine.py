@@ -0,0 +1,297 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Fetch web pages for the crawlers.
+
+The CrawlEngine keeps one requests.Session, so connections to a host are
+reused. It fetches several pages at a time while spacing the requests to
+each host, and keeps an on-disk cache so that pages that have not
+changed since the last crawl are not downloaded again.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+MAX_WORKERS = 8
+MIN_INTERVAL = 0.5
+TIMEOUT = 30
+
+
+class HostRateLimiter:
+    """Space the requests made to each host."""
+
+    def __init__(self, min_interval=MIN_INTERVAL, host_intervals=None):
+        """Initialise the HostRateLimiter class.
+
+        Args:
+            min_interval (float): seconds between requests to a host.
+            host_intervals (dict[str, float]|None): seconds between
+                requests for hosts that need another interval.
+        """
+        self.min_interval = min_interval
+        self.host_intervals = host_intervals or {}
+        self.next_times = {}
+        self.lock = threading.Lock()
+
+    def wait(self, host):
+        """Wait until the next request to host is allowed.
+
+        Each caller reserves its own time slot, so concurrent callers
+        are spaced out too.
+
+        Args:
+            host (str): the host that is about to be requested.
+        """
+        interval = self.host_intervals.get(host, self.min_interval)
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_times.get(host, now))
+            self.next_times[host] = start + interval
+
+        if start > now:
+            time.sleep(start - now)
+
+
+class HttpCache:
+    """On-disk store of pages that can be fetched with conditional GETs.
+
+    Only responses with an ETag or a Last-Modified header are stored.
+    Each url has a .json file with the headers and a .body file with
+    the content.
+    """
+
+    def __init__(self, cache_dir):
+        """Initialise the HttpCache class.
+
+        Args:
+            cache_dir (str|Path): the directory of the cache.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, url):
+        """The path to the cache entry of url, without suffix."""
+        return self.cache_dir / hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def read_entry(self, url):
+        """Read the metadata of the cache entry of url.
+
+        Returns:
+            (dict|None): the metadata, or None if url is not cached.
+        """
+        try:
+            return json.loads(self.path(url).with_suffix(".json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, url):
+        """Make the headers asking the server for changes only.
+
+        Args:
+            url (str): the url that should be fetched.
+
+        Returns:
+            (dict[str, str]): If-None-Match and If-Modified-Since headers.
+        """
+        entry = self.read_entry(url)
+        if entry is None:
+            return {}
+
+        headers = CaseInsensitiveDict(entry["headers"])
+        conditions = {}
+        if "etag" in headers:
+            conditions["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            conditions["If-Modified-Since"] = headers["last-modified"]
+
+        return conditions
+
+    def store(self, url, response):
+        """Store response if it can be revalidated later.
+
+        Args:
+            url (str): the requested url.
+            response (requests.Response): a successful response.
+        """
+        if "etag" not in response.headers and "last-modified" not in response.headers:
+            return
+
+        path = self.path(url)
+        self.write_atomically(path.with_suffix(".body"), response.content)
+        self.write_atomically(
+            path.with_suffix(".json"),
+            json.dumps(
+                {
+                    "url": response.url,
+                    "headers": dict(response.headers),
+                    "encoding": response.encoding,
+                }
+            ).encode("utf-8"),
+        )
+
+    @staticmethod
+    def write_atomically(path, content):
+        """Write content to path, so that readers never see a partial file."""
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        """Make a response from the cache entry of url.
+
+        Returns:
+            (requests.Response|None): the cached response, or None if
+                url is not cached.
+        """
+        entry = self.read_entry(url)
+        if entry is None:
+            return None
+
+        try:
+            content = self.path(url).with_suffix(".body").read_bytes()
+        except OSError:
+            return None
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = entry["url"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        response._content = content
+        response.from_cache = True
+
+        return response
+
+
+class CrawlEngine:
+    """Fetch pages with pooled connections, rate limits and a cache."""
+
+    def __init__(
+        self,
+        cache_dir=None,
+        max_workers=MAX_WORKERS,
+        rate_limiter=None,
+        headers=None,
+        timeout=TIMEOUT,
+    ):
+        """Initialise the CrawlEngine class.
+
+        Args:
+            cache_dir (str|Path|None): directory of the http cache. If
+                None, nothing is cached.
+            max_workers (int): the number of pages fetched at a time.
+            rate_limiter (HostRateLimiter|None): spaces the requests to
+                each host. Defaults to MIN_INTERVAL seconds between them.
+            headers (dict[str, str]|None): headers sent with each request.
+            timeout (float): seconds to wait for a server to answer.
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = HttpCache(cache_dir) if cache_dir is not None else None
+        self.rate_limiter = (
+            rate_limiter if rate_limiter is not None else HostRateLimiter()
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers is not None:
+            self.session.headers.update(headers)
+
+    def fetch(self, url, params=None, headers=None):
+        """Fetch url.
+
+        If the page is cached, the server is asked whether it has
+        changed, and the cached page is returned if it has not.
+
+        Args:
+            url (str): the url to fetch.
+            params (dict|None): query parameters.
+            headers (dict[str, str]|None): extra headers for this request.
+
+        Returns:
+            (requests.Response): the response. Cached responses have the
+                attribute from_cache set to True.
+
+        Raises:
+            requests.exceptions.RequestException: if the page could not
+                be fetched.
+        """
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        conditions = (
+            self.cache.conditional_headers(full_url) if self.cache is not None else {}
+        )
+        response = self.get(full_url, {**(headers or {}), **conditions})
+
+        if conditions and response.status_code == requests.codes.not_modified:
+            cached = self.cache.load(full_url)
+            if cached is not None:
+                return cached
+            # The cached content has disappeared, fetch it unconditionally
+            response = self.get(full_url, headers or {})
+
+        if self.cache is not None and response.status_code == requests.codes.ok:
+            self.cache.store(full_url, response)
+
+        response.from_cache = False
+        return response
+
+    def get(self, url, headers):
+        """Get url when its host allows it."""
+        self.rate_limiter.wait(urlparse(url).netloc)
+        return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def try_fetch(self, url):
+        """Fetch url, reporting errors instead of raising them.
+
+        Returns:
+            (requests.Response|None): the response, or None if the page
+                could not be fetched.
+        """
+        try:
+            return self.fetch(url)
+        except requests.exceptions.RequestException as error:
+            print(f"Could not fetch {url}: {error}", file=sys.stderr)
+            return None
+
+    def fetch_all(self, urls):
+        """Fetch urls, max_workers at a time.
+
+        Args:
+            urls (iterable of str): the urls to fetch.
+
+        Returns:
+            (list[tuple[str, requests.Response|None]]): the urls and
+                their responses, in the order of urls. The response is
+                None for pages that could not be fetched.
+        """
+        urls = list(urls)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(zip(urls, pool.map(self.try_fetch, urls), strict=True))
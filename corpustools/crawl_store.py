@@ -0,0 +1,225 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Keep the state of the crawlers on disk.
+
+The CrawlStore is an sqlite database with the crawl frontier (the links
+that are known, and whether they have been visited) and the digests of
+the pages saved to the corpus. Each site has its own rows, so all
+crawlers can share one database.
+
+Since the state survives the crawler, an interrupted crawl continues
+where it stopped, and the corpus does not have to be hashed on each
+start to find duplicates.
+"""
+
+import sqlite3
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    site TEXT NOT NULL,
+    link TEXT NOT NULL,
+    visited INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (site, link)
+);
+CREATE INDEX IF NOT EXISTS unvisited_links ON links (site, visited);
+CREATE TABLE IF NOT EXISTS digests (
+    site TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (site, digest)
+);
+"""
+
+
+class DigestTable:
+    """Map the digests of the saved pages of a site to their paths.
+
+    Works like the dicts the crawlers used to build when they started,
+    but lookups are done in the database.
+    """
+
+    def __init__(self, connection, site):
+        """Initialise the DigestTable class.
+
+        Args:
+            connection (sqlite3.Connection): the database connection.
+            site (str): the site the digests belong to.
+        """
+        self.connection = connection
+        self.site = site
+
+    def get(self, digest, default=None):
+        """Get the path of the saved page with digest.
+
+        Pages that have been removed from the corpus since they were
+        saved are forgotten.
+
+        Args:
+            digest (str): digest of the content of a page.
+            default (object): returned if no saved page has digest.
+
+        Returns:
+            (Path|object): path to the saved page, or default.
+        """
+        row = self.connection.execute(
+            "SELECT path FROM digests WHERE site = ? AND digest = ?",
+            (self.site, digest),
+        ).fetchone()
+        if row is None:
+            return default
+
+        path = Path(row[0])
+        if not path.exists():
+            del self[digest]
+            return default
+
+        return path
+
+    def __setitem__(self, digest, path):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO digests (site, digest, path) VALUES (?, ?, ?)",
+                (self.site, digest, str(path)),
+            )
+
+    def __delitem__(self, digest):
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM digests WHERE site = ? AND digest = ?",
+                (self.site, digest),
+            )
+
+    def __contains__(self, digest):
+        return self.get(digest) is not None
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM digests WHERE site = ?", (self.site,)
+        ).fetchone()[0]
+
+    def update(self, digests):
+        """Add digests to the table.
+
+        Args:
+            digests (iterable of tuple[str, str|Path]): digests and the
+                paths of the pages they were made from.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO digests (site, digest, path) VALUES (?, ?, ?)",
+                ((self.site, digest, str(path)) for digest, path in digests),
+            )
+
+
+class CrawlStore:
+    """The crawl frontier and saved page digests of a site."""
+
+    def __init__(self, db_path, site):
+        """Initialise the CrawlStore class.
+
+        Args:
+            db_path (str|Path): path to the sqlite database.
+            site (str): the site that is crawled.
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.site = site
+        self.digests = DigestTable(self.connection, site)
+
+    def start(self, seeds, restart=False):
+        """Start a crawl, or continue an interrupted one.
+
+        If the previous crawl of the site was finished, or restart is
+        True, the frontier is emptied before seeds are added.
+
+        Args:
+            seeds (iterable of str): the links the crawl starts from.
+            restart (bool): forget an interrupted crawl.
+        """
+        if restart or not self.unvisited_count():
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM links WHERE site = ?", (self.site,)
+                )
+        self.add_links(seeds)
+
+    def add_links(self, links):
+        """Add links to the frontier, unless they are known already."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO links (site, link) VALUES (?, ?)",
+                ((self.site, link) for link in links),
+            )
+
+    def mark_visited(self, links):
+        """Mark links as visited."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO links (site, link, visited) VALUES (?, ?, 1) "
+                "ON CONFLICT (site, link) DO UPDATE SET visited = 1",
+                ((self.site, link) for link in links),
+            )
+
+    def is_visited(self, link):
+        """Check whether link has been visited."""
+        row = self.connection.execute(
+            "SELECT visited FROM links WHERE site = ? AND link = ?",
+            (self.site, link),
+        ).fetchone()
+        return row is not None and bool(row[0])
+
+    def unvisited(self, limit):
+        """Get links that have not been visited, in the order they were found.
+
+        Args:
+            limit (int): the maximum number of links.
+
+        Returns:
+            (list[str]): the unvisited links.
+        """
+        return [
+            link
+            for (link,) in self.connection.execute(
+                "SELECT link FROM links WHERE site = ? AND visited = 0 "
+                "ORDER BY rowid LIMIT ?",
+                (self.site, limit),
+            )
+        ]
+
+    def unvisited_count(self):
+        """Count the links that have not been visited."""
+        return self.count(visited=False)
+
+    def visited_count(self):
+        """Count the links that have been visited."""
+        return self.count(visited=True)
+
+    def count(self, visited):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM links WHERE site = ? AND visited = ?",
+            (self.site, int(visited)),
+        ).fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
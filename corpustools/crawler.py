@@ -25,29 +25,86 @@ from pathlib import Path
 
 from corpustools import namechanger, util
 from corpustools.adder import AdderError, AddToCorpus, UrlDownloader
+from corpustools.crawl_engine import CrawlEngine
+from corpustools.crawl_store import CrawlStore
 
 
 class Crawler:
-    """A base class to save downloaded files to the corpus."""
+    """A base class to save downloaded files to the corpus.
 
-    unvisited_links: set[str] = set()
-    visited_links: set[str] = set()
-    download_links: set[str] = set()
-    corpus_adders: dict[str, AddToCorpus] = {}
+    Attributes:
+        site: the name of the crawled site in the crawl store
+        seeds: the links a new crawl starts from
+    """
 
-    def __init__(self) -> None:
-        """Initialise the Crawler class."""
+    site: str = ""
+    seeds: list[str] = []
+
+    def __init__(self, restart: bool = False) -> None:
+        """Initialise the Crawler class.
+
+        Args:
+            restart: start a new crawl, even if the previous crawl of
+                the site was interrupted.
+        """
         gtlangs = os.getenv("GTLANGS")
         if not gtlangs:
             raise ValueError("GTLANGS not set")
         self.corpus_parent = Path(gtlangs)
-        self.downloader = UrlDownloader(os.path.join(self.corpus_parent, "tmp"))
+        self.engine = CrawlEngine(cache_dir=self.corpus_parent / "tmp" / "http_cache")
+        self.downloader = UrlDownloader(
+            os.path.join(self.corpus_parent, "tmp"), engine=self.engine
+        )
+        self.corpus_adders: dict[str, AddToCorpus] = {}
+        self.store = CrawlStore(
+            self.corpus_parent / "tmp" / "crawl_store.sqlite", self.site
+        )
+        self.store.start(self.seeds, restart=restart)
+        # The links crawled in the batch crawl_frontier is working on
+        self.batch_crawled: set[str] = set()
 
     def __del__(self):
         """Add all files to the corpus."""
         for _, corpus_adder in self.corpus_adders.items():
             corpus_adder.add_files_to_working_copy()
 
+    def next_links(self) -> list[str]:
+        """Get as many unvisited links as the engine fetches at a time."""
+        return self.store.unvisited(self.engine.max_workers)
+
+    def mark_crawled(self, *links: str) -> None:
+        """Remember that links are crawled in the current batch.
+
+        They are marked as visited in the store when the batch is done.
+        """
+        self.batch_crawled.update(links)
+
+    def link_url(self, link: str) -> str:
+        """Make the address of a link in the crawl store."""
+        return link
+
+    def crawl_frontier(self, crawl_pageset) -> None:
+        """Crawl the unvisited links until there are none left.
+
+        The links are fetched in batches, and marked as visited when
+        their batch is done, so an interrupted crawl continues with the
+        batch it was working on.
+
+        Args:
+            crawl_pageset: called with each unvisited link and its
+                fetched page.
+        """
+        while links := self.next_links():
+            self.batch_crawled = set()
+            results = self.engine.fetch_all(self.link_url(link) for link in links)
+            for link, (_, result) in zip(links, results, strict=True):
+                # The link may have been crawled as a parallel in this batch
+                if link not in self.batch_crawled:
+                    crawl_pageset(link, result)
+            self.store.mark_visited([*links, *self.batch_crawled])
+
+            print(f"Links in queue: {self.store.unvisited_count()}")
+
     def save_pages(self, pages):
         """Write pages to disk.
 
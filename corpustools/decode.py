@@ -25,7 +25,7 @@ done.
 """
 
 
-from corpustools import macsami, util, winsami2  # noqa: F401
+from corpustools import macsami, mari, util, winsami2  # noqa: F401
 
 CYRILLIC_LANGUAGES = ["mhr", "mrj"]
 
@@ -330,6 +330,37 @@ def guess_file_encoding(filename, mainlang):
         return winner
 
 
+# The CTYPES tables as (unwanted, wanted) pairs, with the pairs that would
+# not change anything left out.
+REPLACEMENTS = {
+    position: tuple(
+        (unwanted, wanted) for unwanted, wanted in table.items() if unwanted != wanted
+    )
+    for position, table in CTYPES.items()
+}
+
+
+class Indicators:
+    """Look up indicator strings in a text, searching for each at most once."""
+
+    def __init__(self, content):
+        """Initialise the Indicators class.
+
+        Args:
+            content (str): the text to search in
+        """
+        self.content = content
+        self.found = {}
+
+    def __contains__(self, indicator):
+        """Check whether indicator is found in the content."""
+        try:
+            return self.found[indicator]
+        except KeyError:
+            found = self.found[indicator] = indicator in self.content
+            return found
+
+
 def guess_body_encoding(content, mainlang):
     """Guess the encoding of the string content.
 
@@ -347,6 +378,8 @@ def guess_body_encoding(content, mainlang):
         (str): A codec name, as given in the keys of CTYPES, or None
             if no codec could be determined
     """
+    content = Indicators(content)
+
     winner = None
     if "ì" in content and "ò" in content and mainlang in CYRILLIC_LANGUAGES:
         winner = "cyrillic_in_pdf"
@@ -357,12 +390,12 @@ def guess_body_encoding(content, mainlang):
     ):
         winner = "mac-sami_to_cp1252"
     elif (
-        ("" in content and "ã" not in content)
-        or ("" in content)
+        ("\x87" in content and "ã" not in content)
+        or ("\x8c" in content)
         or ("¯" in content and "á" not in content)
     ):
         winner = "mac-sami_to_latin1"
-    elif "" in content and "ã":
+    elif "\x87" in content:
         winner = "mix-mac-sami-and-some-unknown-encoding"
     elif "³" in content and "¢" in content and "¤" in content:
         winner = "iso-ir-197_to_cp1252"
@@ -388,15 +421,14 @@ def default_decoder(position, text):
     """The default decoder.
 
     Args:
-        position (str):
+        position (str): an encoding name, as given in the keys of CTYPES
         text (str): The string that should be decoded.
 
     Returns:
         (str):
     """
     if position is not None:
-        for key, value in CTYPES[position].items():
-            text = text.replace(key, value)
+        text = util.replace_all(REPLACEMENTS[position], text)
 
     return text
 
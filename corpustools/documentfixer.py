@@ -19,7 +19,6 @@
 
 import os
 import re
-from copy import deepcopy
 
 from lxml import etree
 
@@ -272,29 +271,45 @@ class DocumentFixer:
         for child in element:
             self.fix_lang(child, lang)
 
+    @staticmethod
+    def _body_text(body):
+        """Collect the text content of the body for encoding guessing.
+
+        The text nodes are joined with newlines so that character
+        sequences spanning element boundaries are not created.
+
+        Args:
+            body (etree.Element): the body element
+
+        Returns:
+            (str): the text content of body
+        """
+        return "\n".join(body.itertext())
+
     def fix_body_encoding(self, mainlang):
         """Replace wrongly encoded saami chars with proper ones.
 
-        Send a stringified version of the body into the EncodingGuesser class.
-        It returns the same version, but with fixed characters.
-        Parse the returned string, insert it into the document
+        Guess the encoding from the text content of the body. If a fix is
+        needed, send a stringified version of the body into the decoder,
+        parse the returned string and insert it into the document.
         """
         self.replace_ligatures()
 
         body = self.root.find("body")
-        # Weird bug(?) in MacOS, the end tag of document lingers …
-        body_string = etree.tostring(body, encoding="unicode").replace(
-            "</document>", ""
-        )
-        body.getparent().remove(body)
+        encoding = decode.guess_body_encoding(self._body_text(body), mainlang)
 
-        encoding = decode.guess_body_encoding(body_string, mainlang)
+        if encoding is not None:
+            # Weird bug(?) in MacOS, the end tag of document lingers …
+            body_string = etree.tostring(body, encoding="unicode").replace(
+                "</document>", ""
+            )
+            body.getparent().remove(body)
 
-        try:
-            body = etree.fromstring(decode.decode_para(encoding, body_string))
-        except UnicodeEncodeError as error:
-            raise UserWarning(str(error)) from error
-        self.root.append(body)
+            try:
+                body = etree.fromstring(decode.decode_para(encoding, body_string))
+            except UnicodeEncodeError as error:
+                raise UserWarning(str(error)) from error
+            self.root.append(body)
 
         if mainlang in ["sms", "mns"]:
             for paragraph in body.iter("p"):
@@ -356,73 +371,108 @@ class DocumentFixer:
         return quote_list
 
     @staticmethod
-    def append_quotes(element, text, quote_list):
-        """Append quotes to an element.
+    def insert_quotes(element, position, text, quote_list):
+        """Insert quotes into an element.
 
         Args:
-            text (str): the plain text of the element.
+            element (etree.Element): the element the quotes belong to.
+            position (int): the child index where the first quote is inserted.
+            text (str): the plain text containing the quotes.
             quote_list (list of tuple of int): A list of span tuples containing
                 indexes to quotes found in text.
+
+        Returns:
+            (int): the child index following the last inserted quote.
         """
-        for index in range(0, len(quote_list)):
+        for index, (start, end) in enumerate(quote_list):
             span = etree.Element("span")
             span.set("type", "quote")
-            span.text = text[quote_list[index][0] : quote_list[index][1]]
+            span.text = text[start:end]
             if index + 1 < len(quote_list):
-                span.tail = text[quote_list[index][1] : quote_list[index + 1][0]]
+                span.tail = text[end : quote_list[index + 1][0]]
             else:
-                span.tail = text[quote_list[index][1] :]
-            element.append(span)
+                span.tail = text[end:]
+            element.insert(position, span)
+            position += 1
+
+        return position
 
     def _detect_quote(self, element):
         """Insert span elements around quotes.
 
+        The element is changed in place.
+
         Args:
             element (etree.Element): an etree element.
-        """
-        newelement = deepcopy(element)
-
-        element.text = ""
-        for child in element:
-            child.getparent().remove(child)
 
-        text = newelement.text
+        Returns:
+            (etree.Element): the element with quotes marked up.
+        """
+        position = 0
+        text = element.text
         if text:
             quote_list = self.get_quote_list(text)
             if quote_list:
                 element.text = text[0 : quote_list[0][0]]
-                self.append_quotes(element, text, quote_list)
-            else:
-                element.text = text
+                position = self.insert_quotes(element, position, text, quote_list)
 
-        for child in newelement:
-            if child.tag == "span" and child.get("type") == "quote":
-                element.append(child)
-            else:
-                element.append(self._detect_quote(child))
+        for child in list(element)[position:]:
+            if child.tag != "span" or child.get("type") != "quote":
+                self._detect_quote(child)
+            position += 1
 
-            if child.tail:
-                text = child.tail
+            text = child.tail
+            if text:
                 quote_list = self.get_quote_list(text)
                 if quote_list:
                     child.tail = text[0 : quote_list[0][0]]
-                    self.append_quotes(element, text, quote_list)
+                    position = self.insert_quotes(element, position, text, quote_list)
 
         return element
 
     def detect_quotes(self):
         """Detect quotes in all paragraphs."""
         for paragraph in self.root.iter("p"):
-            paragraph = self._detect_quote(paragraph)
+            self._detect_quote(paragraph)
+
+    @staticmethod
+    def _paragraph_wordcount(paragraph):
+        """Count the words in a paragraph."""
+        text = "".join(paragraph.itertext())
+        if paragraph.tail:
+            text += paragraph.tail
+
+        return len(re.findall(r"\S+", text))
 
     def calculate_wordcount(self):
         """Count the words in the file."""
-        plist = [
-            etree.tostring(paragraph, method="text", encoding="unicode")
-            for paragraph in self.root.iter("p")
-        ]
+        return str(
+            sum(
+                self._paragraph_wordcount(paragraph)
+                for paragraph in self.root.iter("p")
+            )
+        )
+
+    def fix_paragraphs(self, detect_quotes=True):
+        """Fix the content of all paragraphs in one traversal.
+
+        Replace soft hyphens with hyph tags, count the words and
+        (optionally) mark up quotes for each paragraph.
+
+        Args:
+            detect_quotes (bool): whether quotes should be marked up.
+
+        Returns:
+            (str): the number of words in the document.
+        """
+        wordcount = 0
+        for paragraph in self.root.iter("p"):
+            self.replace_shy(paragraph)
+            wordcount += self._paragraph_wordcount(paragraph)
+            if detect_quotes:
+                self._detect_quote(paragraph)
 
-        return str(len(re.findall(r"\S+", " ".join(plist))))
+        return str(wordcount)
 
     @staticmethod
     def _make_element(name, text, attributes=None):
@@ -27,9 +27,14 @@ import difflib
 import os
 import sys
 
-from lxml import etree
-
-from corpustools import argparse_version, ccat, corpuspath, move_files, util
+from corpustools import (
+    argparse_version,
+    ccat,
+    compression,
+    corpuspath,
+    move_files,
+    util,
+)
 
 
 class DupeFinder:
@@ -39,6 +44,7 @@ class DupeFinder:
 
     def __init__(self, directory):
         self.files = self._get_files(directory)
+        self.wordcounts = {filename: self.get_wc(filename) for filename in self.files}
         self.dupe_files = set()
 
     @staticmethod
@@ -64,7 +70,7 @@ class DupeFinder:
 
         filename (str): name of the file that should be searched.
         """
-        return etree.parse(filename1).xpath(".//parallel_text")
+        return compression.parse(filename1).xpath(".//parallel_text")
 
     def remove_dupe_file(self, filename1, filename2):
         """Remove duplicate files.
@@ -101,7 +107,7 @@ class DupeFinder:
         Returns:
             (float): the word count
         """
-        tree = etree.parse(filename)
+        tree = compression.parse(filename)
         w = tree.find(".//wordcount").text
 
         return float(w)
@@ -116,8 +122,8 @@ class DupeFinder:
         Returns:
             (bool): True if the ratio is larger than 0.9, False if it is less.
         """
-        w1 = self.get_wc(filename1)
-        w2 = self.get_wc(filename2)
+        w1 = self.wordcounts[filename1]
+        w2 = self.wordcounts[filename2]
 
         ratio = min(w1, w2) / max(w1, w2)
 
@@ -26,6 +26,8 @@ These ranges consist pairs of xpath paths, specified inside the metadata
 file that belongs to this epub file.
 """
 
+import re
+from collections import defaultdict
 from pathlib import Path
 from typing import Iterator
 
@@ -35,6 +37,10 @@ from lxml import etree
 from corpustools.util import ConversionError
 from corpustools.xslsetter import MetadataHandler
 
+XHTML = "http://www.w3.org/1999/xhtml"
+# A path into a chapter div of the html document made by extract_content
+CHAPTER_PATH = re.compile(r"^\.//html:body/html:div\[(?P<chapter>\d+)\](?P<rest>/.+)$")
+
 
 def read_chapter(chapter: BookChapter) -> etree._Element:
     """Read the contents of a epub_file chapter.
@@ -54,67 +60,163 @@ def read_chapter(chapter: BookChapter) -> etree._Element:
         raise ConversionError(error) from error
 
 
-def chapters(book: Book, metadata: MetadataHandler) -> Iterator[etree._Element]:
+def read_chapter_body(chapter: BookChapter) -> etree._Element | None:
+    """Read the body of a chapter, renamed to a div.
+
+    Args:
+        chapter: the chapter of an epub file
+
+    Returns:
+        The body of the chapter, or None if the chapter has no body.
+    """
+    chapterbody = read_chapter(chapter).find(f"{{{XHTML}}}body")
+    if chapterbody is not None:
+        chapterbody.tag = f"{{{XHTML}}}div"
+
+    return chapterbody
+
+
+def split_ranges(
+    ranges: list[tuple[str, str]],
+) -> tuple[dict[int, list[tuple[str, str]]], list[tuple[str, str]]]:
+    """Sort the skip ranges into chapter ranges and book ranges.
+
+    A range whose paths are both inside the same chapter div can be
+    removed from that chapter alone, right after it has been read. The
+    paths are rewritten to point into a document holding only that
+    chapter.
+
+    Ranges are removed in order, and a range that spans chapters may
+    remove whole chapters and so change the numbering of the chapter
+    divs. Therefore that range and all the ones after it are removed
+    from the whole book.
+
+    Args:
+        ranges: the (start, end) xpath pairs from the metadata file.
+
+    Returns:
+        The chapter ranges keyed by the one based position of the
+        chapter div, and the ranges that must be removed from the whole
+        book.
+    """
+    chapter_ranges: dict[int, list[tuple[str, str]]] = defaultdict(list)
+    for index, (path1, path2) in enumerate(ranges):
+        start = CHAPTER_PATH.match(path1)
+        end = CHAPTER_PATH.match(path2) if path2 else start
+        if start is None or end is None or start["chapter"] != end["chapter"]:
+            return chapter_ranges, ranges[index:]
+
+        chapter_ranges[int(start["chapter"])].append(
+            (
+                CHAPTER_PATH.sub(r".//html:body/html:div[1]\g<rest>", path1),
+                CHAPTER_PATH.sub(r".//html:body/html:div[1]\g<rest>", path2),
+            )
+        )
+
+    return chapter_ranges, []
+
+
+def remove_chapter_ranges(
+    chapterbody: etree._Element, ranges: list[tuple[str, str]]
+) -> None:
+    """Remove ranges of html elements from a chapter.
+
+    The chapter is put in an html document of its own while the ranges
+    are removed, so that the paths made by split_ranges find it.
+
+    Args:
+        chapterbody: the body of a chapter, renamed to a div.
+        ranges: the rewritten (start, end) xpath pairs of this chapter.
+    """
+    body = etree.SubElement(etree.Element(f"{{{XHTML}}}html"), f"{{{XHTML}}}body")
+    body.append(chapterbody)
+    for path1, path2 in ranges:
+        remove_range(path1, path2, body.getparent())
+
+
+def chapters(
+    book: Book,
+    metadata: MetadataHandler,
+    chapter_ranges: dict[int, list[tuple[str, str]]] | None = None,
+) -> Iterator[etree._Element]:
     """Get the all linear chapters of the epub book.
 
+    Excluded chapters are skipped before they are read, and the others
+    are read and parsed one at a time.
+
     Args:
         book: The epub book element
+        metadata: the metadata of the epub file.
+        chapter_ranges: the ranges to remove from each chapter, as made
+            by split_ranges.
 
     Yields:
         The body of an xhtml file found in the epub file.
     """
     excluded = metadata.epub_excluded_chapters
-    for index, chapter in enumerate(book.chapters):
-        if index not in excluded:
-            chapterbody = read_chapter(chapter).find(
-                "{http://www.w3.org/1999/xhtml}body"
-            )
-            if chapterbody is not None:
-                chapterbody.tag = "{http://www.w3.org/1999/xhtml}div"
-                yield chapterbody
-
-
-def extract_content(filename: Path, metadata: MetadataHandler) -> etree._Element:
+    included = (
+        chapter for index, chapter in enumerate(book.chapters) if index not in excluded
+    )
+    chapter_ranges = chapter_ranges or {}
+
+    position = 0
+    for chapterbody in map(read_chapter_body, included):
+        if chapterbody is not None:
+            position += 1
+            if position in chapter_ranges:
+                remove_chapter_ranges(chapterbody, chapter_ranges[position])
+            yield chapterbody
+
+
+def extract_content(
+    filename: Path,
+    metadata: MetadataHandler,
+    chapter_ranges: dict[int, list[tuple[str, str]]] | None = None,
+) -> etree._Element:
     """Extract content from the epub file.
 
     Args:
         filename: path to the document
+        metadata: the metadata of the epub file.
+        chapter_ranges: the ranges to remove from each chapter, as made
+            by split_ranges.
 
     Returns:
         The content of the epub file wrapped in html element
     """
-    mainbody = etree.Element("{http://www.w3.org/1999/xhtml}body")
-    html = etree.Element("{http://www.w3.org/1999/xhtml}html")
-    html.append(etree.Element("{http://www.w3.org/1999/xhtml}head"))
+    mainbody = etree.Element(f"{{{XHTML}}}body")
+    html = etree.Element(f"{{{XHTML}}}html")
+    html.append(etree.Element(f"{{{XHTML}}}head"))
     html.append(mainbody)
 
-    book = Book(open_epub(filename))
-
-    for chapterbody in chapters(book, metadata):
-        mainbody.append(chapterbody)
+    with open_epub(filename) as epub_file:
+        for chapterbody in chapters(Book(epub_file), metadata, chapter_ranges):
+            mainbody.append(chapterbody)
 
     return html
 
 
-def remove_ranges(metadata: MetadataHandler, html: etree._Element) -> None:
-    """Remove ranges of html elements."""
-    if metadata.skip_elements:
-        for pairs in metadata.skip_elements:
-            remove_range(pairs[0], pairs[1], html)
-
-
 def to_html_elt(filename: Path) -> etree._Element:
     """Append all chapter bodies as divs to an html file.
 
+    Ranges inside a single chapter are removed from that chapter as it
+    is read, the rest are removed from the whole book afterwards.
+
+    Args:
+        filename: path to the epub file.
+
     Returns:
         An etree.Element containing the content of all xhtml files found in
         the epub file as one xhtml document.
     """
-    filename = filename.with_suffix(filename.suffix + ".xsl")
-    metadata = MetadataHandler(filename, create=True)
-    html = extract_content(filename, metadata)
+    metadata = MetadataHandler(
+        filename.with_suffix(filename.suffix + ".xsl"), create=True
+    )
+    chapter_ranges, book_ranges = split_ranges(metadata.skip_elements or [])
     try:
-        remove_ranges(metadata, html)
+        html = extract_content(filename, metadata, chapter_ranges)
+        for path1, path2 in book_ranges:
+            remove_range(path1, path2, html)
     except AttributeError as error:
         raise ConversionError(
             "Check that skip_elements in the metadata file has the correct format"
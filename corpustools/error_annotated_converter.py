@@ -19,7 +19,7 @@ from pathlib import Path
 
 from lxml import etree
 
-from corpustools.error_annotated_sentence import parse_markup_to_sentence
+from corpustools.error_annotated_sentence import parse_markup
 from corpustools.util import ConversionError
 
 
@@ -32,7 +32,7 @@ def convert2intermediate(filename: Path) -> etree.Element:
     errors: list[tuple[int, str, ValueError]] = []
     for index, line in enumerate(filename.read_text(encoding="utf-8").splitlines()):
         try:
-            error_annotated = parse_markup_to_sentence(iter(line))
+            error_annotated = parse_markup(line)
             body.append(error_annotated.to_xml())
         except ValueError as error:
             errors.append((index, line, error))
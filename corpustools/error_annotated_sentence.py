@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from typing import Iterator
 
 from lxml import etree
 
-from corpustools.error_types import ErrorType, error_type_from_symbol
+from corpustools.error_types import (
+    ERROR_TYPES_BY_SYMBOL,
+    ErrorType,
+    error_type_from_symbol,
+)
+
+BRACES = re.compile("[{}]")
 
 
 @dataclass
@@ -40,7 +47,17 @@ def parse_markup_to_correction_segment(markup: Iterator[str]) -> CorrectionSegme
             break
         contents.append(char)
 
-    correction_str = "".join(contents)
+    return correction_segment_from_string("".join(contents))
+
+
+def correction_segment_from_string(correction_str: str) -> CorrectionSegment:
+    """Make a correction segment from the content of its braces.
+
+    Args:
+        correction_str: The correction markup, without the braces.
+    Returns:
+        A CorrectionSegment representing the parsed content.
+    """
     if "|" in correction_str:
         error_info, suggestions_str = correction_str.split("|", 1)
         suggestions = suggestions_str.split("///")
@@ -231,3 +248,101 @@ def parse_tail(markup: Iterator[str]) -> tuple[str, str | None]:
         tail_chars.append(char)
 
     return "".join(tail_chars), delimiter
+
+
+def parse_markup(markup: str) -> ErrorAnnotatedSentence:
+    """Parse an error annotated sentence.
+
+    Gives the same result as parse_markup_to_sentence(iter(markup)), but
+    jumps from brace to brace instead of reading one character at a time.
+
+    Args:
+        markup: A line of error markup.
+    Returns:
+        An ErrorAnnotatedSentence representing the parsed content.
+    """
+    return parse_sentence_at(markup, 0)[0]
+
+
+def parse_sentence_at(markup: str, pos: int) -> tuple[ErrorAnnotatedSentence, int]:
+    """Parse an error annotated sentence starting at pos.
+
+    Args:
+        markup: A line of error markup.
+        pos: Where the sentence starts.
+    Returns:
+        The sentence, and the position after it.
+    """
+    brace = BRACES.search(markup, pos)
+    if brace is None:
+        return ErrorAnnotatedSentence(head=markup[pos:], errors=[]), len(markup)
+
+    head = markup[pos : brace.start()]
+    pos = brace.end()
+    errors: list[ErrorMarkupSegment] = []
+    if brace.group() == "{":
+        delimiter: str | None = "{"
+        while delimiter == "{":
+            try:
+                error_segment, delimiter, pos = parse_error_markup_segment_at(
+                    markup, pos
+                )
+            except StopIteration:
+                # Unfinished error markup at the end of the line is dropped
+                return ErrorAnnotatedSentence(head=head, errors=errors), len(markup)
+            errors.append(error_segment)
+
+    return ErrorAnnotatedSentence(head=head, errors=errors), pos
+
+
+def parse_error_markup_segment_at(
+    markup: str, pos: int
+) -> tuple[ErrorMarkupSegment, str | None, int]:
+    """Parse an error markup segment starting after its opening brace.
+
+    Args:
+        markup: A line of error markup.
+        pos: Where the erroneous text starts.
+    Returns:
+        The segment, the brace following its tail (None at the end of
+        the line), and the position after that brace.
+    Raises:
+        StopIteration: If the line ends before the correction.
+        ValueError: If the error symbol is unknown.
+    """
+    error, pos = parse_sentence_at(markup, pos)
+    if pos >= len(markup):
+        raise StopIteration
+    symbol = markup[pos]
+    errortype = ERROR_TYPES_BY_SYMBOL.get(symbol)
+    if errortype is None:
+        raise ValueError(f"Unknown error symbol: «{symbol}»")
+    # Skip the brace opening the correction
+    if pos + 1 >= len(markup):
+        raise StopIteration
+
+    correction_end = markup.find("}", pos + 2)
+    if correction_end == -1:
+        correction_end = len(markup)
+    correction = correction_segment_from_string(markup[pos + 2 : correction_end])
+
+    brace = BRACES.search(markup, correction_end + 1)
+    if brace is None:
+        tail, delimiter, pos = markup[correction_end + 1 :], None, len(markup)
+    else:
+        tail, delimiter, pos = (
+            markup[correction_end + 1 : brace.start()],
+            brace.group(),
+            brace.end(),
+        )
+
+    return (
+        ErrorMarkupSegment(
+            error_markup=ErrorMarkup(
+                error=error, errortype=errortype, correction=correction
+            ),
+            tail=tail,
+        ),
+        delimiter,
+        pos,
+    )
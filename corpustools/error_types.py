@@ -75,6 +75,8 @@ class ErrorType(Enum):
 
 # Module-level convenience functions
 
+ERROR_TYPES_BY_SYMBOL = {error_type.symbol: error_type for error_type in ErrorType}
+
 
 def error_type_from_symbol(symbol: str) -> ErrorType | None:
     """Parse an error type from a symbol character.
@@ -89,10 +91,7 @@ def error_type_from_symbol(symbol: str) -> ErrorType | None:
         >>> error_type_from_symbol("$")
         <ErrorType.ERRORORT: ('errorort', '$')>
     """
-    for error_type in ErrorType:
-        if error_type.symbol == symbol:
-            return error_type
-    return None
+    return ERROR_TYPES_BY_SYMBOL.get(symbol)
 
 
 def all_error_symbols() -> list[str]:
@@ -16,44 +16,38 @@
 #   http://giellatekno.uit.no & http://divvun.no
 #
 """Convert html content to the Giella xml format."""
+import importlib
 import os
 from pathlib import Path
-from typing import Callable
 
 from lxml import etree, html
 from lxml.html import clean
 
-from corpustools import (
-    convert_using_pandoc,
-    convert_using_soffice,
-    epubconverter,
-    htmlconverter,
-    pdfconverter,
-    util,
-    xmlconverter,
-)
+from corpustools import util
 
 HERE = Path(__file__).parent
 
+# The modules making html of each file type. They are imported when a
+# file of that type is converted, so that e.g. the epub library is not
+# loaded to convert a docx file.
+HTML_CONVERTERS = {
+    ".doc": "convert_using_soffice",
+    ".docx": "convert_using_pandoc",
+    ".epub": "epubconverter",
+    ".html": "htmlconverter",
+    ".odt": "convert_using_pandoc",
+    ".pdf": "pdfconverter",
+    ".rtf": "convert_using_pandoc",
+    ".tex": "convert_using_pandoc",
+    ".writenow": "convert_using_soffice",
+    ".xml": "xmlconverter",
+}
 
 
 def to_html_elt(path: Path) -> etree.Element:
-    chooser: dict[str, Callable] = {
-        ".doc": convert_using_soffice.to_html_elt,
-        ".docx": convert_using_pandoc.to_html_elt,
-        ".epub": epubconverter.to_html_elt,
-        ".html": htmlconverter.to_html_elt,
-        ".odt": convert_using_pandoc.to_html_elt,
-        ".pdf": pdfconverter.to_html_elt,
-        ".rtf": convert_using_pandoc.to_html_elt,
-        ".tex": convert_using_pandoc.to_html_elt,
-        ".writenow": convert_using_soffice.to_html_elt,
-        ".xml": xmlconverter.to_html_elt,
-    }
-
-    assert path.suffix in chooser, f"Unsupported file type: {path.suffix}"
-    result = chooser[path.suffix](path)
-    return result
+    assert path.suffix in HTML_CONVERTERS, f"Unsupported file type: {path.suffix}"
+    module = importlib.import_module(f"corpustools.{HTML_CONVERTERS[path.suffix]}")
+    return module.to_html_elt(path)
 
 
 class HTMLBeautifier:
@@ -20,11 +20,21 @@
 
 
 import argparse
+import os
 import re
 
 from lxml import etree
 
-from corpustools import argparse_version, corpuspath, modes, util
+from corpustools import (
+    argparse_version,
+    cg3,
+    compression,
+    corpuspath,
+    modes,
+    profiling,
+    timeouts,
+    util,
+)
 from corpustools.common_arg_ncpus import NCpus
 
 DOMAIN_MAPPING = {
@@ -237,6 +247,60 @@ WORDFORM_FILTER = [
     '"<Čakčam>"',
     '"<čakčam>"',
 ]
+# - waiting for specifications on how these pieces of information will be
+# deployed in the corpus and presented in Korp: as substrings of the
+# msd-string or as extra attribute-value pairs choosable via the Korp
+# interface? - for now they ar just filtered away
+EXTRA_TAGS = [
+    "<cohort-with-dynamic-compound>",
+    "<ext>",
+    "<cs>",
+    "<hab>",
+    "<loc>",
+    "<gen>",
+    "<ctjHead>",
+]
+# Extra tags and wordforms are found with one generic pattern, and then
+# looked up in a set, instead of running one substitution for each of them.
+ANALYSIS_FILTER = frozenset(EXTRA_TAGS + WORDFORM_FILTER)
+ANALYSIS_FILTER_RE = re.compile(r' (<[^\s<>]+>|"<[^"\n]*>")')
+WEIGHT_RE = re.compile(r"<W\:[0-9]*\.*[0-9]*>\s*")
+COLON_LINE_RE = re.compile(
+    r""":\s*
+\s*
+
+\s*"""
+)
+UNUSED_TAGS = [
+    r"Use/[^\s]+\s",
+    r"Gram/[^\s]+\s",
+    r"OLang/[^\s]+\s",
+    r"Dial/[^\s]+\s",
+    r"CmpN/[^\s]+\s",
+    r"CmpNP/[^\s]+\s",
+    r"G3+\s",
+    r"v9+\s",
+    r"Err/[^\s]+\s",
+]
+UNUSED_TAGS_RE = re.compile("|".join(UNUSED_TAGS))
+UNUSED_TAGS_AND_SEM_RE = re.compile("|".join([r"Sem/[^\s]+\s"] + UNUSED_TAGS))
+MSD_REPLACEMENTS = {
+    "drop": "",
+    "relc": "Rel",
+    "slash": "_",
+    "space": ".",
+}
+MSD_RE = re.compile(
+    r"(?P<drop>IV\s|TV\s|Dyn|Known)|(?P<relc>Relc)|(?P<slash>/)|(?P<space>\s)"
+)
+GENERATION_REPLACEMENTS = {
+    "_∞1EX∞_": "+",
+    "Ex/": "",
+    "_∞1CO∞_": "+",
+    "_∞_": "+",
+}
+GENERATION_RE = re.compile(r"\s+|_∞1EX∞_|Ex/|_∞1CO∞_|_∞_")
+COMPOUND_DELIMITERS_RE = re.compile("(_™_)+")
 
 
 def pad_elements(elem):
@@ -514,19 +578,37 @@ def process_file(file):
     )
 
 
+def korp_mono_path(file):
+    """Get the path of the vrt file made from the analysed file."""
+    return corpuspath.make_corpus_path(file).korp_mono
+
+
+def parse_header(current_file):
+    """Parse the root and header of an analysed file, leaving out the body.
+
+    Args:
+        current_file (str): path to an analysed file.
+
+    Returns:
+        (etree.Element): the document element, containing only the header.
+    """
+    for _, element in compression.iterparse(
+        current_file, tag="header", huge_tree=True
+    ):
+        return element.getparent()
+
+    raise ValueError(f"{current_file} has no header")
+
+
 def make_vrt_xml(current_file, lang):
     """Convert analysis of a file into a vrt file
 
     Converting the analysis output into a suitable xml format for vrt
     transformation (vrt is the cwb input format)
     """
-    p = etree.XMLParser(encoding="utf-8", huge_tree=True)
-    xml_tree = etree.parse(current_file, parser=p)
-    old_root = xml_tree.getroot()
-
-    f_root = make_root_element(old_root)
+    f_root = make_root_element(parse_header(current_file))
     for s_id, sentence in enumerate(
-        make_sentences(valid_sentences(old_root.find(".//body/dependency").text), lang)
+        make_sentences(valid_sentences(cg3.dependency_lines(current_file)), lang)
     ):
         current_sentence = etree.SubElement(f_root, "sentence")
         current_sentence.set("id", str(s_id + 1))
@@ -555,50 +637,38 @@ def make_positional_attributes(sentence):
     return positional_attributes
 
 
+def filter_analysis(match):
+    """Remove the matched tag if it is one of the filtered ones."""
+    return "" if match.group(1) in ANALYSIS_FILTER else match.group(0)
+
+
 def reshape_analysis(analysis):
-    _analysis = analysis
     # ambiguity hack: mask '<' as lemma, i.e., in the context of '\n\t\"<'
-    _analysis = re.sub('\n\t"<', '\n\t"\\<', _analysis)
-    _analysis = re.sub('\n\t">', '\n\t"\\>', _analysis)
-    _analysis = re.sub(
-        r""":\s*
-\s*
-
-\s*""",
-        ":\n",
-        _analysis,
-    )
+    _analysis = analysis.replace('\n\t"<', '\n\t"\\<').replace('\n\t">', '\n\t"\\>')
+    _analysis = COLON_LINE_RE.sub(":\n", _analysis)
     # remove weights
-    _analysis = re.sub(r"<W\:[0-9]*\.*[0-9]*>\s*", "", _analysis)
+    _analysis = WEIGHT_RE.sub("", _analysis)
 
     # another hack while waiting for the fix: delete all initial line of a file starting with a colon
     if _analysis.startswith(":"):
         _analysis = re.sub("^:[^\n]*\n", "", _analysis)
 
-    # - waiting for specifications on how these pieces of information will be
-    # deployed in the corpus and presented in Korp: as substrings of the
-    # msd-string or as extra attribute-value pairs choosable via the Korp
-    # interface? - for now they ar just filtered away
-
-    for extra_tag in [
-        "<cohort-with-dynamic-compound>",
-        "<ext>",
-        "<cs>",
-        "<hab>",
-        "<loc>",
-        "<gen>",
-        "<ctjHead>",
-    ]:
-        _analysis = re.sub(" " + extra_tag, "", _analysis)
-
-    for wordform in WORDFORM_FILTER:
-        _analysis = re.sub(" " + wordform, "", _analysis)
+    _analysis = ANALYSIS_FILTER_RE.sub(filter_analysis, _analysis)
 
     ###logging.info('ANALYSIS_sentence|'+ _analysis + '|_')
 
     return _analysis
 
 
+def reshape_line(line):
+    """Reshape one line of the analysis the way reshape_analysis does."""
+    # ambiguity hack: mask '<' and '>' as lemma
+    if line.startswith(('\t"<', '\t">')):
+        line = '\t"\\' + line[2:]
+
+    return ANALYSIS_FILTER_RE.sub(filter_analysis, WEIGHT_RE.sub("", line))
+
+
 def extract_original_analysis(used_analysis, language):
     """Filter all Err- and Sem-tags from the string."""
     # lang-nob produces:
@@ -609,24 +679,9 @@ def extract_original_analysis(used_analysis, language):
             f'Use/{strange_use}"', f'Use/{strange_use} "'
         )
     if language == "sme":
-        used_analysis = group_sem(used_analysis)
-    else:
-        used_analysis = re.sub(r"Sem/[^\s]+\s", "", used_analysis)
-
-    for regex in [
-        r"Use/[^\s]+\s",
-        r"Gram/[^\s]+\s",
-        r"OLang/[^\s]+\s",
-        r"Dial/[^\s]+\s",
-        r"CmpN/[^\s]+\s",
-        r"CmpNP/[^\s]+\s",
-        r"G3+\s",
-        r"v9+\s",
-        r"Err/[^\s]+\s",
-    ]:
-        used_analysis = re.sub(regex, "", used_analysis)
+        return UNUSED_TAGS_RE.sub("", group_sem(used_analysis))
 
-    return used_analysis
+    return UNUSED_TAGS_AND_SEM_RE.sub("", used_analysis)
 
 
 def extract_used_analysis(used_analysis):
@@ -769,38 +824,20 @@ def lemma_generation(original_analysis, pos, _current_lang):
 
 
 def clean_msd(current_msd, pos):
-    current_msd = current_msd.strip()
-    for regex, replacement in [
-        (r"IV\s", ""),
-        (r"TV\s", ""),
-        ("Relc", "Rel"),
-        ("Dyn", ""),
-        ("Known", ""),
-        ("/", "_"),
-        (r"\s", "."),
-    ]:
-        current_msd = re.sub(regex, replacement, current_msd)
+    current_msd = MSD_RE.sub(
+        lambda match: MSD_REPLACEMENTS[match.lastgroup], current_msd.strip()
+    )
     # add the pos as first element of the msd string
     if current_msd == "___":
         return pos
     return pos + "." + current_msd
 
 
-def get_wordform_rest(current_cohort):
-    # discard all lines starting with ':' (= giella format of hfst)
-    cohort = re.split("\n:", current_cohort)[0]
-    # split word form from analysis
-    (word_form, *rest_cohort) = re.split('>"\n', cohort)
-    return (word_form, rest_cohort[0])
-
-
 def non_empty_cohorts(current_sentence):
-    for cohort in re.split('^"<|\n"<', current_sentence):
-        stripped = cohort.strip()
-        if not (stripped == "" or stripped == ":"):
-            (word_form, rest_cohort) = get_wordform_rest(stripped)
-            if word_form != "¶":
-                yield (word_form, rest_cohort)
+    """Yield the cohorts of a sentence that should end up in the vrt file."""
+    for cohort in current_sentence:
+        if cohort.wordform != "¶" and cohort.readings:
+            yield cohort
 
 
 # Anders: re.compile is sort of smart with caching and such, but just as an
@@ -810,10 +847,21 @@ __REG = re.compile(
 )
 
 
-def make_analysis_tuple(word_form, rest_cohort, language):
+def make_analysis_tuple(cohort, language):
+    """Make the positional attributes of a cohort.
+
+    Args:
+        cohort (cg3.Cohort): a cohort from the analysis.
+        language (str): the language of the analysis.
+
+    Returns:
+        (tuple): wordform, lemma, pos, msd, self id, function and parent id.
+    """
+    word_form = cohort.wordform
     # take the first analysis in case there are more than one non-disambiguated analyses
     original_analysis = extract_original_analysis(
-        sort_cohort(cohort_lines=re.split('\n\t"', rest_cohort))[0], language
+        sort_cohort(cohort_lines=[reading.text for reading in cohort.readings])[0],
+        language,
     )
 
     # put a clear delimiter between the (first) pos value and the rest of msd
@@ -826,7 +874,7 @@ def make_analysis_tuple(word_form, rest_cohort, language):
         maybe_pos = parts[1].replace("_∞_", "").strip()
     except IndexError:
         print(f"{word_form=}")
-        print(f"{rest_cohort=}")
+        print(f"{cohort.readings=}")
         print(f"{original_analysis=}")
         print(f"{extract_used_analysis(original_analysis)=}")
         raise
@@ -852,19 +900,25 @@ def make_analysis_tuple(word_form, rest_cohort, language):
     )
 
 
-def valid_sentences(analysis):
-    return (
-        sentence
-        for sentence in re.split("\n\n", reshape_analysis(analysis))
-        if sentence != "" and not sentence.startswith('"<¶')
-    )
+def valid_sentences(lines):
+    """Parse the lines of an analysis into the sentences worth keeping.
+
+    Args:
+        lines (iterable of str): the lines of a dependency analysis.
+
+    Yields:
+        (list of cg3.Cohort): sentences not starting with a ¶ cohort.
+    """
+    for sentence in cg3.sentences(reshape_line(line) for line in lines):
+        if not sentence[0].wordform.startswith("¶"):
+            yield sentence
 
 
 def make_sentence(current_sentence, current_lang):
     return make_positional_attributes(
         (
-            make_analysis_tuple(word_form, rest_cohort, current_lang)
-            for (word_form, rest_cohort) in non_empty_cohorts(current_sentence)
+            make_analysis_tuple(cohort, current_lang)
+            for cohort in non_empty_cohorts(current_sentence)
         )
     )
 
@@ -932,17 +986,12 @@ def get_generation_string(used_analysis, pos, lang):
 
 def clean_string2generate(string2generate):
     ### replace all delimiter by '+' and '_™_' by '#'
-    for regex, replacement in [
-        (r"\s+", "+"),
-        ("_∞1EX∞_", "+"),
-        ("Ex/", ""),
-        ("_∞1CO∞_", "+"),
-        ("_∞_", "+"),
-        ("(_™_)+", "_™_"),
-    ]:
-        string2generate = re.sub(regex, replacement, string2generate)
+    string2generate = GENERATION_RE.sub(
+        lambda match: GENERATION_REPLACEMENTS.get(match.group(), "+"),
+        string2generate,
+    )
 
-    return string2generate
+    return COMPOUND_DELIMITERS_RE.sub("_™_", string2generate)
 
 
 def make_string2generate(lemma, tail):
@@ -980,7 +1029,7 @@ def generate_lemma(in_string, c_lang):
 
 def parse_options():
     parser = argparse.ArgumentParser(
-        parents=[argparse_version.parser],
+        parents=[argparse_version.parser, profiling.parser, timeouts.parser],
         description="Turn analysed files into vrt format xml files for Korp use.",
     )
 
@@ -1027,9 +1076,30 @@ def main():
             raise SystemExit(0)
         files = non_skipped_files
 
-    if args.serial:
-        for i, file in enumerate(files, start=1):
-            print(f"Converting: [{i}/{len(files)}] {file}")
-            process_file(file)
-    else:
-        util.run_in_parallel(process_file, args.ncpus, files)
+    profiler = profiling.make_profiler(args)
+    process = profiling.profiled(
+        profiler, process_file, "korp_mono", output_of=korp_mono_path
+    )
+    limits = timeouts.make_limits(args)
+    try:
+        if args.serial:
+            failed = []
+            for i, file in enumerate(files, start=1):
+                print(f"Converting: [{i}/{len(files)}] {file}")
+                try:
+                    timeouts.call(limits, process, file)
+                except timeouts.TIMEOUT_ERRORS as error:
+                    print(f"{file} timed out: {error}")
+                    failed.append((file, error))
+        else:
+            failed = util.run_in_parallel(
+                process,
+                args.ncpus,
+                files,
+                [os.path.getsize(file) for file in files],
+                limits=limits,
+            )
+        timeouts.report_failures(args, failed)
+    finally:
+        if profiler is not None:
+            profiler.finish()
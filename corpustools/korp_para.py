@@ -1,28 +1,62 @@
 import argparse
-import multiprocessing
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from lxml import etree
 
-from corpustools import analyser, argparse_version, corpuspath, korp_mono, util
+from corpustools import analyser, argparse_version, cg3, corpuspath, korp_mono, util
+from corpustools.common_arg_ncpus import NCpus
 
 LANGS_RE = re.compile(r"/(\w+)2(\w+)/")
+BOUNDARY = "¶"
+BOUNDARY_COHORT = f'"<{BOUNDARY}>"'
+BATCH_SIZE = 50000
+# 0 is the language of the tmx file, 1 the language of its parallel
+LANGUAGE_INDEXES = (0, 1)
 
 
-def process_in_parallel(files_list):
-    """Process file in parallel."""
+def process_in_parallel(files_list, pool_size, batch_size=BATCH_SIZE):
+    """Analyse both languages of the tmx files in a process pool.
 
-    pool_size = multiprocessing.cpu_count() * 2
-    pool = multiprocessing.Pool(processes=pool_size)
-    pool.map(process_file, files_list)
-    pool.close()  # no more tasks
-    pool.join()  # wrap up current tasks
+    Each language of each file is analysed as a job of its own. A file
+    is written as soon as the analyses of both its languages are done.
 
+    Args:
+        files_list (list[Path]): the tmx files to process.
+        pool_size (int): the number of worker processes.
+        batch_size (int): the number of characters sent to each
+            divvun-checker call.
+    """
+    files_list = list(files_list)
+    print(f"Analysing {len(files_list)} tmx files with {pool_size} workers")
+    analyses = {tmx_file: {} for tmx_file in files_list}
+    with ProcessPoolExecutor(max_workers=pool_size) as pool:
+        futures = {
+            pool.submit(analyse_language, tmx_file, index, batch_size): tmx_file
+            for tmx_file in files_list
+            for index in LANGUAGE_INDEXES
+        }
+        for future in as_completed(futures):
+            tmx_file = futures[future]
+            try:
+                lang, lang_analyses = future.result()
+            except (OSError, UserWarning, etree.XMLSyntaxError) as error:
+                print(f"Could not analyse {tmx_file}: {error}", file=sys.stderr)
+                analyses[tmx_file] = None
+                continue
 
-def process_serially(files_list):
+            if analyses[tmx_file] is None:
+                continue
+            analyses[tmx_file][lang] = lang_analyses
+            if len(analyses[tmx_file]) == len(LANGUAGE_INDEXES):
+                write_analyses(tmx_file, analyses.pop(tmx_file))
+
+
+def process_serially(files_list, batch_size=BATCH_SIZE):
     for file_ in files_list:
         print(f"Converting: {file_}")
-        process_file(file_)
+        process_file(file_, batch_size)
 
 
 def handle_header(header, genre_name):
@@ -31,62 +65,253 @@ def handle_header(header, genre_name):
     header.insert(1, genre)
 
 
-def make_analysis_element(analysis, lang):
-    analysis_element = etree.Element("analysis")
-    analysis_element.text = (
-        "\n".join(korp_mono.make_sentences(korp_mono.valid_sentences(analysis), lang))
+def make_analysis_text(analysis, lang):
+    """Turn the analysis of a segment into korp positional attributes."""
+    return (
+        "\n".join(
+            korp_mono.make_sentences(
+                korp_mono.valid_sentences(analysis.splitlines()), lang
+            )
+        )
         + "\n"
     )
 
-    return analysis_element
 
+def tmx_paths(tmx_file):
+    """Make corpus paths to the tmx file and its parallel tmx file.
 
-def process_file(tmx_file):
-    print("... processing", str(tmx_file))
+    Args:
+        tmx_file (str): path to a tmx file.
+
+    Returns:
+        (tuple[CorpusPath, CorpusPath, str]): the corpus paths of the
+            tmx file and of its parallel, and the parallel language.
+    """
     path1 = corpuspath.make_corpus_path(tmx_file)
     para_lang = path1.filepath.parts[1]
     path2 = corpuspath.make_corpus_path(path1.tmx(para_lang))
 
-    tree = etree.parse(tmx_file)
-    f_root = tree.getroot()
-    handle_header(f_root.find(".//header"), path1.filepath.parts[0])
-    for path in [path1, path2]:
-        add_analysis_elements(tree, path)
-    write_file(path1.korp_tmx(para_lang), tree)
+    return path1, path2, para_lang
+
 
+def process_file(tmx_file, batch_size=BATCH_SIZE):
+    print("... processing", str(tmx_file))
+    write_analyses(
+        tmx_file,
+        dict(
+            analyse_language(tmx_file, index, batch_size) for index in LANGUAGE_INDEXES
+        ),
+    )
 
-def make_analyses(lang, modename, text):
-    analysis = []
-    for line in analyser.do_dependency_analysis(text, modename, lang).split("\n"):
-        if "¶" in line and analysis:
-            yield "\n".join(analysis)
-            analysis = []
-        else:
-            analysis.append(line)
 
-    if analysis:
-        yield "\n".join(analysis)
+def write_analyses(tmx_file, analyses):
+    """Add the analyses to the tuvs of tmx_file and write the korp tmx file.
 
+    Args:
+        tmx_file (str): path to a tmx file.
+        analyses (dict[str, list[str|None]]): the analysis texts of each
+            tuv, for each language.
+    """
+    path1, _, para_lang = tmx_paths(tmx_file)
+    tree = etree.parse(tmx_file)
+    handle_header(tree.getroot().find(".//header"), path1.filepath.parts[0])
+    for lang, lang_analyses in analyses.items():
+        add_analysis_elements(tree, lang, lang_analyses)
+    write_file(path1.korp_tmx(para_lang), tree)
 
-def add_analysis_elements(tree, path):
-    modename = analyser.get_modename(path)
-    lang = path.lang
-    tuv_elements = tree.xpath(
+
+def tuv_elements(tree, lang):
+    return tree.xpath(
         './/tuv[@xml:lang="' + lang + '"]',
         namespaces={"xml": "http://www.w3.org/XML/1998/namespace"},
     )
 
-    analyses = make_analyses(
-        lang, modename, text="¶ ".join([tuv.find("seg").text for tuv in tuv_elements])
+
+def prepare_segment(text):
+    """Make segment text ready for analysis.
+
+    The segment is put on one line, and BOUNDARY is reserved for marking
+    the end of a segment.
+    """
+    return " ".join((text or "").replace(BOUNDARY, " ").split())
+
+
+def make_batches(segments, batch_size):
+    """Group segments into batches of about batch_size characters."""
+    batch = []
+    size = 0
+    for segment in segments:
+        if batch and size + len(segment) > batch_size:
+            yield batch
+            batch = []
+            size = 0
+        batch.append(segment)
+        size += len(segment)
+
+    if batch:
+        yield batch
+
+
+def wordforms(analysis):
+    """The wordforms of the analysis, without whitespace."""
+    return "".join(
+        "".join(cohort.wordform.split())
+        for cohort in cg3.cohorts(analysis.splitlines())
     )
 
-    for tuv, analysis in zip(tuv_elements, analyses, strict=False):
+
+def split_analysis(analysis, batch):
+    """Split the analysis of a batch into one analysis per segment.
+
+    Args:
+        analysis (str): the analysis of the segments in batch, each of
+            them followed by a BOUNDARY.
+        batch (list[str]): the analysed segments.
+
+    Returns:
+        (list[str]|None): the analysis of each segment, or None if the
+            analysis is not aligned with the segments.
+    """
+    analyses = []
+    lines = []
+    in_boundary = False
+    for line in analysis.splitlines():
+        if line.startswith(BOUNDARY_COHORT):
+            analyses.append("\n".join(lines))
+            lines = []
+            in_boundary = True
+        elif not (in_boundary and line.startswith("\t")):
+            in_boundary = False
+            lines.append(line)
+
+    if len(analyses) != len(batch) or wordforms("\n".join(lines)):
+        return None
+
+    for segment_analysis, segment in zip(analyses, batch, strict=True):
+        if wordforms(segment_analysis) != "".join(segment.split()):
+            return None
+
+    return analyses
+
+
+def analyse_batch(batch, analyser_zpipe_path, modename):
+    """Analyse a batch of segments.
+
+    If the analysis cannot be aligned with the segments, the batch is
+    split in two and analysed again, until each segment is analysed on
+    its own. A single segment that still cannot be aligned is analysed
+    once more without the BOUNDARY, and that analysis is used as is.
+
+    Args:
+        batch (list[str]): segments prepared by prepare_segment.
+        analyser_zpipe_path (Path): the zpipe file to use for analysis.
+        modename (str): the pipeline to use in the zpipe file.
+
+    Returns:
+        (list[str]): the analysis of each segment.
+    """
+    result = analyser.run_divvun_checker(
+        "".join(f"{segment} {BOUNDARY}\n" for segment in batch),
+        analyser_zpipe_path,
+        modename,
+    )
+    if result.stderr and not result.stdout:
+        raise UserWarning(f"divvun-checker failed: {result.stderr}")
+
+    analyses = split_analysis(result.stdout, batch)
+    if analyses is not None:
+        return analyses
+
+    if len(batch) == 1:
+        util.print_frame(f"Analysis does not match the segment: {batch[0]}")
+        return [
+            analyser.run_divvun_checker(
+                f"{batch[0]}\n", analyser_zpipe_path, modename
+            ).stdout
+        ]
+
+    util.print_frame(f"Misaligned analysis of {len(batch)} segments, splitting")
+    middle = len(batch) // 2
+    first = analyse_batch(batch[:middle], analyser_zpipe_path, modename)
+    second = analyse_batch(batch[middle:], analyser_zpipe_path, modename)
+
+    return first + second
+
+
+def analyse_segments(segments, analyser_zpipe_path, modename, batch_size=BATCH_SIZE):
+    """Analyse segments in batches.
+
+    Args:
+        segments (list[str]): the text of the segments.
+        analyser_zpipe_path (Path): the zpipe file to use for analysis.
+        modename (str): the pipeline to use in the zpipe file.
+        batch_size (int): the number of characters sent to each
+            divvun-checker call.
+
+    Returns:
+        (list[str]): the analysis of each segment.
+    """
+    analyses = []
+    for batch in make_batches(
+        [prepare_segment(segment) for segment in segments], batch_size
+    ):
+        analyses.extend(analyse_batch(batch, analyser_zpipe_path, modename))
+
+    return analyses
+
+
+def analyse_language(tmx_file, index, batch_size=BATCH_SIZE):
+    """Analyse the segments of one of the languages in a tmx file.
+
+    Args:
+        tmx_file (str): path to a tmx file.
+        index (int): 0 for the language of tmx_file, 1 for its parallel.
+        batch_size (int): the number of characters sent to each
+            divvun-checker call.
+
+    Returns:
+        (tuple[str, list[str|None]]): the language and the analysis text
+            of each of its tuvs, None where the analysis could not be
+            turned into korp format.
+    """
+    path = tmx_paths(tmx_file)[index]
+    lang = path.lang
+    analyser_zpipe_path = analyser.find_analyser_zpipe(lang)
+    if analyser_zpipe_path is None:
+        raise UserWarning(f"No analyser found for {lang}")
+
+    segments = [
+        tuv.findtext("seg") for tuv in tuv_elements(etree.parse(tmx_file), lang)
+    ]
+    analyses = analyse_segments(
+        segments, analyser_zpipe_path, analyser.get_modename(path), batch_size
+    )
+
+    texts = []
+    for segment, analysis in zip(segments, analyses, strict=True):
         try:
-            tuv.append(make_analysis_element(analysis, lang))
+            texts.append(make_analysis_text(analysis, lang))
         except IndexError:
             util.print_frame(lang)
-            util.print_frame(tuv.find("seg").text)
+            util.print_frame(segment)
             util.print_frame(analysis)
+            texts.append(None)
+
+    return lang, texts
+
+
+def add_analysis_elements(tree, lang, analyses):
+    """Add analysis elements to the tuvs of lang.
+
+    Args:
+        tree (etree.ElementTree): the tmx document.
+        lang (str): the language of the tuvs.
+        analyses (list[str|None]): the analysis text of each tuv.
+    """
+    for tuv, analysis in zip(tuv_elements(tree, lang), analyses, strict=True):
+        if analysis is not None:
+            analysis_element = etree.SubElement(tuv, "analysis")
+            analysis_element.text = analysis
 
 
 def write_file(tmx_file, tree):
@@ -101,11 +326,19 @@ def parse_options():
         description="Prepare tmx files for use in Korp.",
     )
 
+    parser.add_argument("--ncpus", action=NCpus)
     parser.add_argument(
         "--serial",
         action="store_true",
         help="When this argument is used files will be converted one by one.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help="The number of characters sent to each divvun-checker call. "
+        f"Default is {BATCH_SIZE}.",
+    )
     parser.add_argument(
         "tmx_entities", nargs="+", help="tmx files or directories where tmx files live"
     )
@@ -115,7 +348,8 @@ def parse_options():
 
 def main():
     args = parse_options()
+    files = corpuspath.collect_files(args.tmx_entities, suffix=".tmx")
     if args.serial:
-        process_serially(corpuspath.collect_files(args.tmx_entities, suffix=".tmx"))
+        process_serially(files, args.batch_size)
     else:
-        process_in_parallel(corpuspath.collect_files(args.tmx_entities, suffix=".tmx"))
+        process_in_parallel(files, args.ncpus, args.batch_size)
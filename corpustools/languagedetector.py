@@ -18,8 +18,28 @@
 """This file contains classes fix converted documents."""
 
 import os
+from functools import cached_property, lru_cache
 
 HERE = os.path.dirname(__file__)
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+# Boilerplate paragraphs (headers, footers, captions) recur across a
+# corpus, remember the language of the most recently seen texts.
+CLASSIFY_CACHE_SIZE = 10000
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def classify(language_guesser, text, langs):
+    """Classify text, remembering the most recent results.
+
+    Args:
+        language_guesser (text_cat.Classifier): the classifier.
+        text (str): whitespace normalised text.
+        langs (frozenset[str]): the candidate languages.
+
+    Returns:
+        (str): the language of the text.
+    """
+    return language_guesser.classify(text, langs=sorted(langs))
 
 
 class LanguageDetector:
@@ -35,11 +55,11 @@ class LanguageDetector:
         self.document = document
         self.language_guesser = language_guesser
 
-    @property
+    @cached_property
     def inlangs(self):
         """Return the predifined possible languages of the document."""
         inlangs = [
-            language.get("{http://www.w3.org/XML/1998/namespace}" "lang")
+            language.get(XML_LANG)
             for language in self.document.findall("header/multilingual/language")
         ]
         if inlangs:
@@ -50,7 +70,26 @@ class LanguageDetector:
     @property
     def mainlang(self):
         """Get the mainlang of the file."""
-        return self.document.attrib["{http://www.w3.org/XML/1998/namespace}lang"]
+        return self.document.attrib[XML_LANG]
+
+    @cached_property
+    def candidate_langs(self):
+        """The languages the language guesser should choose between."""
+        if self.language_guesser is None:
+            return frozenset()
+
+        return frozenset(self.language_guesser.get_langs(self.inlangs))
+
+    def classify(self, text):
+        """Find the language of text among the candidate languages."""
+        return classify(
+            self.language_guesser, " ".join(text.split()), self.candidate_langs
+        )
+
+    def set_language(self, element, lang):
+        """Set xml:lang of element, unless lang is the main language."""
+        if lang != self.mainlang:
+            element.set(XML_LANG, lang)
 
     def set_paragraph_language(self, paragraph):
         """Set xml:lang of paragraph.
@@ -59,53 +98,71 @@ class LanguageDetector:
         language of the paragraph.
         Set the language of the quotes in the paragraph.
         """
-        if paragraph.get("{http://www.w3.org/XML/1998/namespace}lang") is None:
-            paragraph_text = self.remove_quote(paragraph)
-            if self.language_guesser is not None and self.language_guesser.get_langs(
-                self.inlangs
-            ):
-                lang = self.language_guesser.classify(
-                    paragraph_text, langs=self.inlangs
-                )
-                if lang != self.mainlang:
-                    paragraph.set("{http://www.w3.org/XML/1998/namespace}lang", lang)
-
-                self.set_span_language(paragraph)
+        if paragraph.get(XML_LANG) is None and self.candidate_langs:
+            paragraph_text, quotes = self.collect_texts(paragraph)
+            self.set_language(paragraph, self.classify(paragraph_text))
+            for quote in quotes:
+                self.set_language(quote, self.classify(quote.text))
 
         return paragraph
 
-    def set_span_language(self, paragraph):
-        """Set xml:lang of span element."""
-        for element in paragraph.iter("span"):
-            if element.get("type") == "quote":
-                if element.text is not None:
-                    lang = self.language_guesser.classify(
-                        element.text, langs=self.inlangs
-                    )
-                    if lang != self.mainlang:
-                        element.set("{http://www.w3.org/XML/1998/namespace}lang", lang)
-
     @staticmethod
-    def remove_quote(paragraph):
-        """Extract all text except the one inside <span type='quote'>."""
-        text = ""
+    def collect_texts(paragraph):
+        """Collect the texts of paragraph in one pass.
+
+        Args:
+            paragraph (etree.Element): a p element.
+
+        Returns:
+            (tuple[str, list[etree.Element]]): all text except the one
+                inside <span type='quote'>, and the quote spans that
+                contain text.
+        """
+        texts = []
+        quotes = []
         for element in paragraph.iter():
-            if (
-                element.tag == "span"
-                and element.get("type") == "quote"
-                and element.tail is not None
-            ):
-                text = text + element.tail
+            if element.tag == "span" and element.get("type") == "quote":
+                if element.text is not None:
+                    quotes.append(element)
+                if element.tail is not None:
+                    texts.append(element.tail)
             else:
                 if element.text is not None:
-                    text = text + element.text
+                    texts.append(element.text)
                 if element.tail is not None:
-                    text = text + element.tail
+                    texts.append(element.tail)
 
-        return text
+        return "".join(texts), quotes
+
+    @staticmethod
+    def remove_quote(paragraph):
+        """Extract all text except the one inside <span type='quote'>."""
+        return LanguageDetector.collect_texts(paragraph)[0]
 
     def detect_language(self):
-        """Detect language in all the paragraphs in self.document."""
-        if self.document.find("header/multilingual") is not None:
-            for paragraph in self.document.iter("p"):
-                self.set_paragraph_language(paragraph)
+        """Detect language in all the paragraphs in self.document.
+
+        The texts of all paragraphs and quotes are collected first, and
+        each distinct text is classified only once.
+        """
+        if (
+            self.document.find("header/multilingual") is None
+            or not self.candidate_langs
+        ):
+            return
+
+        paragraphs = [
+            (paragraph, *self.collect_texts(paragraph))
+            for paragraph in self.document.iter("p")
+            if paragraph.get(XML_LANG) is None
+        ]
+        texts = {
+            text
+            for _, paragraph_text, quotes in paragraphs
+            for text in [paragraph_text, *(quote.text for quote in quotes)]
+        }
+        langs = {text: self.classify(text) for text in texts}
+        for paragraph, paragraph_text, quotes in paragraphs:
+            self.set_language(paragraph, langs[paragraph_text])
+            for quote in quotes:
+                self.set_language(quote, langs[quote.text])
@@ -22,7 +22,6 @@
 from collections import defaultdict
 from pathlib import Path
 from pprint import pprint
-from time import sleep
 
 import requests
 from lxml import etree
@@ -35,17 +34,24 @@ from corpustools.versioncontrol import vcs
 class NrkNoCrawler(Crawler):
     """Collect pages from nrk.no."""
 
+    site: str = "nrk.no"
     langs: list[str] = ["sme", "sma", "smj", "nob"]
     limit: int = 1000
     counter: defaultdict[str, int] = defaultdict(int)
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, restart: bool = False) -> None:
+        """Initialise the NrkNoCrawler class.
+
+        Args:
+            restart: start a new crawl, even if the previous crawl was
+                interrupted.
+        """
+        super().__init__(restart=restart)
         print("init nrk.no")
-        self.visited_links = self.get_fetched_ids()
-        print("visited links:", len(self.visited_links))
-        self.unvisited_links = self.fetchable_ids()
-        print("unvisited links:", len(self.unvisited_links))
+        self.store.mark_visited(self.get_fetched_ids())
+        print("visited links:", self.store.visited_count())
+        self.store.add_links(self.get_article_ids())
+        print("unvisited links:", self.store.unvisited_count())
         self.vcs = {
             lang: vcs(self.corpus_parent / f"corpus-{lang}-orig-x-closed")
             for lang in self.langs
@@ -64,9 +70,11 @@ class NrkNoCrawler(Crawler):
             f"https://www.nrk.no/serum/api/content/json/1.13572943?start=2&limit={self.limit}&context=items",  # https://www.nrk.no/sapmi/aaarjelsaemiengielesne/
         ]
 
-        responses = (requests.get(url) for url in json_sources)
-
-        response_jsons = (response.json() for response in responses)
+        response_jsons = (
+            response.json()
+            for _, response in self.engine.fetch_all(json_sources)
+            if response is not None
+        )
 
         return {
             relation.get("id")
@@ -74,10 +82,6 @@ class NrkNoCrawler(Crawler):
             for relation in data.get("relations")
         }
 
-    def fetchable_ids(self) -> set[str]:
-        article_ids = self.get_article_ids()
-        return article_ids - self.visited_links
-
     def get_fetched_ids(self) -> set[str]:
         """Find articles ids of fetched documents.
 
@@ -99,15 +103,28 @@ class NrkNoCrawler(Crawler):
             for file_ in Path(path).glob("*.xsl")
         }
 
-    def crawl_page(self, article_id: str) -> NrkNoPage | None:
-        """Collect links from a page."""
-        self.visited_links.add(article_id)
-        try:
-            result = requests.get(f"https://nrk.no/sapmi/{article_id}", timeout=10)
-        except (requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout):
-            return None
+    def link_url(self, link: str) -> str:
+        """Make the address of an article.
+
+        Args:
+            link: the id of the article.
+        """
+        return f"https://nrk.no/sapmi/{link}"
 
-        if not result.ok:
+    def crawl_page(
+        self, article_id: str, result: requests.Response | None = None
+    ) -> NrkNoPage | None:
+        """Collect links from a page.
+
+        Args:
+            article_id: the id of the article.
+            result: the article page, if it is already fetched.
+        """
+        self.mark_crawled(article_id)
+        if result is None:
+            result = self.engine.try_fetch(self.link_url(article_id))
+
+        if result is None or not result.ok:
             return None
 
         content_type = result.headers.get("content-type")
@@ -124,33 +141,24 @@ class NrkNoCrawler(Crawler):
 
         orig_page = NrkNoPage(result.url, etree.HTML(result.text), self.corpus_parent)
 
-        self.unvisited_links.update(orig_page.links)
+        self.store.add_links(orig_page.links)
 
         return orig_page
 
     def crawl_site(self):
         print("Crawling nrk.no.")
-        while self.unvisited_links:
-            article_id = self.unvisited_links.pop()
-            if article_id not in self.visited_links:
-                try:
-                    self.crawl_pageset(article_id)
-                except NrkNoUnknownPageError as error:
-                    print(f"Error: {error}")
-                sleep(0.5)
-
-            self.unvisited_links.difference_update(self.visited_links)
-            print(
-                article_id,
-                "U:",
-                len(self.unvisited_links),
-                "V:",
-                len(self.visited_links),
-                end="\r",
-            )
-
+        self.crawl_frontier(self.try_crawl_pageset)
         pprint(self.counter)
 
+    def try_crawl_pageset(
+        self, article_id: str, result: requests.Response | None = None
+    ) -> None:
+        """Crawl a pageset, reporting pages of unknown types."""
+        try:
+            self.crawl_pageset(article_id, result)
+        except NrkNoUnknownPageError as error:
+            print(f"Error: {error}")
+
     @staticmethod
     def set_parallel_info(parallel_pages):
         """Set the parallels for this set of parallel pages."""
@@ -166,8 +174,10 @@ class NrkNoCrawler(Crawler):
                 parallel_page2.lang, parallel_page2.basename
             )
 
-    def crawl_pageset(self, article_id: str) -> None:
-        orig_page = self.crawl_page(article_id)
+    def crawl_pageset(
+        self, article_id: str, result: requests.Response | None = None
+    ) -> None:
+        orig_page = self.crawl_page(article_id, result)
         if orig_page is None:
             print(f"Could not crawl {article_id}.")
             return
@@ -190,8 +200,15 @@ class NrkNoCrawler(Crawler):
         Returns:
             A list of parallel pages.
         """
+        parallel_ids = list(orig_page.parallel_ids)
+        results = self.engine.fetch_all(
+            self.link_url(article_id) for article_id in parallel_ids
+        )
         pages = [orig_page]
-        pages.extend([self.crawl_page(link) for link in orig_page.parallel_ids])
+        pages.extend(
+            self.crawl_page(article_id, result)
+            for article_id, (_, result) in zip(parallel_ids, results, strict=True)
+        )
 
         # If we only have norwegian, we don't want to save any pages
         page_langs = {page.lang for page in pages if page is not None}
@@ -4,7 +4,7 @@ from typing import Iterable
 from lxml import etree
 
 from corpustools.corpuspath import make_corpus_path
-from corpustools.text_cat import Classifier
+from corpustools.text_cat import default_classifier
 
 
 class NrkNoUnknownPageError(Exception):
@@ -16,7 +16,6 @@ class NrkNoUnknownPageError(Exception):
 class NrkNoPage:
     """Save a NRK sápmi page to the corpus."""
 
-    languageguesser = Classifier()
     language_codes = {
         "nob",
         "sma",
@@ -24,6 +23,11 @@ class NrkNoPage:
         "smj",
     }
 
+    @property
+    def languageguesser(self):
+        """The language guesser, loaded when the first page is made."""
+        return default_classifier()
+
     def __init__(
         self,
         original_url: str,
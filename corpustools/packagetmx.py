@@ -21,9 +21,11 @@
 import argparse
 import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from corpustools import corpuspath
+from corpustools.common_arg_ncpus import NCpus
 
 
 class PackageTmx:
@@ -67,11 +69,52 @@ class PackageTmx:
         )
 
 
+def make_package(packagename, tmxdir):
+    """Package the tmx files found in tmxdir into a zipfile.
+
+    Args:
+        packagename (str): the name of the package.
+        tmxdir (Path): the directory where the tmx files are.
+
+    Returns:
+        (str): the name of the zipfile.
+    """
+    packagetmx = PackageTmx(packagename)
+    for filename in packagetmx.find_tmx_files(tmxdir):
+        packagetmx.write_new_file(filename)
+    packagetmx.zipfile.close()
+
+    return packagetmx.zipname
+
+
+def make_packages(corpusdir, ncpus):
+    """Make a package for each language pair in the tmx dir of corpusdir.
+
+    The packages are independent of each other, so with ncpus > 1 they
+    are made in parallel, one package per worker.
+
+    Args:
+        corpusdir (Path): a corpus directory where tmx files exist.
+        ncpus (int): the number of processes making packages.
+    """
+    lang1 = corpusdir.parts[-1].split("-")[1]
+    tmxdirs = sorted(corpusdir.glob("tmx/*"))
+    packagenames = [f"{lang1}2{tmxdir.name}" for tmxdir in tmxdirs]
+    if ncpus == 1:
+        for packagename, tmxdir in zip(packagenames, tmxdirs, strict=True):
+            make_package(packagename, tmxdir)
+        return
+
+    with ProcessPoolExecutor(max_workers=ncpus) as pool:
+        list(pool.map(make_package, packagenames, tmxdirs))
+
+
 def parse_options():
     """Parse the command line. No arguments expected."""
     parser = argparse.ArgumentParser(
         description="Package tmx files found in a corpus directory into zipfiles."
     )
+    parser.add_argument("--ncpus", action=NCpus)
     parser.add_argument("corpusdir", help="A corpus directory where tmx files exist")
 
     return parser.parse_args()
@@ -81,9 +124,4 @@ def main():
     """Make a package containing the tmx files."""
     args = parse_options()
 
-    corpusdir = Path(args.corpusdir).resolve()
-    lang1 = corpusdir.parts[-1].split("-")[1]
-    for tmxdir in corpusdir.glob("tmx/*"):
-        packagetmx = PackageTmx(f"{lang1}2{tmxdir.name}")
-        for filename in packagetmx.find_tmx_files(tmxdir):
-            packagetmx.write_new_file(filename)
+    make_packages(Path(args.corpusdir).resolve(), args.ncpus)
@@ -90,21 +90,36 @@ def parallelise_file(
     anchor_file: str | None = None,
 ):
     """Align sentences of two parallel files."""
+    align_sentences(
+        sentences_tuple=(
+            sentencedivider.make_valid_sentences(source_lang_file),
+            sentencedivider.make_valid_sentences(para_lang_file),
+        ),
+        language_pair=(source_lang_file.lang, para_lang_file.lang),
+        tmx_path=source_lang_file.tmx(para_lang_file.lang),
+        anchor_file=anchor_file,
+    )
+
+
+def align_sentences(
+    sentences_tuple: tuple[list[str], list[str]],
+    language_pair: tuple[str, str],
+    tmx_path: Path,
+    anchor_file: str | None = None,
+):
+    """Align two lists of sentences, and write the alignment to a tmx file."""
     anchor_word_list: AnchorWordList = AnchorWordList()
     if anchor_file is not None:
         anchor_word_list.load_from_file(anchor_file)
 
     aligner = AlignmentModel(
-        sentences_tuple=(
-            sentencedivider.make_valid_sentences(source_lang_file),
-            sentencedivider.make_valid_sentences(para_lang_file),
-        ),
+        sentences_tuple=sentences_tuple,
         anchor_word_list=anchor_word_list,
     )
 
     write_streaming_result(
-        file1_path=source_lang_file.tmx(para_lang_file.lang),
-        language_pair=(source_lang_file.lang, para_lang_file.lang),
+        file1_path=tmx_path,
+        language_pair=language_pair,
         alignments=aligner.iter_alignment_elements(),
     )
 
@@ -0,0 +1,405 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Record what each file costs in the stages of a corpus run.
+
+With --profile-report FILE, the wall time, cpu time, peak memory use,
+input and output sizes, and the cpu time of the subprocesses (such as
+divvun-checker) are recorded for each file a command processes.
+
+The records are appended to FILE.records as json lines while the run
+goes on, by the worker processes too, so an interrupted run keeps what
+was recorded. When the run is done, the records are summarised per
+stage in FILE, and the slowest files and stages are printed.
+
+With --profile-sample RATE, that fraction of the files is run under
+cProfile, and the stats of the slowest of them are kept in the
+FILE.profiles directory. They can be read with python -m pstats.
+"""
+
+import argparse
+import cProfile
+import hashlib
+import json
+import os
+import resource
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from corpustools import util
+
+KEPT_PROFILES = 10
+SLOWEST_FILES = 20
+SAMPLE_RESOLUTION = 2**32
+
+
+def name_hash(name):
+    """Hash name into an int in range(SAMPLE_RESOLUTION)."""
+    return int.from_bytes(hashlib.sha1(name.encode("utf-8")).digest()[:4], "big")
+
+
+def reset_peak_rss():
+    """Reset the peak resident set size of this process, where possible.
+
+    Only Linux can do this. Elsewhere the peak is that of the whole
+    process so far.
+    """
+    with util.ignored(OSError):
+        Path("/proc/self/clear_refs").write_text("5")
+
+
+def peak_rss():
+    """Get the peak resident set size of this process in bytes."""
+    with util.ignored(OSError):
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def cpu_times():
+    """Get the cpu time used by this process and by its finished children."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return (
+        own.ru_utime + own.ru_stime,
+        children.ru_utime + children.ru_stime,
+    )
+
+
+def file_size(path):
+    """The size of path, None if it is not given or does not exist."""
+    if path is None:
+        return None
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+class Profiler:
+    """Record the cost of processing files in the stages of a run.
+
+    The Profiler is pickled and sent to the worker processes, where
+    the records are appended to the same file.
+    """
+
+    def __init__(self, report, sample_rate=0.0):
+        """Initialise the Profiler class.
+
+        Args:
+            report (str|Path): path to the json report.
+            sample_rate (float): the fraction of the files to run under
+                cProfile.
+        """
+        self.report = Path(report)
+        self.records = Path(f"{report}.records")
+        self.profiles = Path(f"{report}.profiles")
+        self.sample_rate = sample_rate
+
+    def start(self):
+        """Forget the records of an earlier run."""
+        self.records.unlink(missing_ok=True)
+        shutil.rmtree(self.profiles, ignore_errors=True)
+        if self.sample_rate:
+            self.profiles.mkdir(parents=True)
+
+    def is_sampled(self, name):
+        """Decide whether name is run under cProfile.
+
+        The choice depends only on name, so reruns sample the same files.
+        """
+        return name_hash(name) < self.sample_rate * SAMPLE_RESOLUTION
+
+    def append(self, record):
+        """Append a record to the records file in a single write."""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        descriptor = os.open(self.records, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(descriptor, line)
+        finally:
+            os.close(descriptor)
+
+    @contextmanager
+    def measure(self, stage, name, input_path=None, output_path=None):
+        """Record the cost of the code run in the with block.
+
+        Args:
+            stage (str): the stage of the run, e.g. convert.
+            name (str|Path): the file or other unit that is processed.
+            input_path (str|Path|None): the file that is read.
+            output_path (str|Path|None): the file that is written.
+        """
+        name = str(name)
+        profile = cProfile.Profile() if self.is_sampled(name) else None
+        record = {
+            "stage": stage,
+            "name": name,
+            "status": "ok",
+            "pid": os.getpid(),
+            "start": time.time(),
+        }
+        reset_peak_rss()
+        cpu, subprocess_cpu = cpu_times()
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        except BaseException as error:
+            record["status"] = f"{type(error).__name__}: {error}"
+            raise
+        finally:
+            if profile is not None:
+                profile.disable()
+            record["wall"] = time.perf_counter() - start
+            end_cpu, end_subprocess_cpu = cpu_times()
+            record["cpu"] = end_cpu - cpu
+            record["subprocess_cpu"] = end_subprocess_cpu - subprocess_cpu
+            record["peak_rss"] = peak_rss()
+            record["input_size"] = file_size(input_path)
+            record["output_size"] = file_size(output_path)
+            if profile is not None:
+                profile_path = self.profiles / f"{stage}-{name_hash(name):08x}.prof"
+                profile.dump_stats(profile_path)
+                record["profile"] = profile_path.as_posix()
+            self.append(record)
+
+    def read_records(self):
+        """Read the records written so far."""
+        if not self.records.exists():
+            return []
+
+        with self.records.open(encoding="utf-8") as records:
+            return [json.loads(line) for line in records if line.strip()]
+
+    def finish(self):
+        """Write the report and print a summary of it.
+
+        Only the cProfile stats of the slowest sampled files are kept.
+
+        Returns:
+            (dict): the report.
+        """
+        records = self.read_records()
+        sampled = sorted(
+            (record for record in records if "profile" in record),
+            key=lambda record: -record["wall"],
+        )
+        for record in sampled[KEPT_PROFILES:]:
+            Path(record.pop("profile")).unlink(missing_ok=True)
+
+        report = {
+            "stages": summarise(records),
+            "slowest": sorted(records, key=lambda record: -record["wall"])[
+                :SLOWEST_FILES
+            ],
+            "profiles": sampled[:KEPT_PROFILES],
+            "files": records,
+        }
+        self.report.write_text(
+            json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+        self.records.unlink(missing_ok=True)
+        print_summary(report, self.report)
+
+        return report
+
+
+def summarise(records):
+    """Sum up the records of each stage.
+
+    Args:
+        records (list[dict]): the records of the run.
+
+    Returns:
+        (dict[str, dict]): the totals of each stage. elapsed is the time
+            from the first file started until the last one ended.
+    """
+    stages = {}
+    for record in records:
+        stage = stages.setdefault(
+            record["stage"],
+            {
+                "files": 0,
+                "failed": 0,
+                "wall": 0.0,
+                "cpu": 0.0,
+                "subprocess_cpu": 0.0,
+                "input_size": 0,
+                "output_size": 0,
+                "peak_rss": 0,
+                "first_start": record["start"],
+                "last_end": record["start"] + record["wall"],
+            },
+        )
+        stage["files"] += 1
+        stage["failed"] += record["status"] != "ok"
+        for key in ["wall", "cpu", "subprocess_cpu"]:
+            stage[key] += record[key]
+        for key in ["input_size", "output_size"]:
+            stage[key] += record[key] or 0
+        stage["peak_rss"] = max(stage["peak_rss"], record["peak_rss"])
+        stage["first_start"] = min(stage["first_start"], record["start"])
+        stage["last_end"] = max(stage["last_end"], record["start"] + record["wall"])
+
+    for stage in stages.values():
+        stage["elapsed"] = stage.pop("last_end") - stage.pop("first_start")
+
+    return stages
+
+
+def print_summary(report, report_path):
+    """Print the stages, and the slowest files of the run."""
+    print(f"\nProfile report written to {report_path}")
+    print(
+        f"{'stage':<12} {'files':>7} {'failed':>6} {'elapsed':>10} {'wall':>10} "
+        f"{'cpu':>10} {'subproc':>10} {'input':>10} {'output':>10} {'peak rss':>10}"
+    )
+    for name, stage in sorted(
+        report["stages"].items(), key=lambda item: -item[1]["wall"]
+    ):
+        print(
+            f"{name:<12} {stage['files']:>7} {stage['failed']:>6} "
+            f"{stage['elapsed']:>9.1f}s {stage['wall']:>9.1f}s "
+            f"{stage['cpu']:>9.1f}s {stage['subprocess_cpu']:>9.1f}s "
+            f"{util.human_readable_filesize(stage['input_size']):>10} "
+            f"{util.human_readable_filesize(stage['output_size']):>10} "
+            f"{util.human_readable_filesize(stage['peak_rss']):>10}"
+        )
+
+    print("\nSlowest files:")
+    for record in report["slowest"][:10]:
+        print(f"{record['wall']:9.2f}s {record['stage']:<12} {record['name']}")
+
+    if report["profiles"]:
+        print("\ncProfile stats of the slowest sampled files:")
+        for record in report["profiles"]:
+            print(f"{record['wall']:9.2f}s {record['profile']}")
+
+
+@contextmanager
+def measure(profiler, stage, name, input_path=None, output_path=None):
+    """Record the cost of the with block if profiler is not None.
+
+    Args:
+        profiler (Profiler|None): the profiler of the run, if any.
+        stage (str): the stage of the run.
+        name (str|Path): the file or other unit that is processed.
+        input_path (str|Path|None): the file that is read.
+        output_path (str|Path|None): the file that is written.
+    """
+    if profiler is None:
+        yield
+        return
+
+    with profiler.measure(stage, name, input_path, output_path):
+        yield
+
+
+@dataclass
+class ProfiledFunction:
+    """Record the cost of each call of function.
+
+    Unlike a closure, this can be sent to the worker processes of a pool.
+
+    Attributes:
+        profiler: the profiler of the run.
+        function: the function that processes one file.
+        stage: the stage of the run.
+        input_of: gets the input file from the first argument of function.
+        output_of: gets the output file from the first argument of function.
+    """
+
+    profiler: Profiler
+    function: Callable
+    stage: str
+    input_of: Callable | None = None
+    output_of: Callable | None = None
+
+    def __call__(self, item, *args: Any, **kwargs: Any):
+        input_path = item if self.input_of is None else self.input_of(item)
+        output_path = None if self.output_of is None else self.output_of(item)
+        with self.profiler.measure(self.stage, input_path, input_path, output_path):
+            return self.function(item, *args, **kwargs)
+
+
+def profiled(profiler, function, stage, input_of=None, output_of=None):
+    """Wrap function so that the cost of each call is recorded.
+
+    Args:
+        profiler (Profiler|None): the profiler of the run. If None,
+            function is returned as it is.
+        function (Callable): the function that processes one file, given
+            as the first argument.
+        stage (str): the stage of the run.
+        input_of (Callable|None): gets the input file from the first
+            argument of function. Default is the argument itself.
+        output_of (Callable|None): gets the output file from the first
+            argument of function.
+
+    Returns:
+        (Callable): the wrapped function.
+    """
+    if profiler is None:
+        return function
+
+    return ProfiledFunction(profiler, function, stage, input_of, output_of)
+
+
+def make_profiler(args):
+    """Make a Profiler from the command line options, if one is wanted.
+
+    Args:
+        args (argparse.Namespace): options parsed with parser as a parent.
+
+    Returns:
+        (Profiler|None): a started Profiler, or None if no report is wanted.
+    """
+    if args.profile_report is None:
+        return None
+
+    profiler = Profiler(args.profile_report, args.profile_sample)
+    profiler.start()
+
+    return profiler
+
+
+parser = argparse.ArgumentParser(add_help=False)
+parser.add_argument(
+    "--profile-report",
+    metavar="FILE",
+    help="Record the time, memory use and file sizes of each processed "
+    "file, and write a json report to FILE",
+)
+parser.add_argument(
+    "--profile-sample",
+    metavar="RATE",
+    type=float,
+    default=0.0,
+    help="With --profile-report, run this fraction of the files under "
+    "cProfile, and keep the stats of the slowest of them",
+)
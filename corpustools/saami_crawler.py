@@ -42,6 +42,11 @@ def parse_options():
         description="Crawl saami sites (for now, only samediggi.no and www.samediggi.fi).",
     )
 
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Start new crawls, even if the previous crawls were interrupted.",
+    )
     parser.add_argument("sites", nargs="+", help="The sites to crawl")
 
     args = parser.parse_args()
@@ -53,12 +58,12 @@ def main():
     args = parse_options()
 
     crawlers = {
-        "www.samediggi.fi": samediggi_fi_crawler.SamediggiFiCrawler(),
-        "samediggi.no": samediggi_no_crawler.SamediggiNoCrawler(),
-        "nrk.no": NrkNoCrawler(),
-        # "samas.no": samas_crawler.SamasCrawler(),
+        "www.samediggi.fi": samediggi_fi_crawler.SamediggiFiCrawler,
+        "samediggi.no": samediggi_no_crawler.SamediggiNoCrawler,
+        "nrk.no": NrkNoCrawler,
+        # "samas.no": samas_crawler.SamasCrawler,
     }
 
     for site in args.sites:
-        crawler = crawlers[site]
+        crawler = crawlers[site](restart=args.restart)
         crawler.crawl_site()
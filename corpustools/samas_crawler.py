@@ -24,6 +24,7 @@ import os
 from lxml import html
 
 from corpustools import adder, util
+from corpustools.crawl_engine import CrawlEngine
 
 
 class SamasCrawler:
@@ -53,7 +54,12 @@ class SamasCrawler:
             )
             for lang in self.samas_languages
         }
-        self.downloader = adder.UrlDownloader(os.path.join(self.goaldir, "tmp"))
+        self.downloader = adder.UrlDownloader(
+            os.path.join(self.goaldir, "tmp"),
+            engine=CrawlEngine(
+                cache_dir=os.path.join(self.goaldir, "tmp", "http_cache")
+            ),
+        )
 
     @staticmethod
     def get_samas_href(href):
@@ -26,7 +26,6 @@ import re
 from copy import deepcopy
 from urllib.parse import urlparse
 
-import requests
 from lxml import etree
 
 from corpustools import (
@@ -263,20 +262,32 @@ class SamediggiFiPage:
 class SamediggiFiCrawler(crawler.Crawler):
     """Crawl www.samediggi.fi and save html documents to the corpus."""
 
+    site = "www.samediggi.fi"
+    seeds = ["https://www.samediggi.fi/"]
     langs = ["fin", "sme", "smn", "sms", "eng"]
-    languageguesser = text_cat.Classifier()
 
-    def __init__(self):
-        """Initialise the SamediggiFiCrawler class."""
-        super().__init__()
-        self.unvisited_links.add("https://www.samediggi.fi/")
+    @property
+    def languageguesser(self):
+        """The language guesser, loaded when it is first needed."""
+        return text_cat.default_classifier()
+
+    def __init__(self, restart=False):
+        """Initialise the SamediggiFiCrawler class.
+
+        Args:
+            restart (bool): start a new crawl, even if the previous
+                crawl was interrupted.
+        """
+        super().__init__(restart=restart)
         self.vcs = {}
 
         for lang in self.langs:
             self.vcs[lang] = versioncontrol.vcs(
                 self.corpus_parent / f"corpus-{lang}-orig"
             )
-        self.dupe_table = {digest: name for digest, name in self.make_dupe_tuple()}
+        self.dupe_table = self.store.digests
+        if not len(self.dupe_table):
+            self.dupe_table.update(self.make_dupe_tuple())
 
     def make_dupe_tuple(self):
         """Make a hash/filename tuple to be used in the dupe table."""
@@ -290,16 +301,27 @@ class SamediggiFiCrawler(crawler.Crawler):
                     with open(fullpath, "rb") as html_stream:
                         yield make_digest(html_stream.read()), fullpath
 
-    def crawl_page(self, link):
-        """Collect links from a page."""
-        self.visited_links.add(link)
-        result = requests.get(link)
-
-        if result.ok and "html" in result.headers["content-type"].lower():
+    def crawl_page(self, link, result=None):
+        """Collect links from a page.
+
+        Args:
+            link (str): the address of the page.
+            result (requests.Response|None): the page, if it is already
+                fetched.
+        """
+        self.mark_crawled(link)
+        if result is None:
+            result = self.engine.try_fetch(link)
+
+        if (
+            result is not None
+            and result.ok
+            and "html" in result.headers.get("content-type", "").lower()
+        ):
             orig_page = SamediggiFiPage(result, self.dupe_table)
             orig_page.sanity_test()
-            self.visited_links.add(orig_page.url)
-            self.unvisited_links.update(orig_page.links)
+            self.mark_crawled(orig_page.url)
+            self.store.add_links(orig_page.links)
             if orig_page.dupe or orig_page.parsed_url.path.startswith("/category"):
                 return None
             return orig_page
@@ -308,15 +330,7 @@ class SamediggiFiCrawler(crawler.Crawler):
 
     def crawl_site(self):
         """Crawl samediggi.no."""
-        while self.unvisited_links:
-            link = self.unvisited_links.pop()
-
-            if link not in self.visited_links:
-                self.crawl_pageset(link)
-
-            self.unvisited_links.difference_update(self.visited_links)
-
-            print(f"Links in queue: {len(self.unvisited_links)}")
+        self.crawl_frontier(self.crawl_pageset)
 
     def add_page(self, page, parallel_pages):
         """Add a page to the list of parallel pages."""
@@ -338,16 +352,18 @@ class SamediggiFiCrawler(crawler.Crawler):
                         parallel_page2.lang, parallel_page2.basename
                     )
 
-    def crawl_pageset(self, link):
+    def crawl_pageset(self, link, result=None):
         """Crawl a pageset that link gives us."""
         pages = []
 
         print(link)
-        orig_page = self.crawl_page(link)
+        orig_page = self.crawl_page(link, result)
         if orig_page is not None:
             self.add_page(orig_page, pages)
-            for parallel_link in orig_page.parallel_links:
-                self.add_page(self.crawl_page(parallel_link), pages)
+            for parallel_link, parallel_result in self.engine.fetch_all(
+                orig_page.parallel_links
+            ):
+                self.add_page(self.crawl_page(parallel_link, parallel_result), pages)
 
             if pages and pages[0].lang not in ("fin", "eng"):
                 self.set_parallel_info(pages)
@@ -36,18 +36,26 @@ from corpustools.util import make_digest
 class SamediggiNoCrawler(crawler.Crawler):
     """Crawl samediggi.no and save html documents to the corpus."""
 
+    site = "samediggi.no"
+    seeds = ["https://sametinget.no/"]
     langs = ["nob", "sma", "sme", "smj"]
 
-    def __init__(self) -> None:
-        """Initialise the SamediggiNoCrawler class."""
-        super().__init__()
-        self.unvisited_links.add("https://sametinget.no/")
+    def __init__(self, restart: bool = False) -> None:
+        """Initialise the SamediggiNoCrawler class.
+
+        Args:
+            restart: start a new crawl, even if the previous crawl was
+                interrupted.
+        """
+        super().__init__(restart=restart)
         self.vcs = {
             lang: versioncontrol.vcs(self.corpus_parent / f"corpus-{lang}-orig")
             for lang in self.langs
         }
 
-        self.dupe_table = self.make_dupe_dict()
+        self.dupe_table = self.store.digests
+        if not len(self.dupe_table):
+            self.dupe_table.update(self.make_dupe_dict().items())
 
     def samediggi_corpus_dirs(self) -> Iterator[Path]:
         return (
@@ -69,12 +77,20 @@ class SamediggiNoCrawler(crawler.Crawler):
             for fullpath in self.samediggi_corpus_files()
         }
 
-    def crawl_page(self, link) -> SamediggiNoPage | None:
-        """Collect links from a page."""
-        self.visited_links.add(link)
-        result = requests.get(link)
+    def crawl_page(
+        self, link: str, result: requests.Response | None = None
+    ) -> SamediggiNoPage | None:
+        """Collect links from a page.
+
+        Args:
+            link: the address of the page.
+            result: the page, if it is already fetched.
+        """
+        self.mark_crawled(link)
+        if result is None:
+            result = self.engine.try_fetch(link)
 
-        if not result.ok:
+        if result is None or not result.ok:
             return None
 
         content_type = result.headers.get("content-type")
@@ -94,20 +110,14 @@ class SamediggiNoCrawler(crawler.Crawler):
         )
 
         orig_page.sanity_test()
-        self.visited_links.add(orig_page.url)
-        self.unvisited_links.update(orig_page.links)
+        self.mark_crawled(orig_page.url)
+        self.store.add_links(orig_page.links)
 
         return orig_page
 
     def crawl_site(self):
         """Crawl samediggi.no."""
-        while self.unvisited_links:
-            link = self.unvisited_links.pop()
-
-            if link not in self.visited_links:
-                self.crawl_pageset(link)
-
-            self.unvisited_links.difference_update(self.visited_links)
+        self.crawl_frontier(self.crawl_pageset)
 
     def is_page_addable(self, page: SamediggiNoPage | None):
         """Add a page to the list of parallel pages."""
@@ -140,9 +150,13 @@ class SamediggiNoCrawler(crawler.Crawler):
         Returns:
             A list of parallel pages.
         """
+        if orig_page is None:
+            return []
+
         crawled_pages = [orig_page]
         crawled_pages.extend(
-            [self.crawl_page(link) for link in orig_page.parallel_links]
+            self.crawl_page(link, result)
+            for link, result in self.engine.fetch_all(orig_page.parallel_links)
         )
 
         pages = [page for page in crawled_pages if self.is_page_addable(page)]
@@ -155,10 +169,10 @@ class SamediggiNoCrawler(crawler.Crawler):
 
         return pages
 
-    def crawl_pageset(self, link):
+    def crawl_pageset(self, link, result=None):
         """Crawl a pageset that link gives us."""
 
-        pages = self.get_page_set(self.crawl_page(link))
+        pages = self.get_page_set(self.crawl_page(link, result))
 
         self.set_parallel_info(pages)
         for page in pages:
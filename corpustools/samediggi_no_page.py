@@ -6,14 +6,13 @@ from lxml import etree
 
 from corpustools import adder, corpuspath, namechanger
 from corpustools.samediggi_no_links import get_filtered_links
-from corpustools.text_cat import Classifier
+from corpustools.text_cat import default_classifier
 from corpustools.util import make_digest
 
 
 class SamediggiNoPage:
     """Save a samediggi.no page to the corpus."""
 
-    languageguesser = Classifier()
     language_mapper = {
         "nb": "nob",
         "sma": "sma",
@@ -22,6 +21,11 @@ class SamediggiNoPage:
     }
     content_min_word_length = 10
 
+    @property
+    def languageguesser(self):
+        """The language guesser, loaded when the first page is made."""
+        return default_classifier()
+
     def __init__(
         self,
         original_url: str,
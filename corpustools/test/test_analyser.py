@@ -21,12 +21,14 @@
 
 
 import doctest
+import io
 import os
+import sys
 import unittest
 
 from lxml import doctestcompare, etree
 
-from corpustools import analyser, corpusxmlfile
+from corpustools import analyser, corpuspath, corpusxmlfile
 
 HERE = os.path.dirname(__file__)
 
@@ -124,3 +126,77 @@ class TestAnalyser(unittest.TestCase):
         )
         self.maxDiff = None
         self.assertEqual(etree.tostring(got, encoding="unicode"), want)
+
+
+FAKE_DIVVUN_CHECKER = f"""#!{sys.executable}
+import sys
+for line in sys.stdin:
+    for word in line.split():
+        print(f'"<{{word}}>"\\n\\t"{{word}}" N Sg Nom #1->0')
+    print()
+print("a warning", file=sys.stderr)
+"""
+
+
+def test_analysed_document_parts():
+    """The analysis is put between the parts, and the body is kept."""
+    xml_file = etree.ElementTree(
+        etree.fromstring(
+            '<document xml:lang="sme"><header><title>A</title></header>'
+            "<body><p>Muhto dat</p></body></document>"
+        )
+    )
+    path = corpuspath.make_corpus_path("/tmp/corpus-sme/converted/a.html.xml")
+
+    head, tail = analyser.analysed_document_parts(path, xml_file)
+
+    assert etree.tostring(xml_file) == (
+        b'<document xml:lang="sme"><header><title>A</title></header>'
+        b"<body><p>Muhto dat</p></body></document>"
+    )
+    analysed = etree.fromstring(head + b"analysis" + tail)
+    assert analysed.findtext("body/dependency") == "analysis"
+
+
+def test_copy_analysis():
+    output = io.BytesIO()
+
+    assert analyser.copy_analysis(io.BytesIO(b"a\r\nb\rc\n"), output) == (6, True)
+    assert output.getvalue() == b"a\nb\nc\n"
+    # The second "]]>" is split between two chunks
+    for analysis in [b"a]]>b", b"a]]>" + b"]" * (analyser.CHUNK_SIZE - 6) + b"]]>b"]:
+        output = io.BytesIO()
+        assert analyser.copy_analysis(io.BytesIO(analysis), output)[1]
+        assert output.getvalue() == analysis.replace(b"]]>", b"]]]]><![CDATA[>")
+    assert not analyser.copy_analysis(io.BytesIO(b"a\x00b"), io.BytesIO())[1]
+    assert not analyser.copy_analysis(io.BytesIO(b"a\xffb"), io.BytesIO())[1]
+
+
+def test_analyse(tmp_path, monkeypatch):
+    """Stream a converted file through divvun-checker."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    divvun_checker = bin_dir / "divvun-checker"
+    divvun_checker.write_text(FAKE_DIVVUN_CHECKER)
+    divvun_checker.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    path = corpuspath.make_corpus_path(
+        (tmp_path / "corpus-sme/converted/a.html.xml").as_posix()
+    )
+    path.converted.parent.mkdir(parents=True)
+    path.converted.write_text(
+        '<document xml:lang="sme"><header><title>A</title></header>'
+        "<body><p>Muhto dat</p></body></document>"
+    )
+
+    analyser.analyse(path, "sme.zpipe")
+
+    analysed = etree.parse(path.analysed)
+    assert analysed.findtext(".//title") == "A"
+    assert analysed.findtext(".//dependency") == (
+        '"<Muhto>"\n\t"Muhto" N Sg Nom #1->0\n'
+        '"<dat>"\n\t"dat" N Sg Nom #1->0\n'
+        '"<¶>"\n\t"¶" N Sg Nom #1->0\n\n'
+    )
+    assert path.log.read_text() == "a warning\n"
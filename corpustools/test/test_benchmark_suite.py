@@ -0,0 +1,77 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the synthetic corpus, the stand-in tools and the benchmark suite."""
+
+from corpustools import korp_mono, sentencedivider
+from corpustools.benchmarks import stand_ins, suite, synthetic_corpus
+
+
+def corpus_contents(directory):
+    return {
+        path.relative_to(directory): path.read_bytes()
+        for path in sorted(directory.glob("**/*"))
+        if path.is_file()
+    }
+
+
+def test_generate_is_reproducible(tmp_path):
+    origs = synthetic_corpus.generate(tmp_path / "first", 3, 2, seed=7)
+    synthetic_corpus.generate(tmp_path / "second", 3, 2, seed=7)
+
+    assert [orig.suffix for orig in origs] == [".txt", ".html", ".sfm"]
+    first = corpus_contents(tmp_path / "first")
+    assert first == corpus_contents(tmp_path / "second")
+    assert {path.parts[1] for path in first if path.parts[0] == "corpus-sme"} == {
+        "analysed",
+        "converted",
+        "korp_mono",
+        "tmx",
+    }
+
+
+def test_analyse_text():
+    analysis = stand_ins.analyse_text("Mun lean dás. Boađe! ¶\nDiehtu ¶\n")
+
+    assert [
+        sentence.split("\n")[1].split("\t")[0]
+        for sentence in korp_mono.make_sentences(
+            korp_mono.valid_sentences(analysis.splitlines()), "sme"
+        )
+    ] == ["Mun", "Boađe", "Diehtu"]
+
+
+def test_tokenise_text():
+    assert list(
+        sentencedivider.make_sentences(stand_ins.tokenise_text("Mun lean. Boađe ¶\n"))
+    ) == ["Mun lean.", "Boađe", ""]
+
+
+def test_compare():
+    baseline = {"benchmarks": {"ccat": {"best": 1.0}, "dupe_finder": {"best": 2.0}}}
+    results = {
+        "benchmarks": {
+            "ccat": {"best": 1.1},
+            "dupe_finder": {"best": 3.0},
+            "parallelize": {"skipped": "No module named 'python_tca2'"},
+        }
+    }
+
+    assert suite.compare(results, baseline, 0.2) == [
+        ("ccat", 1.0, 1.1, False),
+        ("dupe_finder", 2.0, 3.0, True),
+    ]
@@ -0,0 +1,52 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the conversion of bible sfm files."""
+
+from lxml import etree
+
+from corpustools import biblesfmconverter
+
+
+def test_parse_sfm():
+    lines = [
+        "\\id GEN Sámi bibel\n",
+        "\\mt1 Vuosttaš  Mosesa girji\n",
+        "\\c 1\n",
+        "\\s2 Ipmil sivdnida\n",
+        "\\p\n",
+        "\\v 1 Álgus  sivdnidii\n",
+        "Ipmil albmi\\f + \\fr 1.1 \\ft nohta\\f* ja eatnama.\n",
+        "\\v 2-3 Ja eanan lei s\u0304ivdnetkeahttá\n",
+        "\\s1\n",
+        "\\c 2\n",
+        "\\cp B\n",
+        "\\c 3\n",
+        "\\s1 Bajilčála\n",
+        "\\m\n",
+        "\\v 4 Loahppa.\n",
+    ]
+
+    assert etree.tostring(biblesfmconverter.parse_sfm(lines), encoding="unicode") == (
+        "<document><body>"
+        '<section><p type="title">Vuosttaš Mosesa girji</p></section>'
+        "<section><p>Ipmil sivdnida</p>"
+        "<p>Álgus sivdnidii\nIpmil albmi ja eatnama.\nJa eanan lei šivdnetkeahttá</p>"
+        "</section>"
+        '<section><p type="title">Bajilčála</p><p>Loahppa.</p></section>'
+        "</body></document>"
+    )
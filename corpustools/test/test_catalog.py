@@ -0,0 +1,88 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the CorpusCatalog class."""
+
+import os
+
+from corpustools import xslsetter
+from corpustools.catalog import CorpusCatalog, catalog_path
+
+
+def add_document(orig_dir, name, **variables):
+    orig = orig_dir / "admin" / name
+    orig.parent.mkdir(parents=True, exist_ok=True)
+    orig.write_text("content")
+    metadata = xslsetter.MetadataHandler(orig.with_name(f"{name}.xsl"), create=True)
+    for key, value in variables.items():
+        metadata.set_variable(key, value)
+    metadata.set_parallel_text("nob", name)
+    metadata.write_file()
+
+    return orig
+
+
+def test_refresh(tmp_path, monkeypatch):
+    orig_dir = tmp_path / "corpus-sme-orig"
+    first = add_document(orig_dir, "a.html", genre="admin")
+    second = add_document(orig_dir, "b.html", genre="news")
+    converted = tmp_path / "corpus-sme/converted/admin/a.html.xml"
+    converted.parent.mkdir(parents=True)
+    converted.write_text(
+        "<document><header><wordcount>42</wordcount></header><body/></document>"
+    )
+    catalog = CorpusCatalog(catalog_path(orig_dir))
+
+    catalog.refresh(orig_dir)
+
+    assert catalog_path(orig_dir) == tmp_path / "tmp/corpus_catalog.sqlite"
+    assert [row["orig"] for row in catalog.documents(orig_dir)] == [
+        first.as_posix(),
+        second.as_posix(),
+    ]
+    assert [row["orig"] for row in catalog.documents(orig_dir, genre="news")] == [
+        second.as_posix()
+    ]
+    assert catalog.variables(first)["genre"] == "admin"
+    assert [tuple(row) for row in catalog.parallels(orig_dir / "admin")] == [
+        (
+            first.as_posix(),
+            "nob",
+            (tmp_path / "corpus-nob-orig/admin/a.html").as_posix(),
+        ),
+        (
+            second.as_posix(),
+            "nob",
+            (tmp_path / "corpus-nob-orig/admin/b.html").as_posix(),
+        ),
+    ]
+    assert [row["wordcount"] for row in catalog.documents(orig_dir)] == [42, None]
+
+    def fail(orig):
+        raise AssertionError(f"{orig} is parsed again")
+
+    monkeypatch.setattr("corpustools.catalog.make_corpus_path", fail)
+    converted.write_text(
+        "<document><header><wordcount>43</wordcount></header><body/></document>"
+    )
+    os.utime(converted, ns=(0, 1))
+    second.unlink()
+    second.with_name("b.html.xsl").unlink()
+
+    catalog.refresh(orig_dir)
+
+    assert [row["wordcount"] for row in catalog.documents(orig_dir)] == [43]
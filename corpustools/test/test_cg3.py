@@ -0,0 +1,112 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the CG3 stream parser."""
+
+import pytest
+from lxml import etree
+
+from corpustools import cg3, compression
+
+ANALYSIS = (
+    '"<Muhto>"\n'
+    '\t"muhto" CC @CVP #1->3\n'
+    ":\n"
+    '"<suohkanbargi>"\n'
+    '\t"bargi" N Sg Nom @SUBJ> #2->3\n'
+    '\t\t"suohkan" N Cmp/SgNom Cmp\n'
+    '"<bargá>"\n'
+    '\t"bargat" V IV Ind Prs Sg3 @FMV #3->0\n'
+    '"<.>"\n'
+    '\t"." CLB #4->3\n'
+    "\n"
+    '"<¶>"\n'
+    '\t"¶" CLB #1->1\n'
+    "\n"
+)
+
+
+def test_sentences():
+    sentences = list(cg3.sentences(ANALYSIS.splitlines()))
+
+    assert [[cohort.wordform for cohort in sentence] for sentence in sentences] == [
+        ["Muhto", "suohkanbargi", "bargá", "."],
+        ["¶"],
+    ]
+
+
+def test_reading():
+    cohort = list(cg3.cohorts(ANALYSIS.splitlines()))[1]
+    reading = cohort.readings[0]
+
+    assert (
+        reading.lemma,
+        reading.tags,
+        reading.function,
+        reading.self_id,
+        reading.parent_id,
+    ) == ("bargi", ["N", "Sg", "Nom"], "@SUBJ>", "2", "3")
+    assert [subreading.lemma for subreading in reading.subreadings] == ["suohkan"]
+    assert reading.text == (
+        '\t"bargi" N Sg Nom @SUBJ> #2->3\n\t\t"suohkan" N Cmp/SgNom Cmp'
+    )
+
+
+def test_blanks():
+    cohort = next(cg3.cohorts(ANALYSIS.splitlines()))
+
+    assert cohort.blanks == [":"]
+
+
+def test_empty_lines_after_blank():
+    analysis = '"<a>"\n\t"a" N\n:\n\n\n"<b>"\n\t"b" N\n\n"<c>"\n\t"c" N\n'
+
+    assert [
+        [cohort.wordform for cohort in sentence]
+        for sentence in cg3.sentences(analysis.splitlines())
+    ] == [["a", "b"], ["c"]]
+
+
+@pytest.mark.parametrize(
+    "dependency",
+    [
+        f"<dependency><![CDATA[{ANALYSIS}]]></dependency>",
+        "<dependency>{}</dependency>".format(
+            ANALYSIS.replace("<", "&lt;").replace(">", "&gt;")
+        ),
+    ],
+)
+@pytest.mark.parametrize("compress", [False, True])
+def test_dependency_lines(tmp_path, dependency, compress):
+    analysed = tmp_path / "analysed.xml"
+    document = f'<document xml:lang="sme">\n  <body>{dependency}</body>\n</document>\n'
+    with compression.open_output(analysed, compress) as stream:
+        stream.write(document.encode("utf-8"))
+
+    assert "".join(cg3.dependency_lines(analysed)) == ANALYSIS
+
+
+def test_dependency_lines_split_cdata(tmp_path):
+    analysis = '"<x]]>"\n\t"x]]>" N\n:\n"<]]>>"\n\t"]]>" CLB\n'
+    analysed = tmp_path / "analysed.xml"
+    document = etree.Element("document")
+    etree.SubElement(document, "dependency").text = etree.CDATA(analysis)
+    etree.ElementTree(document).write(analysed)
+
+    assert "]]><![CDATA[" in analysed.read_text()
+    assert "".join(cg3.dependency_lines(analysed)) == analysis
+    assert "".join(cg3.parsed_dependency_lines(analysed)) == analysis
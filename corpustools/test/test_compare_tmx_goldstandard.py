@@ -22,7 +22,7 @@ import unittest
 
 from lxml import etree
 
-from corpustools import compare_tmx_goldstandard, tmx
+from corpustools import compare_tmx_goldstandard, corpuspath, tmx
 
 here = os.path.dirname(__file__)
 
@@ -47,3 +47,84 @@ class TestTmxComparator(unittest.TestCase):
         self.assertEqual(comp.get_number_of_differing_lines(), -1)
         self.assertEqual(comp.get_lines_in_wantedfile(), 274)
         self.assertEqual(len(comp.get_diff_as_text()), 0)
+
+
+def make_goldstandard_corpus(root):
+    """Make a sme document with a nob parallel, and their goldstandard tmx."""
+    (root / "corpus-sme-orig/admin").mkdir(parents=True)
+    sme = corpuspath.make_corpus_path(
+        (root / "corpus-sme-orig/admin/a.html").as_posix()
+    )
+    sme.metadata.set_parallel_text("nob", "b.html")
+    sme.metadata.write_file()
+    for corpus_path in [
+        sme,
+        corpuspath.make_corpus_path((root / "corpus-nob-orig/admin/b.html").as_posix()),
+    ]:
+        corpus_path.converted.parent.mkdir(parents=True)
+        corpus_path.converted.write_text(f"<document>{corpus_path.lang}</document>")
+
+    gold_tmx = root / "corpus-sme/stable/tmx/nob/admin/a.html.tmx"
+    gold_tmx.parent.mkdir(parents=True)
+    etree.ElementTree(
+        tmx.make_tmx("a.html", "sme", "nob", (["Buorre.", "Giitu."], ["God.", "Takk."]))
+    ).write(str(gold_tmx), encoding="utf-8")
+
+    return gold_tmx
+
+
+def test_run_test(tmp_path, monkeypatch):
+    """Align a goldstandard pair, and record the run."""
+    gold_tmx = make_goldstandard_corpus(tmp_path)
+    sentences = {"sme": ["Buorre.", "Giitu."], "nob": ["God.", "Hei.", "Takk."]}
+    tokenised = []
+
+    def make_valid_sentences(corpus_path):
+        tokenised.append(corpus_path.lang)
+        return sentences[corpus_path.lang]
+
+    def align_sentences(sentences_tuple, language_pair, tmx_path, anchor_file):
+        """Pair the sentences one to one, dropping the extra nob sentence."""
+        sme_sentences, nob_sentences = sentences_tuple
+        etree.ElementTree(
+            tmx.make_tmx(
+                "a.html",
+                *language_pair,
+                (sme_sentences, nob_sentences[: len(sme_sentences)]),
+            )
+        ).write(str(tmx_path), encoding="utf-8")
+
+    monkeypatch.setattr(
+        compare_tmx_goldstandard.sentencedivider,
+        "make_valid_sentences",
+        make_valid_sentences,
+    )
+    monkeypatch.setattr(
+        compare_tmx_goldstandard.parallelize, "align_sentences", align_sentences
+    )
+    monkeypatch.setattr(
+        compare_tmx_goldstandard.parallelize,
+        "get_dictionary",
+        lambda lang1, lang2: None,
+    )
+    testresult = tmp_path / "testruns.paragstesting.xml"
+    testresult.write_text("<paragstesting/>")
+
+    for dateformat_addition in ["-1", "-2"]:
+        tester = compare_tmx_goldstandard.TmxGoldstandardTester(
+            testresult.as_posix(), dateformat_addition
+        )
+        tester.run_test([str(tmp_path)])
+
+    # The second run uses the cached sentences
+    assert tokenised == ["sme", "nob"]
+    testruns = etree.parse(testresult).findall("testrun")
+    assert [testrun.get("datetime")[-2:] for testrun in testruns] == ["-2", "-1"]
+    file_element = testruns[0].find("file")
+    assert file_element.get("name") == gold_tmx.stem
+    assert file_element.get("gspairs") == "2"
+    assert file_element.get("alignedpairs") == "2"
+    assert file_element.get("precision") == "0.5000"
+    assert file_element.get("recall") == "0.5000"
+    assert file_element.get("sentences") == "5"
+    assert testruns[0].get("pairs") == "1"
@@ -0,0 +1,69 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test reading and writing compressed corpus files."""
+
+from lxml import etree
+
+from corpustools import catalog, ccat, compression, corpuspath, korp_mono
+from corpustools.benchmarks import synthetic_corpus
+
+
+def compress(path):
+    content = path.read_bytes()
+    with compression.open_output(path, compress=True) as stream:
+        stream.write(content)
+
+
+def test_open_output(tmp_path):
+    document = "<document><body><p>Bures</p></body></document>\n"
+    first = tmp_path / "first.xml"
+    second = tmp_path / "second.xml"
+    for path in [first, second]:
+        with compression.open_output(path, compress=True) as stream:
+            stream.write(document.encode("utf-8"))
+
+    assert compression.is_compressed(first)
+    assert first.read_bytes() == second.read_bytes()
+    with compression.open_text(first) as stream:
+        assert stream.read() == document
+    assert etree.tostring(compression.parse(first)).decode("utf-8") == document.strip()
+    assert [element.tag for _, element in compression.iterparse(first)] == [
+        "p",
+        "body",
+        "document",
+    ]
+
+
+def test_readers(tmp_path):
+    (orig,) = synthetic_corpus.generate(tmp_path, 1, 3, seed=3)
+    path = corpuspath.make_corpus_path(orig.as_posix())
+    expected = [
+        etree.tostring(korp_mono.make_vrt_xml(path.analysed, path.lang)),
+        catalog.read_wordcount(path.converted),
+        ccat.ccatter(path),
+    ]
+
+    compress(path.analysed)
+    compress(path.converted)
+
+    assert compression.is_compressed(path.analysed)
+    assert [
+        etree.tostring(korp_mono.make_vrt_xml(path.analysed, path.lang)),
+        catalog.read_wordcount(path.converted),
+        ccat.ccatter(path),
+    ] == expected
@@ -141,3 +141,27 @@ class TestConverter(XMLTester):
         conv.fix_document(got)
 
         self.assertXmlEqual(got, etree.fromstring(want_string))
+
+
+def test_has_content():
+    """Check that only paragraphs with text count as content."""
+    assert converter.Converter.has_content(
+        etree.fromstring("<document><body><p> </p><p><em>a</em></p></body></document>")
+    )
+    assert not converter.Converter.has_content(
+        etree.fromstring("<document><body><p>\n</p><p><em/></p></body></document>")
+    )
+
+
+def test_normalize_text():
+    """Check that text, tails and attributes are NFC normalised."""
+    complete = etree.fromstring(
+        '<document title="a\u0301"><body><p>c\u030c<em>s</em>a\u0301</p></body>'
+        "</document>"
+    )
+    converter.Converter.normalize_text(complete)
+
+    assert etree.tostring(complete, encoding="unicode") == (
+        '<document title="\u00e1"><body><p>\u010d<em>s</em>\u00e1</p></body>'
+        "</document>"
+    )
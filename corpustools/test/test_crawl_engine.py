@@ -0,0 +1,130 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the crawl engine against a local http server."""
+
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from corpustools.crawl_engine import CrawlEngine, HostRateLimiter
+
+PAGES = {
+    "/a": "<html><body>Sámegiella</body></html>",
+    "/b": "<html><body>Dárogiella</body></html>",
+}
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serve PAGES with ETags, answering 304 when the ETag matches."""
+
+    def do_GET(self):
+        self.server.requests[self.path] += 1
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        content = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    httpd.requests = Counter()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_fetch_from_cache(server, tmp_path):
+    engine = CrawlEngine(
+        cache_dir=tmp_path, rate_limiter=HostRateLimiter(min_interval=0)
+    )
+    url = f"{base_url(server)}/a"
+
+    first = engine.fetch(url)
+    second = engine.fetch(url)
+
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.status_code == 200
+    assert second.text == first.text == PAGES["/a"]
+    assert server.requests["/a"] == 2
+
+
+def test_fetch_without_cached_body(server, tmp_path):
+    engine = CrawlEngine(
+        cache_dir=tmp_path, rate_limiter=HostRateLimiter(min_interval=0)
+    )
+    url = f"{base_url(server)}/a"
+    engine.fetch(url)
+    engine.cache.path(url).with_suffix(".body").unlink()
+
+    response = engine.fetch(url)
+
+    assert not response.from_cache
+    assert response.text == PAGES["/a"]
+
+
+def test_fetch_all(server):
+    engine = CrawlEngine(rate_limiter=HostRateLimiter(min_interval=0))
+    urls = [f"{base_url(server)}{path}" for path in ["/b", "/a", "/missing"]]
+
+    results = engine.fetch_all(urls + ["http://127.0.0.1:1/refused"])
+
+    assert [url for url, _ in results] == urls + ["http://127.0.0.1:1/refused"]
+    assert [response.text for _, response in results[:2]] == [
+        PAGES["/b"],
+        PAGES["/a"],
+    ]
+    assert results[2][1].status_code == 404
+    assert results[3][1] is None
+
+
+def test_rate_limiter_spaces_requests(server):
+    engine = CrawlEngine(rate_limiter=HostRateLimiter(min_interval=0.1))
+
+    start = time.monotonic()
+    engine.fetch_all([f"{base_url(server)}/a"] * 4)
+
+    assert time.monotonic() - start >= 0.3
+    assert server.requests["/a"] == 4
@@ -0,0 +1,117 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the CrawlStore class."""
+
+import pytest
+
+from corpustools.crawl_store import CrawlStore
+from corpustools.crawler import Crawler
+
+SEED = "https://sametinget.no/"
+
+
+def test_frontier(tmp_path):
+    store = CrawlStore(tmp_path / "crawl.sqlite", "samediggi.no")
+    store.start([SEED])
+    store.mark_visited([SEED])
+    store.add_links([SEED, "https://sametinget.no/a", "https://sametinget.no/b"])
+
+    assert store.is_visited(SEED)
+    assert store.unvisited(1) == ["https://sametinget.no/a"]
+    assert store.unvisited(10) == ["https://sametinget.no/a", "https://sametinget.no/b"]
+
+
+def test_resume_interrupted_crawl(tmp_path):
+    store = CrawlStore(tmp_path / "crawl.sqlite", "samediggi.no")
+    store.start([SEED])
+    store.mark_visited([SEED])
+    store.add_links(["https://sametinget.no/a"])
+    store.close()
+
+    resumed = CrawlStore(tmp_path / "crawl.sqlite", "samediggi.no")
+    resumed.start([SEED])
+
+    assert resumed.is_visited(SEED)
+    assert resumed.unvisited(10) == ["https://sametinget.no/a"]
+
+
+def test_restart_finished_crawl(tmp_path):
+    store = CrawlStore(tmp_path / "crawl.sqlite", "samediggi.no")
+    store.start([SEED])
+    store.mark_visited([SEED])
+
+    store.start([SEED])
+
+    assert store.unvisited(10) == [SEED]
+
+
+def test_sites_are_separate(tmp_path):
+    no_store = CrawlStore(tmp_path / "crawl.sqlite", "samediggi.no")
+    fi_store = CrawlStore(tmp_path / "crawl.sqlite", "www.samediggi.fi")
+    no_store.start([SEED])
+    fi_store.start(["https://www.samediggi.fi/"])
+
+    assert no_store.unvisited(10) == [SEED]
+    assert fi_store.unvisited(10) == ["https://www.samediggi.fi/"]
+
+
+def test_digests(tmp_path):
+    saved = tmp_path / "saved.html"
+    saved.write_text("<html/>")
+    removed = tmp_path / "removed.html"
+    store = CrawlStore(tmp_path / "crawl.sqlite", "samediggi.no")
+    store.digests.update([("abc", saved), ("def", removed)])
+
+    assert store.digests.get("abc") == saved
+    assert store.digests.get("def", "new.html") == "new.html"
+    assert "def" not in store.digests
+    assert len(store.digests) == 1
+
+
+class StubCrawler(Crawler):
+    site = "samediggi.no"
+    seeds = [SEED]
+
+    def __init__(self, crawl_pageset):
+        super().__init__()
+        self.engine.fetch_all = lambda urls: [(url, None) for url in urls]
+        self.crawl_pageset = crawl_pageset
+
+
+def test_interrupted_batch_is_crawled_again(tmp_path, monkeypatch):
+    monkeypatch.setenv("GTLANGS", tmp_path.as_posix())
+    crawled = []
+
+    def interrupt(link, _):
+        crawler.mark_crawled(link, "https://sametinget.no/parallel")
+        raise KeyboardInterrupt
+
+    crawler = StubCrawler(interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        crawler.crawl_frontier(crawler.crawl_pageset)
+
+    def crawl(link, _):
+        crawler.mark_crawled(link, "https://sametinget.no/parallel")
+        crawled.append(link)
+        crawler.store.add_links(["https://sametinget.no/parallel"])
+
+    crawler = StubCrawler(crawl)
+    crawler.crawl_frontier(crawler.crawl_pageset)
+
+    assert crawled == [SEED]
+    assert crawler.store.is_visited("https://sametinget.no/parallel")
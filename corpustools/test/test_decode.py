@@ -67,15 +67,24 @@ test_input = {
 
 class TestEncodingGuesser(unittest.TestCase):
     @parameterized.expand(
-        [
-            (index, example)
-            for index in decode.CTYPES.keys()
-            for example in test_input[index]
-        ]
+        [(index, example) for index in test_input for example in test_input[index]]
     )
     def test_encoding_guesser(self, index, example):
         self.assertEqual(decode.guess_body_encoding(example, "sme"), index)
 
+    def test_cyrillic_encoding_guesser(self):
+        self.assertEqual(decode.guess_body_encoding("ìàòû", "mhr"), "cyrillic_in_pdf")
+        self.assertIsNone(decode.guess_body_encoding("ìàòû", "sme"))
+
+    @parameterized.expand([(index) for index in decode.CTYPES.keys()])
+    def test_default_decoder(self, index):
+        text = " ".join(decode.CTYPES[index]) * 2
+        want = text
+        for key, value in decode.CTYPES[index].items():
+            want = want.replace(key, value)
+
+        self.assertEqual(decode.default_decoder(index, text), want)
+
     @parameterized.expand([(index) for index in test_input.keys()])
     def test_round_trip_x(self, index):
         unicode_content = "á š č đ ž ŋ Á Č ŧ Š Đ Ŋ Ž Ŧ ø Ø å Å æ Æ"
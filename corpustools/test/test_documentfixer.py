@@ -2013,6 +2013,44 @@ LOGO: Smi kulturfestivala 1998
 
         self.assertXmlEqual(document_fixer.root, etree.fromstring(expected_doc))
 
+    def test_fix_paragraphs(self):
+        document_fixer = documentfixer.DocumentFixer(
+            etree.fromstring(
+                "<document><header/><body>"
+                "<p>a­b «c d» <em>e «f»</em> g «h»</p>"
+                "<p>i­j k</p>"
+                "</body></document>"
+            )
+        )
+
+        self.assertEqual(document_fixer.fix_paragraphs(), "9")
+        self.assertXmlEqual(
+            document_fixer.root,
+            etree.fromstring(
+                "<document><header/><body>"
+                '<p>a<hyph/>b <span type="quote">«c d»</span> '
+                '<em>e <span type="quote">«f»</span></em> g '
+                '<span type="quote">«h»</span></p>'
+                "<p>i<hyph/>j k</p>"
+                "</body></document>"
+            ),
+        )
+
+    def test_fix_paragraphs_without_quotes(self):
+        document_fixer = documentfixer.DocumentFixer(
+            etree.fromstring(
+                "<document><header/><body><p>a­b «c d»</p></body></document>"
+            )
+        )
+
+        self.assertEqual(document_fixer.fix_paragraphs(detect_quotes=False), "3")
+        self.assertXmlEqual(
+            document_fixer.root,
+            etree.fromstring(
+                "<document><header/><body><p>a<hyph/>b «c d»</p></body></document>"
+            ),
+        )
+
     def test_compact_em1(self):
         document_fixer = documentfixer.DocumentFixer(
             etree.fromstring(
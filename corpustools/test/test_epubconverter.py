@@ -24,7 +24,7 @@ from shutil import copyfile
 from lxml import etree
 from testfixtures import TempDirectory
 
-from corpustools import htmlcontentconverter, util, xslsetter
+from corpustools import epubconverter, htmlcontentconverter, util, xslsetter
 from corpustools.test.xmltester import XMLTester
 
 HERE = os.path.dirname(__file__)
@@ -209,3 +209,32 @@ class TestEpubConverter1(XMLTester):
                 htmlcontentconverter.convert2intermediate,
                 temp_epub,
             )
+
+
+def test_split_ranges():
+    """Ranges inside one chapter are removed from that chapter."""
+    ranges = [
+        (".//html:body/html:div[2]/html:div[1]/html:p[1]", ""),
+        (
+            ".//html:body/html:div[2]/html:div[1]/html:p[2]",
+            ".//html:body/html:div[2]/html:div[2]/html:p[4]",
+        ),
+        (
+            ".//html:body/html:div[1]/html:h2[1]",
+            ".//html:body/html:div[3]/html:h3[1]",
+        ),
+        (".//html:body/html:div[3]/html:p[1]", ""),
+    ]
+
+    chapter_ranges, book_ranges = epubconverter.split_ranges(ranges)
+
+    assert chapter_ranges == {
+        2: [
+            (".//html:body/html:div[1]/html:div[1]/html:p[1]", ""),
+            (
+                ".//html:body/html:div[1]/html:div[1]/html:p[2]",
+                ".//html:body/html:div[1]/html:div[2]/html:p[4]",
+            ),
+        ]
+    }
+    assert book_ranges == ranges[2:]
@@ -25,6 +25,7 @@ from corpustools.error_annotated_sentence import (
     ErrorAnnotatedSentence,
     ErrorMarkup,
     ErrorMarkupSegment,
+    parse_markup,
     parse_markup_to_sentence,
 )
 from corpustools.error_types import ErrorType
@@ -536,9 +537,38 @@ def test_parse_markup_to_sentence(
 ):
     parsed_sentence = parse_markup_to_sentence(iter(error_markup_string))
     assert parsed_sentence == error_annotated_sentence, f"Failed test case: {name}"
+    assert parse_markup(error_markup_string) == error_annotated_sentence, (
+        f"Failed parse_markup for test case: {name}"
+    )
     assert parsed_sentence.uncorrected_text() == uncorrected_text, (
         f"Failed uncorrected text for test case: {name}"
     )
     assert (
         etree.tostring(parsed_sentence.to_xml(), encoding="unicode") == expected_xml
     ), f"Failed XML output for test case: {name}"
+
+
+@pytest.mark.parametrize(
+    "error_markup_string",
+    [
+        "",
+        "a} b",
+        "{a}${b} c} d",
+        "{a}$",
+        "{a}${b",
+        "{a",
+        "{{a}${b}",
+        "{a}${b|c///d}{e}¢{f} g",
+        "{a}x{b}",
+        "{a}",
+    ],
+)
+def test_parse_markup_malformed(error_markup_string: str):
+    """parse_markup handles broken markup like parse_markup_to_sentence."""
+    try:
+        want = parse_markup_to_sentence(iter(error_markup_string))
+    except ValueError as error:
+        with pytest.raises(ValueError, match=str(error)):
+            parse_markup(error_markup_string)
+    else:
+        assert parse_markup(error_markup_string) == want
@@ -0,0 +1,83 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the analysis filters in korp_mono."""
+
+import pytest
+
+from corpustools import korp_mono
+
+
+@pytest.mark.parametrize(
+    ("analysis", "want"),
+    [
+        (
+            '"<suohkan>"\n\t"suohkan" N Sg Nom <W:0.0000000000> @HNOUN #1->0\n',
+            '"<suohkan>"\n\t"suohkan" N Sg Nom @HNOUN #1->0\n',
+        ),
+        (
+            '"<St.meld>"\n\t"St.meld" N ACR <ext> "<St.meld>" @HNOUN #1->0\n',
+            '"<St.meld>"\n\t"St.meld" N ACR @HNOUN #1->0\n',
+        ),
+        (
+            '"<x>"\n\t"x" N "< suohkanbargi>" <cs> <mv> "<x>" #1->0\n',
+            '"<x>"\n\t"x" N <mv> "<x>" #1->0\n',
+        ),
+        (
+            '"<.>"\n\t"." CLB "<.>" "<,>" #2->1\n',
+            '"<.>"\n\t"." CLB "<,>" #2->1\n',
+        ),
+        (
+            '"<<>"\n\t"<" PUNCT #1->0\n"<>>"\n\t">" PUNCT #2->1\n',
+            '"<<>"\n\t"\\<" PUNCT #1->0\n"<>>"\n\t"\\>" PUNCT #2->1\n',
+        ),
+    ],
+)
+def test_reshape_analysis(analysis, want):
+    assert korp_mono.reshape_analysis(analysis) == want
+
+
+@pytest.mark.parametrize(
+    ("analysis", "language", "want"),
+    [
+        (
+            "boahtte_∞_A Sem/Dummytag Use/NG Attr Err/Orth @>N #14->15",
+            "nob",
+            "boahtte_∞_A Attr @>N #14->15",
+        ),
+        (
+            'CWD_∞_N Use/Circ"CWD" Gram/TAbbr CmpNP/None G3 Sg Indef',
+            "nob",
+            'CWD_∞_N "CWD" Sg Indef',
+        ),
+    ],
+)
+def test_extract_original_analysis(analysis, language, want):
+    assert korp_mono.extract_original_analysis(analysis, language) == want
+
+
+def test_clean_msd():
+    assert korp_mono.clean_msd(" IV Ind Prs Relc Dyn Known Sg3/x ", "V") == (
+        "V.Ind.Prs.Rel...Sg3_x"
+    )
+
+
+def test_clean_string2generate():
+    assert (
+        korp_mono.clean_string2generate("ruoktu_∞1CO∞_N  Cmp/SgNom_™__™_Ex/N_∞_Sg")
+        == "ruoktu+N+Cmp/SgNom_™_N+Sg"
+    )
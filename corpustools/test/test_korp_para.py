@@ -0,0 +1,107 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the batched tmx analysis in korp_para."""
+
+from subprocess import CompletedProcess
+
+import pytest
+
+from corpustools import korp_para
+
+
+def fake_analysis(text):
+    """Analyse each whitespace separated token as a noun."""
+    return "".join(
+        f'"<{token}>"\n\t"{token}" N Sg Nom @HNOUN #1->0\n'
+        if token != korp_para.BOUNDARY
+        else f'"<{token}>"\n\t"{token}" CLB #1->1\n\n'
+        for token in text.split()
+    )
+
+
+def fake_checker(calls, drop_boundary=False):
+    def run_divvun_checker(text, analyser_zpipe_path, variant_name):
+        calls.append(text)
+        if drop_boundary and text.count(korp_para.BOUNDARY) > 1:
+            text = text.replace(korp_para.BOUNDARY, "", 1)
+        return CompletedProcess([], 0, stdout=fake_analysis(text), stderr="")
+
+    return run_divvun_checker
+
+
+def test_make_batches():
+    assert list(korp_para.make_batches(["ab", "cd", "ef", "g"], 4)) == [
+        ["ab", "cd"],
+        ["ef", "g"],
+    ]
+
+
+def test_prepare_segment():
+    assert korp_para.prepare_segment(" a ¶\nb ") == "a b"
+    assert korp_para.prepare_segment(None) == ""
+
+
+@pytest.mark.parametrize("drop_boundary", [False, True])
+def test_analyse_segments(monkeypatch, drop_boundary):
+    calls = []
+    monkeypatch.setattr(
+        korp_para.analyser, "run_divvun_checker", fake_checker(calls, drop_boundary)
+    )
+    segments = ["Muhto dat", "", "ja ¶ nu", "bargá"]
+
+    analyses = korp_para.analyse_segments(segments, "sme.zpipe", "korp-analyser")
+
+    assert [korp_para.wordforms(analysis) for analysis in analyses] == [
+        "Muhtodat",
+        "",
+        "janu",
+        "bargá",
+    ]
+    assert len(calls) == (7 if drop_boundary else 1)
+
+
+def test_analyse_segments_unaligned_segment(monkeypatch):
+    calls = []
+
+    def run_divvun_checker(text, analyser_zpipe_path, variant_name):
+        calls.append(text)
+        # Split the compound in two cohorts, which never aligns
+        return CompletedProcess(
+            [], 0, stdout=fake_analysis(text.replace("-", " ")), stderr=""
+        )
+
+    monkeypatch.setattr(korp_para.analyser, "run_divvun_checker", run_divvun_checker)
+
+    analyses = korp_para.analyse_segments(
+        ["Muhto dat", "ja-nu"], "sme.zpipe", "korp-analyser"
+    )
+
+    assert [korp_para.wordforms(analysis) for analysis in analyses] == [
+        "Muhtodat",
+        "janu",
+    ]
+    assert korp_para.BOUNDARY not in analyses[1]
+    assert calls[-1] == "ja-nu\n"
+
+
+def test_split_analysis_misaligned():
+    analysis = fake_analysis("a ¶ b c ¶")
+
+    assert korp_para.split_analysis(analysis, ["a", "b c"]) is not None
+    assert korp_para.split_analysis(analysis, ["a b", "c"]) is None
+    assert korp_para.split_analysis(analysis, ["a", "b", "c"]) is None
@@ -224,6 +224,37 @@ class TestLanguageDetector(XMLTester):
 
         self.assertEqual(got_paragraph, expected_paragraph)
 
+    def test_detect_language_classifies_each_text_once(self):
+        class CountingGuesser:
+            def __init__(self):
+                self.texts = []
+
+            def get_langs(self, langs):
+                return set(langs)
+
+            def classify(self, text, langs):
+                self.texts.append(text)
+                return "nob"
+
+        root = etree.fromstring(
+            '<document xml:lang="sme"><header><multilingual>'
+            '<language xml:lang="nob"/></multilingual></header><body>'
+            '<p>Footer  text</p><p>Footer text <span type="quote">Sitat</span></p>'
+            "<p>Footer\ntext</p></body></document>"
+        )
+        guesser = CountingGuesser()
+        languagedetector.classify.cache_clear()
+        languagedetector.LanguageDetector(root, guesser).detect_language()
+
+        self.assertEqual(sorted(guesser.texts), ["Footer text", "Sitat"])
+        self.assertEqual(
+            [
+                p.get("{http://www.w3.org/XML/1998/namespace}lang")
+                for p in root.iter("p")
+            ],
+            ["nob", "nob", "nob"],
+        )
+
     def test_detect_language_with_multilingualtag(self):
         root = etree.parse(
             os.path.join(
@@ -0,0 +1,66 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the parallel packaging of tmx files."""
+
+import zipfile
+
+from corpustools import packagetmx
+
+TMX = """<?xml version='1.0' encoding='utf-8'?>
+<tmx>
+  <header srclang="sme"/>
+  <body>
+    <tu>
+      <tuv xml:lang="sme"><seg>{sme}</seg></tuv>
+      <tuv xml:lang="nob"><seg>{nob}</seg></tuv>
+    </tu>
+  </body>
+</tmx>
+"""
+
+
+def test_make_packages(tmp_path, monkeypatch):
+    corpusdir = tmp_path / "corpus-sme"
+    for lang in ["nob", "sma"]:
+        (corpusdir / "tmx" / lang / "sub").mkdir(parents=True)
+        for index, name in enumerate(["a.tmx", "b.tmx", "sub/c.tmx"]):
+            (corpusdir / "tmx" / lang / name).write_text(
+                TMX.format(sme=f"Buorre beaivi {index}", nob=f"{lang} {index}" * 50)
+            )
+
+    packages = {}
+    for ncpus in [1, 2]:
+        outdir = tmp_path / str(ncpus)
+        outdir.mkdir()
+        monkeypatch.chdir(outdir)
+        packagetmx.make_packages(corpusdir, ncpus)
+        packages[ncpus] = {path.name: path.read_bytes() for path in outdir.iterdir()}
+
+    assert packages[1] == packages[2]
+    assert sorted(name[:7] for name in packages[2]) == ["sme2nob", "sme2sma"]
+    (sma_name,) = (name for name in packages[2] if name.startswith("sme2sma"))
+    with zipfile.ZipFile(tmp_path / "2" / sma_name) as zip_file:
+        assert zip_file.testzip() is None
+        assert sorted(info.filename[-10:] for info in zip_file.infolist()) == [
+            "000001.tmx",
+            "000002.tmx",
+            "000003.tmx",
+        ]
+        assert sorted(zip_file.read(name) for name in zip_file.namelist()) == sorted(
+            path.read_bytes() for path in (corpusdir / "tmx" / "sma").rglob("*.tmx")
+        )
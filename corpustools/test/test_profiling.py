@@ -0,0 +1,97 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the profiling report."""
+
+import json
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from corpustools import profiling
+
+
+def copy_file(path):
+    path.with_suffix(".out").write_bytes(path.read_bytes() * 2)
+    subprocess.run([sys.executable, "-c", "sum(range(100000))"], check=True)
+
+
+def output_of(path):
+    return path.with_suffix(".out")
+
+
+def test_profiled(tmp_path):
+    profiler = profiling.Profiler(tmp_path / "report.json", sample_rate=1.0)
+    profiler.start()
+    function = pickle.loads(
+        pickle.dumps(profiling.profiled(profiler, copy_file, "copy", None, output_of))
+    )
+    (tmp_path / "a.txt").write_text("abc")
+    (tmp_path / "b.txt").write_text("defg")
+    (tmp_path / "c.txt").write_text("")
+
+    function(tmp_path / "a.txt")
+    function(tmp_path / "b.txt")
+    with (
+        pytest.raises(ZeroDivisionError),
+        profiler.measure("divide", tmp_path / "c.txt"),
+    ):
+        print(1 / 0)
+
+    report = profiler.finish()
+
+    assert report == json.loads((tmp_path / "report.json").read_text())
+    assert not profiler.records.exists()
+    assert {
+        (record["name"], record["input_size"], record["output_size"], record["status"])
+        for record in report["files"]
+    } == {
+        ((tmp_path / "a.txt").as_posix(), 3, 6, "ok"),
+        ((tmp_path / "b.txt").as_posix(), 4, 8, "ok"),
+        (
+            (tmp_path / "c.txt").as_posix(),
+            None,
+            None,
+            "ZeroDivisionError: division by zero",
+        ),
+    }
+    assert {
+        name: (stage["files"], stage["failed"], stage["input_size"])
+        for name, stage in report["stages"].items()
+    } == {"copy": (2, 0, 7), "divide": (1, 1, 0)}
+    assert report["stages"]["copy"]["subprocess_cpu"] > 0
+    assert sorted(record["profile"] for record in report["profiles"]) == sorted(
+        path.as_posix() for path in profiler.profiles.iterdir()
+    )
+    assert len(report["profiles"]) == len(report["files"])
+
+
+def test_sampling():
+    profiler = profiling.Profiler("report.json", sample_rate=0.5)
+    names = [f"file{number}.xml" for number in range(1000)]
+    sampled = [name for name in names if profiler.is_sampled(name)]
+
+    assert len(sampled) == pytest.approx(len(names) / 2, rel=0.1)
+    assert sampled == [name for name in names if profiler.is_sampled(name)]
+
+
+def test_no_profiler():
+    assert profiling.profiled(None, copy_file, "copy") is copy_file
+    with profiling.measure(None, "copy", "a.txt"):
+        pass
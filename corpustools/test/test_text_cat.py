@@ -19,9 +19,12 @@
 #
 
 
+import gzip
 import os
+import tempfile
 import unittest
 from io import StringIO
+from unittest import mock
 
 from corpustools import text_cat
 
@@ -126,3 +129,27 @@ class TestTextCat(unittest.TestCase):
         self.assertEqual(
             0, wmodel_sme.compare_tc(nob_test, cmodel_sme.compare(ctext_nob))
         )
+
+    def test_folder_trainer(self):
+        texts = {
+            "sme": "Sámediggi nammada sámi báikenammakonsuleanttaid\n" * 20,
+            "nob": "Regional utvikling og samisk\nkultur i Norge\n" * 20,
+        }
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            with open(os.path.join(corpus_dir, "sme.txt"), "w") as sme:
+                sme.write(texts["sme"])
+            with gzip.open(os.path.join(corpus_dir, "nob.txt.gz"), "wt") as nob:
+                nob.write(texts["nob"])
+
+            with mock.patch.object(text_cat.FolderTrainer, "chunk_size", 100):
+                trainer = text_cat.FolderTrainer(corpus_dir, ncpus=1)
+
+        for lang, text in texts.items():
+            self.assertEqual(
+                trainer.models[lang][".lm"].freq,
+                text_cat.CharModel().of_text(text).freq,
+            )
+            self.assertEqual(
+                trainer.models[lang][".wm"].freq,
+                text_cat.WordModel().of_text(text).freq,
+            )
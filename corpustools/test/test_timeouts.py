@@ -0,0 +1,141 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the time limits of corpus runs."""
+
+import io
+import json
+import os
+import signal
+import subprocess
+import time
+
+import pytest
+
+from corpustools import analyser, timeouts, util
+
+SLEEP = {"slow": 10, "slowish": 0.5}
+
+
+def sleep_and_touch(path):
+    time.sleep(SLEEP.get(path.name, 0))
+    path.touch()
+
+
+def stuck_in_c(path):
+    """Stand in for a worker stuck in a C library, out of reach of SIGALRM."""
+    if path.name == "stuck":
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        time.sleep(SLEEP["slow"])
+    path.touch()
+
+
+def test_run_in_parallel_timeout(tmp_path):
+    files = [tmp_path / name for name in ["a", "slowish", "slow"]]
+    report = tmp_path / "report.json"
+
+    started = time.monotonic()
+    failed = util.run_in_parallel(
+        sleep_and_touch,
+        2,
+        files,
+        [1] * len(files),
+        limits=timeouts.Limits(file=0.25, retry=True),
+    )
+    timeouts.write_failure_report(report, failed)
+
+    assert time.monotonic() - started < SLEEP["slow"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "a",
+        "report.json",
+        "slowish",
+    ]
+    assert json.loads(report.read_text()) == [
+        {
+            "file": str(tmp_path / "slow"),
+            "error": "FileTimeoutError: Timed out after 1.0 seconds",
+            "timed_out": True,
+        }
+    ]
+
+
+def sleep_ignoring_os_errors():
+    with util.ignored(OSError):
+        time.sleep(SLEEP["slow"])
+    time.sleep(SLEEP["slow"])
+
+
+def test_time_limit_is_not_an_os_error():
+    started = time.monotonic()
+    with pytest.raises(timeouts.FileTimeoutError), timeouts.time_limit(0.1):
+        sleep_ignoring_os_errors()
+
+    assert time.monotonic() - started < SLEEP["slow"]
+
+
+def test_external_command_timeout():
+    runner = util.ExternalCommandRunner()
+
+    with (
+        timeouts.limited(timeouts.Limits(subprocess=0.1)),
+        pytest.raises(subprocess.TimeoutExpired),
+    ):
+        runner.run(["sleep", "10"])
+    assert timeouts.subprocess_timeout() is None
+
+
+def test_killed_after():
+    with subprocess.Popen(["sleep", "10"], start_new_session=True) as process:
+        with (
+            pytest.raises(subprocess.TimeoutExpired),
+            timeouts.killed_after(process, 0.1),
+        ):
+            process.wait()
+        assert process.returncode is not None
+
+
+def test_run_in_parallel_kills_stuck_worker(tmp_path):
+    files = [tmp_path / name for name in ["a", "stuck", "b"]]
+
+    started = time.monotonic()
+    failed = util.run_in_parallel(
+        stuck_in_c, 2, files, [1] * len(files), limits=timeouts.Limits(file=0.25)
+    )
+
+    assert time.monotonic() - started < SLEEP["slow"]
+    assert [(file.name, type(error)) for file, error in failed] == [
+        ("stuck", timeouts.FileTimeoutError)
+    ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "b"]
+
+
+def test_wrapped_command_timeout(tmp_path, monkeypatch):
+    """The processes a timed out command started are killed with it."""
+    divvun_checker = tmp_path / "divvun-checker"
+    divvun_checker.write_text(f"#!/bin/sh\nsleep {SLEEP['slow']}\ntrue\n")
+    divvun_checker.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    started = time.monotonic()
+    with (
+        timeouts.limited(timeouts.Limits(subprocess=0.1)),
+        pytest.raises(subprocess.TimeoutExpired),
+    ):
+        analyser.stream_divvun_checker(
+            lambda stdin: stdin.write("text"), "x.zpipe", "x", io.BytesIO()
+        )
+    assert time.monotonic() - started < SLEEP["slow"]
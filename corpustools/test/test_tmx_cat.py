@@ -0,0 +1,68 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the streaming tmx concatenation."""
+
+from io import BytesIO
+
+import pytest
+from lxml import etree
+
+from corpustools import tmx_cat
+
+
+def make_tmx(path, segments):
+    path.write_text(
+        "<tmx><header/><body>\n"
+        + "".join(
+            f'  <tu><tuv xml:lang="sme"><seg>{sme}</seg></tuv>'
+            f'<tuv xml:lang="nob"><seg>{nob}</seg></tuv></tu>\n'
+            for sme, nob in segments
+        )
+        + "</body></tmx>\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.mark.parametrize("ncpus", [1, 2])
+def test_write_concatenated(tmp_path, ncpus):
+    tmx_files = [
+        make_tmx(tmp_path / "a.tmx", [("Buorre beaivi", "God dag"), ("Giitu", "Takk")]),
+        make_tmx(tmp_path / "b.tmx", [("Mun &amp; don", "Jeg &amp; du")]),
+    ]
+    output = BytesIO()
+
+    tmx_cat.write_concatenated(tmx_files, output, ncpus)
+
+    tree = etree.fromstring(output.getvalue())
+    assert tree.find("header").get("srclang") == "sme"
+    assert [seg.text for seg in tree.iter("seg")] == [
+        "Buorre beaivi",
+        "God dag",
+        "Giitu",
+        "Takk",
+        "Mun & don",
+        "Jeg & du",
+    ]
+
+
+def test_no_tuv(tmp_path):
+    with pytest.raises(SystemExit):
+        tmx_cat.write_concatenated(
+            [make_tmx(tmp_path / "a.tmx", [])], BytesIO(), ncpus=1
+        )
@@ -18,7 +18,11 @@
 #
 """Test sentence division functionality."""
 
+import os
+import tempfile
 import unittest
+from pathlib import Path
+from unittest import mock
 
 from corpustools import trainingcorpusmaker
 
@@ -114,3 +118,46 @@ class TestTrainingCorpusMaker(unittest.TestCase):
             ]
         )
         self.assertEqual(got, want)
+
+    def test_make_training_corpus(self):
+        """Check that the corpora are made, and current files kept."""
+        analysis = "\n".join(
+            [
+                '"<áhkuin>"',
+                '\t"áhkku" N Sem/Hum Sg Com <W:0.0000000000> @<ADVL #1->0',
+                '"<!>"',
+                '\t"!" CLB <W:0.0000000000> #2->1',
+                "",
+            ]
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            analysed = tmp / "free" / "analysed" / "sme" / "admin" / "a.xml"
+            analysed.parent.mkdir(parents=True)
+            analysed.write_text(
+                '<document xml:lang="sme"><body><dependency><![CDATA['
+                f"{analysis}]]></dependency></body></document>",
+                encoding="utf-8",
+            )
+            (tmp / "bound").mkdir()
+            env = {"GTFREE": str(tmp / "free"), "GTBOUND": str(tmp / "bound")}
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                with mock.patch.dict(os.environ, env):
+                    self.sentencemaker.make_training_corpus(1)
+                    sentence_file = analysed.with_suffix(".txt")
+                    mtime = sentence_file.stat().st_mtime_ns
+                    self.sentencemaker.make_training_corpus(1)
+            finally:
+                os.chdir(cwd)
+
+            self.assertEqual(sentence_file.stat().st_mtime_ns, mtime)
+            self.assertEqual(
+                (tmp / "pytextcat" / "sme" / "sme.txt").read_text(),
+                "áhkuin!\n",
+            )
+            self.assertEqual(
+                (tmp / "langid" / "admin" / "sme" / "a.txt").read_text(),
+                "áhkuin!\n",
+            )
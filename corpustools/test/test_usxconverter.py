@@ -0,0 +1,60 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø & the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Test the conversion of bible usx files."""
+
+from lxml import etree
+
+from corpustools import usxconverter
+
+USX = (
+    '<usx version="3.0">\n'
+    '  <book code="GEN" style="id">Sámi</book>\n'
+    '  <para style="mt1">Vuosttaš girji</para>\n'
+    '  <chapter number="1" style="c" sid="GEN 1"/>\n'
+    '  <para style="s">Ipmil <note caller="+" style="f">'
+    '<char style="fr">1.1</char> nohta</note>sivdnida</para>\n'
+    '  <para style="p"><verse number="1" style="v" sid="GEN 1:1"/>'
+    'Álgus sivdnidii <char style="wj" strong="H430">Ipmil</char> albmi.'
+    '<verse eid="GEN 1:1"/></para>\n'
+    '  <para style="q1">ja   eatnama</para>\n'
+    '  <para style="rem">Ii mihkkege</para>\n'
+    '  <chapter eid="GEN 1"/>\n'
+    '  <chapter number="2" style="c" sid="GEN 2"/>\n'
+    '  <para style="li">Vuosttaš</para>\n'
+    '  <chapter eid="GEN 2"/>\n'
+    "</usx>\n"
+)
+
+
+def test_convert2intermediate(tmp_path):
+    usx_file = tmp_path / "test.usx"
+    usx_file.write_text(USX, encoding="utf-8")
+
+    assert etree.tostring(
+        usxconverter.convert2intermediate(str(usx_file)), encoding="unicode"
+    ) == (
+        "<document><body>\n"
+        '<section>\n<p type="title">Vuosttaš girji</p></section>\n'
+        '<section>\n<p type="title">Ipmil sivdnida</p>'
+        '<p>Álgus sivdnidii<span type="quote">Ipmil</span> albmi. ja eatnama</p>'
+        "</section>\n"
+        "<section>\n</section>\n"
+        '<section>\n<p type="listitem">Vuosttaš</p></section>\n'
+        "<section>\n</section>\n"
+        "</body></document>"
+    )
@@ -17,6 +17,7 @@
 #
 
 
+import os
 import unittest
 
 from corpustools import util
@@ -44,3 +45,47 @@ class TestSplitPath(unittest.TestCase):
             util.split_path("/home/me/freecorpus/orig/nob/bible/osko/omoss.html"),
             ("/home/me/freecorpus", "orig", "nob", "bible", "osko", "omoss.html"),
         )
+
+
+def touch_or_die(path):
+    if path.name == "die":
+        os._exit(1)
+    path.touch()
+
+
+def test_memory_scheduler(monkeypatch):
+    monkeypatch.setattr(util, "available_memory", lambda: util.MEMORY_RESERVE + 1000)
+    jobs = [
+        util.Job(name, 0, cost)
+        for name, cost in zip("abcde", [400, 400, 400, 2000, 100], strict=True)
+    ]
+    scheduler = util.MemoryScheduler(4, jobs)
+
+    assert [job.file for job in scheduler.admit()] == ["a", "b"]
+    scheduler.finish(jobs[0])
+    assert [job.file for job in scheduler.admit()] == ["c"]
+    scheduler.finish(jobs[1])
+    scheduler.finish(jobs[2])
+    assert [job.file for job in scheduler.admit()] == ["d"]
+    assert not list(scheduler.admit())
+    scheduler.finish(jobs[3])
+    assert [job.file for job in scheduler.admit()] == ["e"]
+
+
+def test_memory_scheduler_retry():
+    jobs = [util.Job(name, 0, 0) for name in "ab"]
+    scheduler = util.MemoryScheduler(4, [])
+
+    assert scheduler.retry(jobs) == []
+    assert [job.file for job in scheduler.admit()] == ["a"]
+    assert not list(scheduler.admit())
+    assert scheduler.retry([jobs[0]]) == [jobs[0]]
+
+
+def test_run_in_parallel_survives_dead_worker(tmp_path):
+    files = [tmp_path / name for name in ["a", "die", "b", "c"]]
+
+    failed = util.run_in_parallel(touch_or_die, 2, files, [1] * len(files))
+
+    assert [file for file, _ in failed] == [tmp_path / "die"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "b", "c"]
@@ -33,13 +33,18 @@ http://odur.let.rug.nl/~vannoord/TextCat/
 
 import argparse
 import codecs
+import functools
 import glob
 import gzip
+import itertools
 import os
 import re
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 from corpustools import argparse_version, util
+from corpustools.common_arg_ncpus import NCpus
 
 here = os.path.dirname(__file__)
 
@@ -97,40 +102,50 @@ class NGramModel:
                 raise ValueError("%s: %d %s" % (fname, nl + 1, error)) from error
         return freq
 
-    def tokenise(self, text):
+    @classmethod
+    def tokenise(cls, text):
         """Tokenise the text
 
         Since we use split() when loading the model file, we also use split()
         on the input text; this includes whitespace (like byte order
         marks) that might not all be in SPLITCHARS
         """
-        tokens = (re.split(self.SPLITCHARS, t) for t in text.split())
-        return sum(tokens, [])  # flatten
+        return list(
+            itertools.chain.from_iterable(
+                re.split(cls.SPLITCHARS, t) for t in text.split()
+            )
+        )
 
     def freq_of_text(self, text, freq):
-        """This should update freq and return it."""
-        raise NotImplementedError("You have to subclass and override freq_of_text")
+        """Update freq with the counts of text and return it."""
+        return self.freq_of_words(Counter(self.tokenise(text)), freq)
+
+    def freq_of_words(self, words, freq):
+        """Update freq with counts made from word counts and return it.
+
+        Args:
+            words (Counter): the number of times each word occurs, in the
+                order the words were first seen.
+            freq (dict[str, int]): the counts to update.
+        """
+        raise NotImplementedError("You have to subclass and override freq_of_words")
+
+    def of_words(self, words):
+        self.finish(self.freq_of_words(words, {}))
+        return self
 
     def to_model_file(self, fil, fname):
         raise NotImplementedError("You have to subclass and override to_model_file")
 
     def freq_of_text_file(self, fil):
-        freq = {}
-        for nl, strline in enumerate(fil.readlines()):
-            try:
-                line = strline
-            except UnicodeDecodeError as e:
-                if self.unicode_warned == 0:
-                    util.note(
-                        "WARNING: Line {} gave {}, skipping ... "
-                        "(not warning again)".format(nl, e)
-                    )
-                self.unicode_warned += 1
-                continue
-            freq = self.freq_of_text(line, freq)
+        words = Counter()
+        for lines in read_chunks(fil):
+            chunk_words, skipped = count_words(lines)
+            words.update(chunk_words)
+            self.unicode_warned += skipped
         if self.unicode_warned != 0:
             util.note(f"Saw {self.unicode_warned} UnicodeDecodeErrors")
-        return freq
+        return self.freq_of_words(words, {})
 
     def finish(self, freq):
         self.ngrams = {
@@ -175,15 +190,14 @@ class CharModel(NGramModel):
         )
         fil.write(lines)
 
-    def freq_of_text(self, text, freq):
-        words = self.tokenise(text)
-        for word in words:
+    def freq_of_words(self, words, freq):
+        for word, count in words.items():
             _word_ = "_" + word + "_"
             size = len(_word_)
             for i in range(size):
                 for s in (1, 2, 3, 4):
                     sub = _word_[i : i + s]
-                    freq[sub] = freq.get(sub, 0) + 1
+                    freq[sub] = freq.get(sub, 0) + count
                     if i + s >= size:
                         break
         return freq
@@ -206,10 +220,9 @@ class WordModel(NGramModel):
         )
         fil.write(lines)
 
-    def freq_of_text(self, text, freq):
-        words = self.tokenise(text)
-        for word in words:
-            freq[word] = freq.get(word, 0) + 1
+    def freq_of_words(self, words, freq):
+        for word, count in words.items():
+            freq[word] = freq.get(word, 0) + count
         return freq
 
     def finish(self, freq):
@@ -363,52 +376,192 @@ class Classifier:
         return self.classify_full(text, [] if langs is None else langs, verbose)[0][0]
 
 
+@functools.cache
+def default_classifier():
+    """Get a Classifier with the language models shipped with corpustools.
+
+    The models are loaded on the first call, and shared by later callers.
+    """
+    return Classifier()
+
+
+CHUNK_SIZE = 4 * 1024 * 1024
+MODEL_TYPES = {".lm": CharModel, ".wm": WordModel}
+
+
+def read_chunks(fil, chunk_size=CHUNK_SIZE):
+    """Read a corpus file in chunks of whole lines.
+
+    Args:
+        fil (file): the corpus, opened in text or binary mode.
+        chunk_size (int): the approximate size of each chunk.
+
+    Yields:
+        (list[str|bytes]): the lines of each chunk.
+    """
+    while lines := fil.readlines(chunk_size):
+        yield lines
+
+
+def count_words(lines):
+    """Count the words in lines of a corpus.
+
+    Args:
+        lines (list[str|bytes]): the lines. Lines that are bytes are
+            decoded as utf-8, and skipped if they are not valid utf-8.
+
+    Returns:
+        (tuple[Counter, int]): the number of times each word occurs, in
+            the order the words are first seen, and the number of
+            skipped lines.
+    """
+    texts = []
+    skipped = 0
+    for line in lines:
+        if isinstance(line, bytes):
+            try:
+                texts.append(line.decode("utf8"))
+            except UnicodeDecodeError:
+                skipped += 1
+        else:
+            texts.append(line)
+
+    return Counter(NGramModel.tokenise("".join(texts))), skipped
+
+
+def count_chunk(chunk):
+    """Count the words of a chunk of a language corpus.
+
+    Args:
+        chunk (tuple[str, list[str|bytes]]): the language and the lines.
+
+    Returns:
+        (tuple[str, Counter, int]): the language, the word counts and
+            the number of lines that could not be decoded.
+    """
+    lang, lines = chunk
+    return lang, *count_words(lines)
+
+
+def train_models(lang, words):
+    """Train the character and word models of a language.
+
+    Args:
+        lang (str): the language.
+        words (Counter): the word counts of the language corpus.
+
+    Returns:
+        (dict[str, NGramModel]): the models, keyed by their file extension.
+    """
+    return {
+        ext: model_type(lang=lang).of_words(words)
+        for ext, model_type in MODEL_TYPES.items()
+    }
+
+
 class FolderTrainer:
-    """Train the language guesser from a directory."""
+    """Train the language guesser from a directory.
+
+    The corpus of each language is read once, in chunks that are counted
+    in parallel. Both the character (.lm) and word (.wm) models are made
+    from the merged counts.
+    """
 
-    def __init__(self, folder, exts=None, model=CharModel, verbose=False):
+    chunk_size = CHUNK_SIZE
+
+    def __init__(self, folder, exts=None, verbose=False, ncpus=None):
         if exts is None:
             exts = [".txt", ".txt.gz"]
 
-        language_filename = (
-            (util.basename_noext(filename, ext), filename)
+        self.verbose = verbose
+        filenames = {
+            util.basename_noext(filename, ext): filename
             for ext in exts
             for filename in glob.glob(os.path.normcase(os.path.join(folder, "*" + ext)))
-        )
-        self.models = {
-            language: self.create_model(model, verbose, language, fname)
-            for language, fname in language_filename
         }
 
-        if not self.models:
+        if not filenames:
             raise Exception(
                 "No suitable files found matching {}/*.{}{}{}!".format(
                     folder, "{", ",".join(exts), "}"
                 )
             )
 
-    def create_model(self, model, verbose: bool, language, filename):
-        file_size_threshold = 5000000
-        if verbose:
-            msg = f"Processing {filename}"
-            if os.path.getsize(filename) > file_size_threshold:
-                msg += " (this may take a while)"
-            util.note(msg)
-            sys.stderr.flush()
-        return model(language).of_text_file(self.open_corpus(filename))
-
-    def open_corpus(self, fname):
+        self.models = self.train(filenames, ncpus or os.cpu_count())
+
+    def train(self, filenames, ncpus):
+        """Train the models of the languages.
+
+        Args:
+            filenames (dict[str, str]): the corpus file of each language.
+            ncpus (int): the number of processes to count with.
+
+        Returns:
+            (dict[str, dict[str, NGramModel]]): the models of each
+                language, keyed by their file extension.
+        """
+        trained = {}
+        with ProcessPoolExecutor(max_workers=ncpus) as pool:
+            words = Counter()
+            skipped = 0
+            current = None
+            for lang, chunk_words, chunk_skipped in util.map_in_order(
+                pool, count_chunk, self.chunks(filenames), 2 * ncpus
+            ):
+                if lang != current:
+                    if current is not None:
+                        trained[current] = self.submit(pool, current, words, skipped)
+                    current, words, skipped = lang, Counter(), 0
+                words.update(chunk_words)
+                skipped += chunk_skipped
+            trained[current] = self.submit(pool, current, words, skipped)
+
+            return {lang: future.result() for lang, future in trained.items()}
+
+    def submit(self, pool, lang, words, skipped):
+        """Train the models of lang in pool, when its words are counted."""
+        if skipped:
+            util.note(f"{lang}: skipped {skipped} lines that are not valid utf-8")
+        return pool.submit(train_models, lang, words)
+
+    def chunks(self, filenames):
+        """Read the corpora in chunks.
+
+        Yields:
+            (tuple[str, list[bytes]]): the language and lines of each
+                chunk. A language with an empty corpus gets one empty
+                chunk, so that it gets (empty) models too.
+        """
+        for lang, filename in filenames.items():
+            if self.verbose:
+                util.note(f"Processing {filename}")
+            with self.open_corpus(filename) as corpus:
+                empty = True
+                for lines in read_chunks(corpus, self.chunk_size):
+                    empty = False
+                    yield lang, lines
+                if empty:
+                    yield lang, []
+
+    @staticmethod
+    def open_corpus(fname):
         if fname.endswith(".gz"):
             return gzip.open(fname, "rb")
         else:
-            return codecs.open(fname, "r", encoding="utf8")
-
-    def save(self, folder, ext=".lm", verbose=False):
-        for lang, model in self.models.items():
-            fname = os.path.join(folder, lang + ext)
-            model.to_model_file(codecs.open(fname, "w", encoding="utf8"))
+            return open(fname, "rb")
+
+    def save(self, folder, verbose=False):
+        for lang, models in self.models.items():
+            for ext, model in models.items():
+                fname = os.path.join(folder, lang + ext)
+                with codecs.open(fname, "w", encoding="utf8") as model_file:
+                    model.to_model_file(model_file)
         if verbose and self.models:
-            util.note("Wrote {{{}}}{}".format(",".join(list(self.models.keys())), ext))
+            util.note(
+                "Wrote {{{}}}{{{}}}".format(
+                    ",".join(self.models), ",".join(MODEL_TYPES)
+                )
+            )
 
 
 class FileTrainer:
@@ -454,11 +607,8 @@ def folder_comp(args):
     for d in [args.corp_dir, args.model_dir]:
         if not os.path.isdir(d):
             raise util.ArgumentError(f"{d} is not a directory!")
-    FolderTrainer(args.corp_dir, model=CharModel, verbose=args.verbose).save(
-        args.model_dir, ext=".lm", verbose=args.verbose
-    )
-    FolderTrainer(args.corp_dir, model=WordModel, verbose=args.verbose).save(
-        args.model_dir, ext=".wm", verbose=args.verbose
+    FolderTrainer(args.corp_dir, verbose=args.verbose, ncpus=args.ncpus).save(
+        args.model_dir, verbose=args.verbose
     )
 
 
@@ -529,6 +679,7 @@ def parse_options():
     compdir_parser.add_argument(
         "model_dir", help="Directory to write LM and WM files in."
     )
+    compdir_parser.add_argument("--ncpus", action=NCpus)
     compdir_parser.set_defaults(func=folder_comp)
 
     return parser.parse_args()
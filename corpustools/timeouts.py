@@ -0,0 +1,326 @@
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this file. If not, see <http://www.gnu.org/licenses/>.
+#
+#   Copyright © 2026 The University of Tromsø &
+#                    the Norwegian Sámi Parliament
+#   http://giellatekno.uit.no & http://divvun.no
+#
+"""Limit the time spent on each file of a corpus run.
+
+With --timeout, a file that takes longer than the given number of
+seconds to process is stopped, and counted as failed. With
+--subprocess-timeout, each external command, such as pdftohtml or
+divvun-checker, is killed if it runs longer than the given number of
+seconds.
+
+External commands are started in a session of their own, so that the
+processes they start are killed with them. In a parallel run, a worker
+that does not stop by itself when its file times out, because it is
+stuck in a C library, is killed.
+
+With --retry-timeouts, the files that timed out in a parallel run are
+processed once more at the end of the run, with RETRY_FACTOR times the
+time limits. With --failure-report, the files that failed, and why, are
+written to a json file.
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+RETRY_FACTOR = 4
+# The most extra time a worker gets to stop by itself after a timeout
+GRACE = 5
+
+
+class FileTimeoutError(Exception):
+    """Raised when processing a file takes longer than its time limit.
+
+    This is not the builtin TimeoutError, which is an OSError, so the
+    except OSError blocks of the code processing the file do not catch
+    it.
+    """
+
+
+# The errors raised when a file, or a command run for it, times out
+TIMEOUT_ERRORS = (FileTimeoutError, subprocess.TimeoutExpired)
+
+
+@dataclass
+class Limits:
+    """Time limits in seconds. None means no limit.
+
+    Attributes:
+        file: the time limit for processing one file.
+        subprocess: the time limit of each external command.
+        retry: whether files that time out are retried at the end of
+            the run, with RETRY_FACTOR times the time limits.
+    """
+
+    file: float | None = None
+    subprocess: float | None = None
+    retry: bool = False
+
+    def scaled(self, factor: float) -> "Limits":
+        """Make limits that are factor times these limits, without retry."""
+        return replace(
+            self,
+            retry=False,
+            file=None if self.file is None else self.file * factor,
+            subprocess=None if self.subprocess is None else self.subprocess * factor,
+        )
+
+
+# The limits of the file being processed in this process
+_current = Limits()
+
+
+def subprocess_timeout() -> float | None:
+    """Get the time limit of external commands run in this process."""
+    return _current.subprocess
+
+
+@contextmanager
+def time_limit(seconds: float | None):
+    """Raise FileTimeoutError if the with block runs longer than seconds.
+
+    The block is interrupted by SIGALRM, so this only works in the main
+    thread, on systems that have it. It is interrupted when it returns
+    to python code, a single long call into a C library is not.
+
+    Args:
+        seconds: the time limit, None for no limit.
+    """
+    if (
+        seconds is None
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def timed_out(_signum, _frame):
+        raise FileTimeoutError(f"Timed out after {seconds} seconds")
+
+    previous = signal.signal(signal.SIGALRM, timed_out)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@contextmanager
+def limited(limits: Limits | None):
+    """Apply limits to the processing of a file in the with block."""
+    if limits is None:
+        yield
+        return
+
+    previous = _current.subprocess
+    _current.subprocess = limits.subprocess
+    try:
+        with time_limit(limits.file):
+            yield
+    finally:
+        _current.subprocess = previous
+
+
+def deadline(limits: Limits | None) -> float | None:
+    """Get the time after which a worker processing a file is killed.
+
+    A worker gets as long again as the time limit of the file, but at
+    most GRACE seconds, to stop by itself.
+
+    Args:
+        limits: the time limits of the file.
+
+    Returns:
+        The deadline in seconds, None if there is none.
+    """
+    if limits is None or limits.file is None:
+        return None
+
+    return limits.file + min(limits.file, GRACE)
+
+
+def call(limits: Limits | None, function, file, *args, **kwargs):
+    """Call function with file and the other arguments, within limits.
+
+    This is what the workers of util.run_in_parallel run.
+    """
+    with limited(limits):
+        return function(file, *args, **kwargs)
+
+
+def kill_group(process: subprocess.Popen):
+    """Kill process and the processes it started.
+
+    Args:
+        process: a process started with start_new_session=True. For
+            other processes, only the process itself is killed.
+    """
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        # They have all exited, or process is not a group leader
+        process.kill()
+
+
+def run(command: list[str], to_stdin=None, **kwargs) -> subprocess.CompletedProcess:
+    """Run command like subprocess.run, within the subprocess time limit.
+
+    The command is started in a session of its own. When it times out,
+    or is interrupted, it is killed together with the processes it
+    started, which may hold its pipes open.
+
+    Args:
+        command: the command to run.
+        to_stdin: the input to the command, if any.
+        kwargs: the arguments of subprocess.Popen.
+
+    Raises:
+        subprocess.TimeoutExpired: if the command timed out.
+    """
+    if to_stdin is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    with subprocess.Popen(command, start_new_session=True, **kwargs) as process:
+        try:
+            stdout, stderr = process.communicate(to_stdin, timeout=subprocess_timeout())
+        except BaseException:
+            kill_group(process)
+            raise
+
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+
+@contextmanager
+def killed_after(process: subprocess.Popen, seconds: float | None):
+    """Kill process if the with block runs longer than seconds.
+
+    The process is also killed if the block raises an exception, so
+    that a process that is not being read from is not left behind. The
+    processes it started are killed with it.
+
+    Args:
+        process: a process started with start_new_session=True.
+        seconds: the time limit, None for no limit.
+
+    Raises:
+        subprocess.TimeoutExpired: if the process was killed because it
+            ran too long.
+    """
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        kill_group(process)
+
+    timer = None if seconds is None else threading.Timer(seconds, kill)
+    if timer is not None:
+        timer.start()
+    try:
+        yield
+    except BaseException:
+        kill_group(process)
+        raise
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(process.args, seconds)
+
+
+def write_failure_report(path: str | Path, failures: list[tuple]):
+    """Write the files that failed, and why, to a json file.
+
+    Args:
+        path: the path of the report.
+        failures: the failed files, and the exceptions they failed with.
+    """
+    Path(path).write_text(
+        json.dumps(
+            [
+                {
+                    "file": str(getattr(file, "orig", file)),
+                    "error": f"{type(error).__name__}: {error}",
+                    "timed_out": isinstance(error, TIMEOUT_ERRORS),
+                }
+                for file, error in failures
+            ],
+            indent=2,
+            ensure_ascii=False,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    print(f"{len(failures)} failed files written to {path}")
+
+
+def report_failures(args: argparse.Namespace, failures: list[tuple]):
+    """Write the failure report asked for on the command line, if any.
+
+    Args:
+        args: options parsed with parser as a parent.
+        failures: the failed files, and the exceptions they failed with.
+    """
+    if args.failure_report is not None:
+        write_failure_report(args.failure_report, failures)
+
+
+def make_limits(args: argparse.Namespace) -> Limits | None:
+    """Make the limits given on the command line, if any.
+
+    Args:
+        args: options parsed with parser as a parent.
+    """
+    if args.timeout is None and args.subprocess_timeout is None:
+        return None
+
+    return Limits(args.timeout, args.subprocess_timeout, args.retry_timeouts)
+
+
+parser = argparse.ArgumentParser(add_help=False)
+parser.add_argument(
+    "--timeout",
+    metavar="SECONDS",
+    type=float,
+    help="Stop processing a file after this many seconds, and count it as failed",
+)
+parser.add_argument(
+    "--subprocess-timeout",
+    metavar="SECONDS",
+    type=float,
+    help="Kill external commands, such as pdftohtml and divvun-checker, "
+    "after this many seconds, and count the file as failed",
+)
+parser.add_argument(
+    "--retry-timeouts",
+    action="store_true",
+    help=f"Retry the files that timed out at the end of a parallel run, with "
+    f"{RETRY_FACTOR} times the time limits",
+)
+parser.add_argument(
+    "--failure-report",
+    metavar="FILE",
+    help="Write the files that failed, and why, to FILE as json",
+)
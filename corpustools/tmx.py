@@ -20,13 +20,82 @@
 
 
 import argparse
+import functools
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from lxml import etree
 
-from corpustools import argparse_version, corpuspath
+from corpustools import argparse_version, corpuspath, util
+from corpustools.common_arg_ncpus import NCpus
 
 HERE = os.path.dirname(__file__)
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+
+class Tmx:
+    """Read the translation units of a tmx document.
+
+    The segments are read once, and kept for later calls.
+    """
+
+    def __init__(self, tmx):
+        """Initialise the Tmx class.
+
+        Args:
+            tmx (etree._ElementTree): a parsed tmx document.
+        """
+        self.tmx = tmx
+
+    @functools.cached_property
+    def segments(self):
+        """The stripped segments of each tu, keyed by language.
+
+        Returns:
+            (list[dict[str, str]]): the segments of the tu elements.
+        """
+        return [
+            {
+                tuv.get(XML_LANG): (tuv.findtext("seg") or "").strip()
+                for tuv in transl_unit.iter("tuv")
+            }
+            for transl_unit in self.tmx.iter("tu")
+        ]
+
+    @functools.cached_property
+    def langs(self):
+        """The languages of the tmx document, source language first."""
+        langs = []
+        for segments in self.segments:
+            langs.extend(lang for lang in segments if lang not in langs)
+
+        return langs
+
+    def tmx_to_stringlist(self):
+        """The tu elements as tab separated lines, one per tu."""
+        return self.stringlist
+
+    @functools.cached_property
+    def stringlist(self):
+        return [
+            "\t".join(segments.get(lang, "") for lang in self.langs) + "\n"
+            for segments in self.segments
+        ]
+
+    def lang_to_stringlist(self, lang):
+        """The segments of lang, one per tu."""
+        return [segments.get(lang, "") for segments in self.segments]
+
+    def links(self, lang1, lang2):
+        """The aligned sentence pairs of lang1 and lang2.
+
+        Returns:
+            (list[tuple[str, str]]): the segments of each tu.
+        """
+        return [
+            (segments.get(lang1, ""), segments.get(lang2, ""))
+            for segments in self.segments
+        ]
 
 
 def make_tu(line1, file1_lang, line2, file2_lang):
@@ -93,21 +162,24 @@ def make_tuv(line, lang):
     return tuv
 
 
+@functools.cache
+def tmx2html_transformer():
+    """Compile the tmx to html stylesheet once per process."""
+    return etree.XSLT(etree.parse(os.path.join(HERE, "xslt/tmx2html.xsl")))
+
+
 def tmx2html(filename):
     """Turn a tmx file into an html file.
 
     Args:
-        filename (str): name of a tmx file
+        filename (Path): name of a tmx file
     """
     tmx = etree.parse(filename)
-    html2tmx_transformer = etree.XSLT(
-        etree.parse(os.path.join(HERE, "xslt/tmx2html.xsl"))
-    )
 
     html_name = filename.with_name(filename.name + ".html")
     html_name.write_bytes(
         etree.tostring(
-            html2tmx_transformer(tmx),
+            tmx2html_transformer()(tmx),
             pretty_print=True,
             encoding="utf-8",
             xml_declaration=True,
@@ -126,6 +198,7 @@ def parse_options():
         parents=[argparse_version.parser], description="Convert tmx files to html"
     )
 
+    parser.add_argument("--ncpus", action=NCpus)
     parser.add_argument(
         "sources", nargs="+", help="Files or directories to search for tmx files"
     )
@@ -134,9 +207,26 @@ def parse_options():
     return args
 
 
+def tmx2html_files(sources, ncpus):
+    """Turn the tmx files found in sources into html files.
+
+    Args:
+        sources (list[str]): files or directories to search for tmx files.
+        ncpus (int): the number of processes converting files.
+    """
+    tmx_files = corpuspath.collect_files(sources, suffix=".tmx")
+    if ncpus == 1:
+        for tmx_file in tmx_files:
+            tmx2html(tmx_file)
+        return
+
+    with ProcessPoolExecutor(max_workers=ncpus) as pool:
+        for _ in util.map_in_order(pool, tmx2html, tmx_files, 2 * ncpus):
+            pass
+
+
 def main():
     """Parallelise files."""
     args = parse_options()
 
-    for source in corpuspath.collect_files(args.sources, suffix=".tmx"):
-        tmx2html(source)
+    tmx2html_files(args.sources, args.ncpus)
@@ -1,9 +1,12 @@
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Iterator
 
 from lxml import etree
 
-from corpustools import argparse_version
+from corpustools import argparse_version, util
+from corpustools.common_arg_ncpus import NCpus
 from corpustools.corpuspath import collect_files
 
 
@@ -13,6 +16,7 @@ def parse_options():
         parents=[argparse_version.parser], description="Analyse files in parallel."
     )
 
+    parser.add_argument("--ncpus", action=NCpus)
     parser.add_argument(
         "tmx_dir",
         help="directory containing the TMX files to concatenate",
@@ -32,45 +36,104 @@ def make_header(tmx_root: etree.Element) -> etree.Element:
     return tmx_header
 
 
-def set_metadata(tmx_header: etree.Element, tmx_xml: etree.ElementTree) -> None:
-    first_tuv = tmx_xml.find(".//tuv[1]")
-    if first_tuv is not None:
+def set_metadata(tmx_header: etree.Element, tmx_file: Path) -> None:
+    """Set the source language to the language of the first tuv in tmx_file."""
+    for _, first_tuv in etree.iterparse(str(tmx_file), tag="tuv"):
         try:
             first_lang = first_tuv.attrib["{http://www.w3.org/XML/1998/namespace}lang"]
             tmx_header.set("srclang", first_lang)
+            return
         except KeyError as error:
             raise SystemExit(
                 "Could not find language attribute in first <tuv> element."
             ) from error
-    else:
-        raise SystemExit("No <tuv> elements found in the first TMX file.")
 
+    raise SystemExit("No <tuv> elements found in the first TMX file.")
 
-def make_body(tmx_root: etree.Element, tmx_header: etree.Element, tmx_dir: str) -> None:
-    body = etree.SubElement(tmx_root, "body")
-    for file_no, tmx_file in enumerate(collect_files([tmx_dir], suffix=".tmx")):
-        print(f"Processing TMX file: {tmx_file}", end="\r")
-        tmx_xml = etree.parse(tmx_file)
-        if file_no == 0:
-            set_metadata(tmx_header, tmx_xml)
-        for tu in tmx_xml.iter("tu"):
-            body.append(tu)
+
+def tu_strings(tmx_file: Path) -> Iterator[bytes]:
+    """Read the tu elements of tmx_file one at a time.
+
+    Args:
+        tmx_file: path to a tmx file.
+
+    Yields:
+        Each tu element, serialised on a line of its own.
+    """
+    for _, tu in etree.iterparse(str(tmx_file), tag="tu"):
+        tu.tail = None
+        yield b"    " + etree.tostring(tu, encoding="utf-8") + b"\n"
+        # Keep memory use constant, remove what has been written
+        tu.clear()
+        while tu.getprevious() is not None:
+            del tu.getparent()[0]
+
+
+def file_tus(tmx_file: Path) -> bytes:
+    """Serialise all the tu elements of tmx_file."""
+    return b"".join(tu_strings(tmx_file))
+
+
+def body_parts(tmx_files: list[Path], ncpus: int) -> Iterator[bytes]:
+    """Read the tu elements of the tmx files, in order.
+
+    Args:
+        tmx_files: the tmx files.
+        ncpus: the number of processes parsing files. If 1, the tu
+            elements are streamed one at a time, otherwise each process
+            parses a whole file.
+
+    Yields:
+        Serialised tu elements.
+    """
+    if ncpus == 1:
+        for tmx_file in tmx_files:
+            print(f"Processing TMX file: {tmx_file}", end="\r")
+            yield from tu_strings(tmx_file)
+        return
+
+    with ProcessPoolExecutor(max_workers=ncpus) as pool:
+        for tmx_file, tus in zip(
+            tmx_files,
+            util.map_in_order(pool, file_tus, tmx_files, 2 * ncpus),
+            strict=True,
+        ):
+            print(f"Processing TMX file: {tmx_file}", end="\r")
+            yield tus
+
+
+def write_concatenated(tmx_files: list[Path], output: BinaryIO, ncpus: int) -> None:
+    """Write the tu elements of tmx_files into one tmx file.
+
+    The tu elements are written as they are read, so the concatenated
+    file is never held in memory.
+
+    Args:
+        tmx_files: the tmx files to concatenate.
+        output: the file to write to.
+        ncpus: the number of processes parsing files.
+    """
+    tmx_header = make_header(etree.Element("tmx"))
+    set_metadata(tmx_header, tmx_files[0])
+
+    output.write(b"<tmx>\n  ")
+    output.write(etree.tostring(tmx_header, encoding="utf-8"))
+    output.write(b"\n  <body>\n")
+    for part in body_parts(tmx_files, ncpus):
+        output.write(part)
+    output.write(b"  </body>\n</tmx>\n")
 
 
 def main():
-    """Analyse files in the given directories."""
+    """Concatenate the tmx files in the given directory."""
     args = parse_options()
 
-    tmx_root = etree.Element("tmx")
-    tmx_header = make_header(tmx_root)
-
-    make_body(tmx_root, tmx_header, args.tmx_dir)
+    tmx_files = list(collect_files([args.tmx_dir], suffix=".tmx"))
+    if not tmx_files:
+        raise SystemExit(f"No TMX files found in {args.tmx_dir}")
 
     concatenated_file = Path("concatenated.tmx")
-    concatenated_file.write_bytes(
-        etree.tostring(
-            tmx_root, pretty_print=True, encoding="UTF-8"
-        )
-    )
+    with concatenated_file.open("wb") as output:
+        write_concatenated(tmx_files, output, args.ncpus)
 
     print(f"Concatenated TMX file written to: {concatenated_file}")
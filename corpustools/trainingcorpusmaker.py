@@ -20,13 +20,16 @@
 
 
 import argparse
-import io
 import os
-from shutil import copy
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from shutil import copy, copyfileobj
 
 import regex
+from lxml import etree
 
-from corpustools import argparse_version, ccat, util
+from corpustools import argparse_version, cg3, util
+from corpustools.common_arg_ncpus import NCpus
 
 
 class TrainingCorpusMaker:
@@ -37,13 +40,12 @@ class TrainingCorpusMaker:
 
     Attributes:
         only_words (str): regex catching word made up of letters.
-        xml_printer (ccat.XMLPrinter): extracts the dependency analysis
-            from the giella xml files.
+        sentence_ends (set[str]): lemmas of clause boundaries ending a sentence.
         lang (str): the language of the training corpus.
     """
 
     only_words = regex.compile(r"\p{L}+")
-    xml_printer = ccat.XMLPrinter(dependency=True)
+    sentence_ends = {"¶", "?", "!", "…"}
 
     def __init__(self, lang):
         """Initialise the TrainingCorpusMaker class.
@@ -59,6 +61,54 @@ class TrainingCorpusMaker:
         Args:
             text (str): contains the dependency element of a giella xml file.
 
+        Yields:
+            (str): a sentence containing only words known to the giella fst
+                analysers, that contain at least a word as identified by
+                the only_words regex.
+        """
+        return self.parse_cohorts(cg3.cohorts(text.splitlines()))
+
+    def is_sentence_end(self, reading):
+        """Check if reading is a clause boundary ending a sentence.
+
+        Args:
+            reading (cg3.Reading): a reading of a cohort.
+
+        Returns:
+            (bool): True if the reading ends a sentence.
+        """
+        return "CLB" in reading.tags and (
+            reading.lemma.startswith(".") or reading.lemma in self.sentence_ends
+        )
+
+    def end_sentence(self, sentence_buffer, uff_buffer):
+        """Empty the buffers when a sentence ends.
+
+        The unknown words of the sentence are printed.
+
+        Args:
+            sentence_buffer (list[str]): the words and blanks of the sentence.
+            uff_buffer (list[str]): the unknown words of the sentence.
+
+        Returns:
+            (str|None): the sentence, if it contains no unknown words and
+                at least a word as identified by the only_words regex.
+        """
+        sentence_line = "".join(sentence_buffer).replace("¶", "").strip()
+        keep = not uff_buffer and self.only_words.search(sentence_line)
+        for uff in uff_buffer:
+            util.print_frame(uff)
+        uff_buffer[:] = []
+        sentence_buffer[:] = []
+
+        return sentence_line if keep else None
+
+    def parse_cohorts(self, cohorts):
+        """Turn the cohorts of a dependency analysis into sentences.
+
+        Args:
+            cohorts (iterable of cg3.Cohort): the cohorts of an analysis.
+
         Yields:
             (str): a sentence containing only words known to the giella fst
                 analysers, that contain at least a word as identified by
@@ -66,35 +116,21 @@ class TrainingCorpusMaker:
         """
         sentence_buffer = []
         uff_buffer = []
-        for line in io.StringIO(text):
-            line = line.rstrip()
-            if line == ":" or line == ":\\n":
-                sentence_buffer.append(" ")
-            elif line.startswith(":"):
-                uff_buffer.append(line)
-            elif line.startswith('"'):
-                sentence_buffer.append(line[2:-2])
-            elif "CLB" in line:
-                if not (
-                    '".' not in line
-                    and '"¶"' not in line
-                    and '"?"' not in line
-                    and '"!"' not in line
-                    and '"…"' not in line
-                ):
-                    if uff_buffer:
-                        for uff in uff_buffer:
-                            util.print_frame(uff)
-                    else:
-                        sentence_line = (
-                            "".join(sentence_buffer).replace("¶", "").strip()
-                        )
-                        if self.only_words.search(sentence_line):
+        for cohort in cohorts:
+            sentence_buffer.append(cohort.wordform)
+            for top_reading in cohort.readings:
+                for reading in top_reading.all_readings():
+                    if self.is_sentence_end(reading):
+                        sentence_line = self.end_sentence(sentence_buffer, uff_buffer)
+                        if sentence_line is not None:
                             yield sentence_line
-                    uff_buffer[:] = []
-                    sentence_buffer[:] = []
-            elif '" ?' in line:
-                uff_buffer.append(line)
+                    elif reading.unknown:
+                        uff_buffer.append(reading.line)
+            for blank in cohort.blanks:
+                if blank.rstrip() in {":", ":\\n"}:
+                    sentence_buffer.append(" ")
+                else:
+                    uff_buffer.append(blank.rstrip())
 
     def file_to_sentences(self, filename):
         """Turn a giella xml into a list of sentences.
@@ -106,61 +142,133 @@ class TrainingCorpusMaker:
         Returns:
             (list[str]): list of the sentences
         """
-        self.xml_printer.parse_file(filename)
-        text = self.xml_printer.process_file().getvalue()
-        if text.strip():
-            return [sentence for sentence in self.parse_dependency(text) if sentence]
-        else:
-            return []
+        return [
+            sentence
+            for sentence in self.parse_cohorts(
+                cg3.cohorts(cg3.dependency_lines(filename))
+            )
+            if sentence
+        ]
+
+    def corpus_dirs(self):
+        """The directories of the analysed free and bound corpus.
+
+        Returns:
+            (list[str]): the directories.
+        """
+        return [
+            os.path.join(os.getenv("GTFREE"), "analysed", self.lang),
+            os.path.join(os.getenv("GTBOUND"), "analysed", self.lang),
+        ]
 
     def analysed_files(self):
         """Find analysed files.
 
         Yields:
-            (str): filename of an analysed file.
+            (tuple[str, str]): the corpus directory and the filename of an
+                analysed file.
         """
-        for corpus in [
-            os.path.join(os.getenv("GTFREE"), "analysed", self.lang),
-            os.path.join(os.getenv("GTBOUND"), "analysed", self.lang),
-        ]:
+        for corpus in self.corpus_dirs():
             for root, _, files in os.walk(corpus):
                 for file_ in files:
-                    yield os.path.join(root, file_)
+                    if file_.endswith(".xml"):
+                        yield corpus, os.path.join(root, file_)
 
-    def make_corpus_files(self):
-        """Make .txt files from .xml files.
+    @staticmethod
+    def sentence_filename(analysed_file):
+        """The name of the file with the sentences of analysed_file."""
+        return analysed_file.replace(".xml", ".txt")
 
-        The .txt files contain only sentences with words known to the
+    def is_current(self, analysed_file):
+        """Check if the sentence file is newer than the analysed file."""
+        try:
+            return os.path.getmtime(
+                self.sentence_filename(analysed_file)
+            ) >= os.path.getmtime(analysed_file)
+        except OSError:
+            return False
+
+    def write_sentence_file(self, analysed_file):
+        """Write the sentences of analysed_file to its sentence file.
+
+        The sentence file contains only sentences with words known to the
         giella fsts.
+
+        Args:
+            analysed_file (str): path to an analysed file.
+
+        Returns:
+            (str): path to the sentence file.
+        """
+        sentence_file = self.sentence_filename(analysed_file)
+        with open(sentence_file, "w") as txt_stream:
+            for sentence in self.file_to_sentences(analysed_file):
+                txt_stream.write(sentence)
+                txt_stream.write("\n")
+            if txt_stream.tell() == 0:
+                txt_stream.write("\n")
+
+        return sentence_file
+
+    def sentence_files(self, pool):
+        """Make the sentence files of the analysed files.
+
+        The sentence files that are older than their analysed file are
+        written in pool, the others are used as they are.
+
+        Args:
+            pool (concurrent.futures.Executor): the pool writing the
+                sentence files.
+
+        Yields:
+            (tuple[str, str]): the corpus directory and the path of each
+                sentence file, in the order of the analysed files.
+        """
+        futures = [
+            (
+                corpus,
+                pool.submit(self.write_sentence_file, analysed_file)
+                if not self.is_current(analysed_file)
+                else None,
+                analysed_file,
+            )
+            for corpus, analysed_file in self.analysed_files()
+        ]
+        for corpus, future, analysed_file in futures:
+            if future is None:
+                yield corpus, self.sentence_filename(analysed_file)
+                continue
+
+            try:
+                yield corpus, future.result()
+            except (OSError, UnicodeDecodeError, etree.XMLSyntaxError) as error:
+                util.note(f"Skipping {analysed_file}: {error}")
+
+    def make_training_corpus(self, ncpus):
+        """Turn the free and bound corpus into pytextcat and langid corpora.
+
+        The pytextcat corpus is one file with all the sentences of the
+        language, the langid corpus has a copy of the sentence files in
+        a directory for each genre.
+
+        Args:
+            ncpus (int): the number of processes writing sentence files.
         """
-        for analysed_file in self.analysed_files():
-            if analysed_file.endswith(".xml"):
-                with open(analysed_file.replace(".xml", ".txt"), "w") as txt_stream:
-                    txt_stream.write("\n".join(self.file_to_sentences(analysed_file)))
-                    txt_stream.write("\n")
-
-    def pytextcat_corpus(self):
-        """Turn the free and bound corpus into a pytextcat training corpus."""
         corpus_dir = os.path.join("pytextcat", self.lang)
-        with util.ignored(OSError):
-            os.makedirs(corpus_dir)
-
-        with open(f"{os.path.join(corpus_dir, self.lang)}.txt", "w") as corpusfile:
-            for analysed_file in self.analysed_files():
-                if analysed_file.endswith(".txt"):
-                    with open(analysed_file) as analysed:
-                        corpusfile.write(analysed.read())
-
-    def langid_corpus(self):
-        """Turn the free and bound corpus into a langid training corpus."""
-        for analysed_file in self.analysed_files():
-            if analysed_file.endswith(".txt"):
-                langid_dir = "langid/{}/{}".format(
-                    util.split_path(analysed_file).genre, self.lang
-                )
-                with util.ignored(OSError):
-                    os.makedirs(langid_dir)
-                copy(analysed_file, langid_dir)
+        os.makedirs(corpus_dir, exist_ok=True)
+
+        with (
+            ProcessPoolExecutor(max_workers=ncpus) as pool,
+            open(f"{os.path.join(corpus_dir, self.lang)}.txt", "w") as corpusfile,
+        ):
+            for corpus, sentence_file in self.sentence_files(pool):
+                with open(sentence_file) as sentences:
+                    copyfileobj(sentences, corpusfile)
+
+                genre = Path(os.path.relpath(sentence_file, corpus)).parts[0]
+                langid_dir = os.path.join("langid", genre, self.lang)
+                os.makedirs(langid_dir, exist_ok=True)
+                copy(sentence_file, langid_dir)
 
 
 def parse_options():
@@ -170,6 +278,7 @@ def parse_options():
         description="Make training corpus from analysed giella xml files.\n"
         "Sentences with words unknown for the giella fsts are not included.",
     )
+    parser.add_argument("--ncpus", action=NCpus)
     parser.add_argument(
         "langs", nargs="+", help="The languages to make a training corpus for."
     )
@@ -182,10 +291,7 @@ def main():
     args = parse_options()
 
     for lang in args.langs:
-        sentence_maker = TrainingCorpusMaker(lang)
-        sentence_maker.make_corpus_files()
-        sentence_maker.pytextcat_corpus()
-        sentence_maker.langid_corpus()
+        TrainingCorpusMaker(lang).make_training_corpus(args.ncpus)
 
     print(
         "Now you will find training corpus for pytextcat and langid "
@@ -19,97 +19,142 @@
 
 from lxml import etree
 
+# Elements that are removed with their content, but not their tail
+UNWANTED = ("note", "verse", "book", "table")
+
+PARAGRAPH_STYLES = {"s", "p", "nb", "mt", "mt1", "ms", "sp", "ip"}
+TITLE_STYLES = {"s", "mt", "ms", "mt1"}
+# Paragraphs continuing the previous paragraph
+CONTINUATION_STYLES = {"m", "q", "q1", "q2", "pi"}
+LIST_STYLES = {"li", "li1", "li2"}
+IGNORED_STYLES = {"b", "qa", "mr", "qc", "ide", "pc", "periph"}
+# Should possibly handled further
+UNHANDLED_STYLES = {"rem", "toc1", "toc2", "toc3", "h"}
+
 
 def char_to_span(document):
     for char in document.iter("char"):
-        for key in char.attrib:
-            del char.attrib[key]
+        char.attrib.clear()
         char.tag = "span"
         char.set("type", "quote")
 
 
 def remove_unwanted(document):
-    for unwanted in ["note", "verse", "book", "table"]:
-        etree.strip_elements(document, unwanted, with_tail=False)
+    etree.strip_elements(document, *UNWANTED, with_tail=False)
 
 
-def usx_to_document(usx_document):
-    document = etree.Element("document")
-    body = etree.SubElement(document, "body")
-    body.text = "\n"
+def normalise(text):
+    return " ".join(text.split())
 
-    for child in usx_document:
-        if child.tag == "chapter":
-            section = etree.SubElement(body, "section")
-            section.text = "\n"
-            section.tail = "\n"
-        elif child.tag == "para":
-            if child.get("style") in ["s", "p", "nb", "mt", "mt1", "ms", "sp", "ip"]:
-                try:
-                    paragraph = etree.SubElement(section, "p")
-                except UnboundLocalError:
-                    section = etree.SubElement(body, "section")
-                    section.text = "\n"
-                    section.tail = "\n"
-                    paragraph = etree.SubElement(section, "p")
-
-                if child.get("style") in ["s", "mt", "ms", "mt1"]:
-                    paragraph.set("type", "title")
-                if child.text:
-                    paragraph.text = " ".join(child.text.split())
-                for grandchild in child:
-                    paragraph.append(grandchild)
-            elif child.get("style") in ["m", "q", "q1", "q2", "pi"]:
-                try:
-                    if paragraph.get("type") == "title":
-                        paragraph = etree.SubElement(section, "p")
-                except UnboundLocalError:
-                    paragraph = etree.SubElement(section, "p")
-                if len(paragraph):
-                    if not paragraph[-1].tail:
-                        paragraph[-1].tail = " ".join(child.text.split())
-                    else:
-                        paragraph[-1].tail = (
-                            f"{paragraph[-1].tail} " f'{" ".join(child.text.split())}'
-                        )
-                else:
-                    if not paragraph.text:
-                        try:
-                            paragraph.text = " ".join(child.text.split())
-                        except AttributeError:
-                            pass
-                    else:
-                        try:
-                            paragraph.text = (
-                                f"{paragraph.text} " f'{" ".join(child.text.split())}'
-                            )
-                        except AttributeError:
-                            pass
-            elif child.get("style") in ["li", "li1", "li2"]:
-                paragraph = etree.SubElement(section, "p")
-                paragraph.set("type", "listitem")
-                if child.text:
-                    paragraph.text = " ".join(child.text.split())
-                for grandchild in child:
-                    paragraph.append(grandchild)
-
-            elif child.get("style") in ["b", "qa", "mr", "qc", "ide", "pc", "periph"]:
-                pass
-            elif child.get("style") in ["rem", "toc1", "toc2", "toc3", "h"]:
-                # Should possibly handled further
-                pass
+
+class UsxToDocument:
+    """Build a Giella xml document from the top level usx elements."""
+
+    def __init__(self):
+        self.document = etree.Element("document")
+        self.body = etree.SubElement(self.document, "body")
+        self.body.text = "\n"
+        self.section = None
+        self.paragraph = None
+
+    def add_section(self):
+        self.section = etree.SubElement(self.body, "section")
+        self.section.text = "\n"
+        self.section.tail = "\n"
+
+    def add_paragraph(self, child):
+        """Make a p element of a para element, keeping its children."""
+        self.paragraph = etree.SubElement(self.section, "p")
+        if child.text:
+            self.paragraph.text = normalise(child.text)
+        for grandchild in child:
+            self.paragraph.append(grandchild)
+
+    def continue_paragraph(self, child):
+        """Add the text of a para element to the current p element."""
+        if self.paragraph is None or self.paragraph.get("type") == "title":
+            self.paragraph = etree.SubElement(self.section, "p")
+        paragraph = self.paragraph
+        if len(paragraph):
+            if not paragraph[-1].tail:
+                paragraph[-1].tail = normalise(child.text)
+            else:
+                paragraph[-1].tail = f"{paragraph[-1].tail} {normalise(child.text)}"
+        elif child.text is not None:
+            if not paragraph.text:
+                paragraph.text = normalise(child.text)
             else:
-                print(etree.tostring(child, encoding="unicode"))
-        else:
+                paragraph.text = f"{paragraph.text} {normalise(child.text)}"
+
+    def add(self, child):
+        """Add a top level usx element to the document.
+
+        Args:
+            child (lxml.etree.Element): a child of the usx root, where
+                unwanted elements are removed and char elements are
+                turned into spans.
+        """
+        style = child.get("style") if child.tag == "para" else None
+        if child.tag == "chapter":
+            self.add_section()
+        elif style in PARAGRAPH_STYLES:
+            if self.section is None:
+                self.add_section()
+            self.add_paragraph(child)
+            if style in TITLE_STYLES:
+                self.paragraph.set("type", "title")
+        elif style in CONTINUATION_STYLES:
+            self.continue_paragraph(child)
+        elif style in LIST_STYLES:
+            self.add_paragraph(child)
+            self.paragraph.set("type", "listitem")
+        elif style not in IGNORED_STYLES and style not in UNHANDLED_STYLES:
             print(etree.tostring(child, encoding="unicode"))
 
-    return document
+
+def usx_to_document(usx_document):
+    converter = UsxToDocument()
+    for child in usx_document:
+        converter.add(child)
+
+    return converter.document
+
+
+def add_finished_children(converter, root, end):
+    """Add the finished top level usx elements to the document.
+
+    The elements are moved out of the usx document, so that they can
+    be changed while the rest of it is parsed.
+
+    Args:
+        converter (UsxToDocument): the document that is being built.
+        root (lxml.etree.Element): the usx root element.
+        end (int|None): the index of the first child that may not be
+            finished. If None, all children are finished.
+    """
+    finished = etree.Element(root.tag)
+    finished.extend(root[:end])
+    remove_unwanted(finished)
+    char_to_span(finished)
+    for child in finished:
+        converter.add(child)
 
 
 def convert2intermediate(filename):
-    """Convert usx xml files to the giellatekno xml format."""
-    usx_doc = etree.parse(filename).getroot()
-    remove_unwanted(usx_doc)
-    char_to_span(usx_doc)
+    """Convert usx xml files to the giellatekno xml format.
+
+    The usx file is converted one chapter at a time while it is parsed.
+    When a chapter element has been parsed, the elements before it are
+    finished, tails included. They are added to the document and thrown
+    away, so only about one chapter of the usx document is kept in
+    memory.
+    """
+    converter = UsxToDocument()
+    context = etree.iterparse(filename, events=("end",), tag="chapter")
+    for _, chapter in context:
+        root = chapter.getparent()
+        if root is not None and root.getparent() is None:
+            add_finished_children(converter, root, root.index(chapter))
+    add_finished_children(converter, context.root, None)
 
-    return usx_to_document(usx_doc)
+    return converter.document
@@ -22,6 +22,7 @@ import concurrent.futures.process
 import datetime
 import hashlib
 import inspect
+import multiprocessing
 import operator
 import os
 import os.path
@@ -30,13 +31,17 @@ import subprocess
 import sys
 import time
 import traceback
-from collections.abc import Callable
+from collections import deque
+from collections.abc import Callable, Iterator
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from lxml import etree
 
+from corpustools import compression, timeouts
+
 if TYPE_CHECKING:
     from corpustools.corpuspath import CorpusPath
 
@@ -316,7 +321,14 @@ class ExternalCommandRunner:
         self.returncode = None
 
     def run(self, command, cwd=None, to_stdin=None):
-        """Run the command, save the result."""
+        """Run the command, save the result.
+
+        The command is killed if it runs longer than the subprocess
+        time limit of the file being processed.
+
+        Raises:
+            subprocess.TimeoutExpired: if the command timed out.
+        """
         try:
             subp = subprocess.Popen(
                 command,
@@ -324,13 +336,22 @@ class ExternalCommandRunner:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=cwd,
+                start_new_session=True,
             )
         except OSError:
             raise ExecutableMissingError(
                 f"Please install {command[0]}, can not continue without it."
             ) from None
 
-        (self.stdout, self.stderr) = subp.communicate(to_stdin)
+        try:
+            (self.stdout, self.stderr) = subp.communicate(
+                to_stdin, timeout=timeouts.subprocess_timeout()
+            )
+        except BaseException:
+            # Also when the time limit of the file interrupts communicate
+            timeouts.kill_group(subp)
+            subp.wait()
+            raise
         self.returncode = subp.returncode
 
 
@@ -356,21 +377,269 @@ _PARA_DEFAULT_MSG_FORMAT = (
 )
 
 
+# The memory used by a worker process before it is given a file
+WORKER_MEMORY = 64 * 1024**2
+# How many times its size a file takes in memory while it is processed,
+# as measured on converted xml and on conversion of these formats
+MEMORY_FACTORS = {".html": 10, ".sfm": 7, ".txt": 6, ".usx": 7, ".xml": 10}
+DEFAULT_MEMORY_FACTOR = 10
+# How many times smaller gzip makes corpus xml
+COMPRESSION_RATIO = 8
+# Memory that is left to the rest of the system
+MEMORY_RESERVE = 512 * 1024**2
+
+
+def available_memory() -> int | None:
+    """Get the memory available to new processes, in bytes.
+
+    Returns:
+        The available memory, or None if it can not be found.
+    """
+    with ignored(OSError, ValueError), open("/proc/meminfo") as meminfo:
+        for line in meminfo:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+
+    with ignored(OSError, ValueError, AttributeError):
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+    return None
+
+
+def memory_cost(path: str | Path, size: int) -> int:
+    """Estimate the peak memory use of a worker processing a file.
+
+    Args:
+        path: path to the file, its suffix tells the type of the file.
+        size: the size of the file.
+
+    Returns:
+        The estimated memory use in bytes.
+    """
+    suffix = Path(path).suffix.lower()
+    with ignored(OSError):
+        if suffix == ".xml" and compression.is_compressed(path):
+            size *= COMPRESSION_RATIO
+
+    return WORKER_MEMORY + size * MEMORY_FACTORS.get(suffix, DEFAULT_MEMORY_FACTOR)
+
+
+@dataclass
+class Job:
+    """A file waiting to be processed by run_in_parallel.
+
+    Attributes:
+        file: the file given to the function.
+        size: the size of the file.
+        cost: the estimated memory use of processing the file.
+        alone: whether the file must be processed with no other files.
+    """
+
+    file: Any
+    size: int
+    cost: int
+    alone: bool = False
+
+
+class MemoryScheduler:
+    """Decide when files may be given to the workers of a pool.
+
+    A file is admitted when a worker is free, and when the estimated
+    memory cost of the files being processed, this one included, fits in
+    the memory that was available when processing started. The memory
+    available right now must also leave room for the file, in case
+    other programs have started using memory.
+
+    Files that do not fit are admitted when nothing else is being
+    processed, so that large files run with fewer files beside them,
+    and the largest ones run alone. Files are admitted in the order
+    they were given, so that large files are not starved by small ones.
+
+    Attributes:
+        max_workers: the number of worker processes.
+        budget: the memory that may be used by the workers, None if the
+            available memory can not be found.
+        pending: the files waiting to be admitted.
+        running: the number of files being processed.
+        in_use: the estimated memory use of the files being processed.
+        alone: whether the file being processed runs alone.
+    """
+
+    def __init__(self, max_workers: int, jobs: list[Job]):
+        """Initialise the MemoryScheduler class.
+
+        Args:
+            max_workers: the number of worker processes.
+            jobs: the files to process.
+        """
+        available = available_memory()
+        self.max_workers = max_workers
+        self.budget = None if available is None else available - MEMORY_RESERVE
+        self.pending = deque(jobs)
+        self.running = 0
+        self.in_use = 0
+        self.alone = False
+
+    def fits(self, job: Job) -> bool:
+        """Check whether job may be processed beside the running files."""
+        if self.running == 0:
+            return True
+        if self.alone or job.alone or self.running >= self.max_workers:
+            return False
+        if self.budget is None:
+            return True
+        if self.in_use + job.cost > self.budget:
+            return False
+
+        available = available_memory()
+        return available is None or available - job.cost >= MEMORY_RESERVE
+
+    def admit(self) -> Iterator[Job]:
+        """Yield the pending files that may be processed now."""
+        while self.pending and self.fits(self.pending[0]):
+            job = self.pending.popleft()
+            self.running += 1
+            self.in_use += job.cost
+            self.alone = job.alone
+            yield job
+
+    def finish(self, job: Job):
+        """Register that job is no longer being processed."""
+        self.running -= 1
+        self.in_use -= job.cost
+        self.alone = False
+
+    def retry(self, jobs: list[Job]) -> list[Job]:
+        """Retry the files that were being processed when a worker died.
+
+        A file that was processed alone is the one that killed its
+        worker, the others are retried alone.
+
+        Args:
+            jobs: the files that were being processed.
+
+        Returns:
+            The files that will not be retried.
+        """
+        if len(jobs) == 1 or any(job.alone for job in jobs):
+            return jobs
+
+        for job in reversed(jobs):
+            job.alone = True
+            self.pending.appendleft(job)
+
+        return []
+
+
+class Progress:
+    """Print the progress of run_in_parallel.
+
+    Attributes:
+        nfiles: the number of files to process.
+        total_size: the size of the files to process.
+        msg_format: the message printed for each processed file.
+        retry_timeouts: whether files that time out are retried later.
+        failed: the files that failed, and the exceptions they raised.
+        timed_out: the files that timed out, and are to be retried.
+        completed_files: the number of processed files.
+        completed_bytes: the size of the processed files.
+    """
+
+    def __init__(
+        self,
+        nfiles: int,
+        total_size: int,
+        msg_format: str,
+        retry_timeouts: bool = False,
+    ):
+        """Initialise the Progress class."""
+        self.nfiles = nfiles
+        self.total_size = total_size
+        self.msg_format = msg_format
+        self.retry_timeouts = retry_timeouts
+        self.failed: list[tuple[Any, BaseException]] = []
+        self.timed_out: list[Job] = []
+        self.completed_files = 0
+        self.completed_bytes = 0
+        self.t0 = time.monotonic_ns()
+
+    def report(self, job: Job, exc: BaseException | None):
+        """Print that the file of job is processed.
+
+        Args:
+            job: the processed file.
+            exc: the exception processing the file raised, if any.
+        """
+        self.completed_files += 1
+        self.completed_bytes += job.size
+        bytes_remaining = self.total_size - self.completed_bytes
+        secs_passed = (time.monotonic_ns() - self.t0) / 1_000_000_000
+        bytes_processed_per_sec = self.completed_bytes / secs_passed
+
+        # anders: this is so crude as to almost be pointless
+        # but -- due to the way it works, it at least gives more of
+        # an upper bound than a lower bound quite quickly into the
+        # processing, which at least is something
+        # -> because in the beginning, bytes_processed_per_sec doesn't
+        # take into account that there are other processes also
+        # working, which means bytes_completed is an underestimate on
+        # how many bytes of processing has been done in total
+        # -> but the more files are completed, the better the estimate
+        # is going to be
+        est_remaining_seconds = int(bytes_remaining / bytes_processed_per_sec)
+
+        if exc is None:
+            status = "done"
+        elif self.retry_timeouts and isinstance(exc, timeouts.TIMEOUT_ERRORS):
+            status = "TIMED OUT, retried at the end"
+            self.timed_out.append(job)
+        else:
+            status = "FAILED"
+            self.failed.append((job.file, exc))
+
+        msg = self.msg_format.format(
+            filename=getattr(job.file, "converted", job.file),
+            file_number=self.completed_files,
+            nfiles=self.nfiles,
+            bytes_processed=human_readable_filesize(self.completed_bytes),
+            bytes_total=human_readable_filesize(self.total_size),
+            processing_speed=human_readable_filesize(bytes_processed_per_sec),
+            timeleft=human_readable_timespan(est_remaining_seconds),
+            status=status,
+        )
+        print(msg)
+        if exc is not None:
+            print(exc)
+            print("".join(traceback.format_exception(exc)))
+
+
 # TODO use real types, not strings. but there is a circuar import
-def run_in_parallel(
+def run_in_parallel(  # noqa: PLR0913
     function: Callable[["CorpusPath"], None],
     max_workers: int,
     file_list: list["CorpusPath"],
     file_sizes: list[int],
     msg_format: str = _PARA_DEFAULT_MSG_FORMAT,
     *args: list[Any],
+    memory_costs: list[int] | None = None,
+    limits: timeouts.Limits | None = None,
     **kwargs: dict[str, Any],
-):
+) -> list[tuple["CorpusPath", BaseException]]:
     """Run function as many times as there are files in the `file_list`,
     in parallel. Each invocation gets one element of the `file_list`.
 
     Conceptually, it's like `function(file) for file in file_list`, but
-    in parallel. Uses a ProcessPoolExecutor with `max_workers`.
+    in parallel. Uses a ProcessPoolExecutor with `max_workers`. The
+    files are given to the workers when MemoryScheduler admits them.
+
+    If a worker dies, e.g. because it was killed for using too much
+    memory, a new pool is started. The files that were being processed
+    are retried one at a time, and a file that kills a worker while it
+    is processed alone fails.
+
+    With limits, a file fails if it is processed for too long. If
+    limits.retry is set, the files that timed out are retried once at
+    the end, with timeouts.RETRY_FACTOR times the time limits.
 
     Any additional arguments (positional or keyword) given to
     `run_in_parallel`, will be passed along to the `function`.
@@ -380,83 +649,244 @@ def run_in_parallel(
             the function is the file path.
         max_workers (int): How many worker processes to use
         file_list (list[str]): The list of files (full paths)
+        file_sizes (list[int]): The sizes of the files
+        msg_format (str): The progress message printed for each file
+        memory_costs (list[int]|None): The estimated memory use of
+            processing each file. If None, it is estimated by memory_cost.
+        limits (timeouts.Limits|None): The time limits of each file.
+
+    Returns:
+        (list): the files that failed, and the exceptions they raised.
     """
-    total_size = sum(file_sizes)
-    nfiles = len(file_list)
-    n_failed = 0
-    t0 = time.monotonic_ns()
+    if memory_costs is None:
+        memory_costs = [
+            memory_cost(getattr(file, "converted", file), size)
+            for file, size in zip(file_list, file_sizes, strict=True)
+        ]
+    jobs = [
+        Job(file, size, cost)
+        for file, size, cost in zip(file_list, file_sizes, memory_costs, strict=True)
+    ]
+    retry_timeouts = limits is not None and limits.retry
+    progress = Progress(len(jobs), sum(file_sizes), msg_format, retry_timeouts)
+    scheduler = MemoryScheduler(max_workers, jobs)
     print(
-        f"Processing {nfiles} files ({human_readable_filesize(total_size)}) "
+        f"Processing {progress.nfiles} files "
+        f"({human_readable_filesize(progress.total_size)}) "
         f"in parallel using {max_workers} workers"
     )
+    if scheduler.budget is not None:
+        print(f"{human_readable_filesize(scheduler.budget)} of memory may be used")
 
-    futures = {}  # future -> (filepath, filesize)
+    def submit(pool, job):
+        return pool.submit(timeouts.call, limits, function, job.file, *args, **kwargs)
 
+    failed = progress.failed
     try:
-        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
-            for file, filesize in zip(file_list, file_sizes, strict=False):
-                fut = pool.submit(function, file, *args, **kwargs)
-                futures[fut] = (file, filesize)
-
-            completed_bytes = 0
-
-            completed = concurrent.futures.as_completed(futures)
-            for i, future in enumerate(completed, start=1):
-                (filename, filesize) = futures.pop(future)
-                completed_bytes += filesize
-                bytes_remaining = total_size - completed_bytes
-                secs_passed = (time.monotonic_ns() - t0) / 1_000_000_000
-                bytes_processed_per_sec = completed_bytes / secs_passed
-
-                # anders: this is so crude as to almost be pointless
-                # but -- due to the way it works, it at least gives more of
-                # an upper bound than a lower bound quite quickly into the
-                # processing, which at least is something
-                # -> because in the beginning, bytes_processed_per_sec doesn't
-                # take into account that there are other processes also
-                # working, which means bytes_completed is an underestimate on
-                # how many bytes of processing has been done in total
-                # -> but the more files are completed, the better the estimate
-                # is going to be
-                est_remaining_seconds = int(bytes_remaining / bytes_processed_per_sec)
-
-                exc = future.exception()
-                if exc is None:
-                    status = "done"
-                else:
-                    status = "FAILED"
-                    n_failed += 1
-
-                msg = msg_format.format(
-                    filename=filename.converted,
-                    file_number=i,
-                    nfiles=nfiles,
-                    bytes_processed=human_readable_filesize(completed_bytes),
-                    bytes_total=human_readable_filesize(total_size),
-                    processing_speed=human_readable_filesize(bytes_processed_per_sec),
-                    timeleft=human_readable_timespan(est_remaining_seconds),
-                    status=status,
-                )
-                print(msg)
-                if exc is not None:
-                    print(exc)
-                    print(traceback.format_exc())
-    except concurrent.futures.process.BrokenProcessPool:
-        n_remaining = len(futures)
-        n_done = nfiles - n_remaining - n_failed
-        print("error: Processing was terminated unexpectedly!")
-        print(f"{n_done} files were completed, {n_failed} files failed, and ")
-        print(f"{n_remaining} didn't start processing, and still remains")
+        run_scheduled(
+            max_workers, scheduler, submit, progress, timeouts.deadline(limits)
+        )
+        if progress.timed_out:
+            limits = limits.scaled(timeouts.RETRY_FACTOR)
+            print(
+                f"Retrying {len(progress.timed_out)} files that timed out, "
+                f"with {timeouts.RETRY_FACTOR} times the time limits"
+            )
+            retried = Progress(
+                len(progress.timed_out),
+                sum(job.size for job in progress.timed_out),
+                msg_format,
+            )
+            run_scheduled(
+                max_workers,
+                MemoryScheduler(max_workers, progress.timed_out),
+                submit,
+                retried,
+                timeouts.deadline(limits),
+            )
+            failed.extend(retried.failed)
     except KeyboardInterrupt:
-        n_remaining = len(futures)
-        n_done = nfiles - n_remaining - n_failed
+        n_failed = len(progress.failed)
+        n_remaining = progress.nfiles - progress.completed_files
+        n_done = progress.completed_files - n_failed
         print("Cancelled by user")
         print(f"{n_done} files were completed, {n_failed} files failed, and ")
         print(f"{n_remaining} didn't start processing, and still remains")
     else:
-        n_ok = nfiles - n_failed
+        n_failed = len(failed)
+        n_ok = progress.nfiles - n_failed
         print(f"all done. {n_ok} files ok, {n_failed} failed")
 
+    return failed
+
+
+def run_scheduled(
+    max_workers: int,
+    scheduler: MemoryScheduler,
+    submit: Callable[[concurrent.futures.Executor, Job], concurrent.futures.Future],
+    progress: Progress,
+    deadline: float | None = None,
+):
+    """Process the files of scheduler, restarting the workers if one dies.
+
+    Args:
+        max_workers: how many worker processes to use.
+        scheduler: decides when files are given to the workers.
+        submit: submits a file to the pool.
+        progress: reports the processed files.
+        deadline: the seconds after which the workers are killed if
+            they still process a file, None for no deadline.
+    """
+    while scheduler.pending:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+            lost = run_admitted(pool, scheduler, submit, progress.report, deadline)
+        if lost:
+            print(
+                f"error: a worker died while processing {len(lost)} files, "
+                "maybe it ran out of memory. Restarting the workers."
+            )
+        for job in scheduler.retry(lost):
+            progress.report(
+                job,
+                concurrent.futures.process.BrokenProcessPool(
+                    "The worker processing this file died"
+                ),
+            )
+
+
+def run_admitted(
+    pool: concurrent.futures.Executor,
+    scheduler: MemoryScheduler,
+    submit: Callable[[concurrent.futures.Executor, Job], concurrent.futures.Future],
+    report: Callable[[Job, BaseException | None], None],
+    deadline: float | None = None,
+) -> list[Job]:
+    """Give the files admitted by scheduler to the workers of pool.
+
+    A worker that processes a file for longer than deadline, e.g.
+    because it is stuck in a C library, is killed. That breaks the pool,
+    and the file is reported as timed out.
+
+    Args:
+        pool: the pool of workers.
+        scheduler: decides when files are given to the workers.
+        submit: submits a file to the pool.
+        report: called with each file when it is done, and the exception
+            it raised, if any.
+        deadline: the seconds after which a file is overdue, None for
+            no deadline.
+
+    Returns:
+        The files that were being processed when the pool broke.
+    """
+    running: dict[concurrent.futures.Future, Job] = {}
+    started: dict[concurrent.futures.Future, float] = {}
+    lost = []
+    broken = False
+    while (scheduler.pending or running) and not broken:
+        for job in scheduler.admit():
+            try:
+                future = submit(pool, job)
+            except concurrent.futures.process.BrokenProcessPool:
+                scheduler.finish(job)
+                scheduler.pending.appendleft(job)
+                broken = True
+                break
+            running[future] = job
+            started[future] = time.monotonic()
+
+        done, overdue = wait_for_any(started, deadline)
+        if overdue:
+            kill_workers()
+        if broken or overdue or any(is_broken(future) for future in done):
+            # The other files being processed fail when the pool breaks
+            broken = True
+            done, _ = concurrent.futures.wait(running)
+
+        for future in done:
+            job = running.pop(future)
+            del started[future]
+            scheduler.finish(job)
+            if future in overdue:
+                report(
+                    job,
+                    timeouts.FileTimeoutError(f"Killed after {deadline} seconds"),
+                )
+            elif is_broken(future):
+                lost.append(job)
+            else:
+                report(job, future.exception())
+
+    return lost
+
+
+def wait_for_any(
+    started: dict[concurrent.futures.Future, float], deadline: float | None
+) -> tuple[set[concurrent.futures.Future], set[concurrent.futures.Future]]:
+    """Wait until a future is done, or the first deadline has passed.
+
+    Args:
+        started: the running futures, and when they were started.
+        deadline: the seconds after which a future is overdue, None for
+            no deadline.
+
+    Returns:
+        The futures that are done, and those that are overdue.
+    """
+    if deadline is None or not started:
+        done, _ = concurrent.futures.wait(
+            started, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+        return done, set()
+
+    timeout = min(started.values()) + deadline - time.monotonic()
+    done, not_done = concurrent.futures.wait(
+        started, timeout=max(timeout, 0), return_when=concurrent.futures.FIRST_COMPLETED
+    )
+    now = time.monotonic()
+
+    return done, {future for future in not_done if now - started[future] >= deadline}
+
+
+def kill_workers():
+    """Kill the worker processes started by this process.
+
+    The pool they belong to breaks, and run_scheduled starts a new one.
+    """
+    for worker in multiprocessing.active_children():
+        worker.kill()
+
+
+def is_broken(future: concurrent.futures.Future) -> bool:
+    """Check whether future failed because its worker died."""
+    return isinstance(future.exception(), concurrent.futures.process.BrokenProcessPool)
+
+
+def map_in_order(pool, function, items, window):
+    """Map function over items in pool, with at most window items in flight.
+
+    Unlike Executor.map, the items are not all read before the first
+    results are ready, so huge inputs are not loaded into memory.
+
+    Args:
+        pool (concurrent.futures.Executor): the pool running function.
+        function (Callable): the function to call with each item.
+        items (iterable): the items.
+        window (int): the maximum number of items submitted to the pool
+            whose results have not been yielded.
+
+    Yields:
+        the results, in the order of items.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(function, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
 
 def make_digest(bytestring: bytes) -> str:
     """Make a md5 hash to identify possible dupes."""